@@ -6,10 +6,28 @@ from app.models.chat import ChatMessage, ChatResponse
 from app.services.chat_service import ChatService
 from app.api.deps import get_current_active_user
 from app.core.config import settings
+from app.services.symbol_registry import symbol_registry
 from pydantic import BaseModel
 
 router = APIRouter()
 
+# Common English words that look like tickers in upper-cased chat text
+COMMON_WORDS = frozenset({
+    'WHAT', 'THE', 'FOR', 'AND', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'WILL', 'HAVE',
+    'THIS', 'THAT', 'WITH', 'FROM', 'THEY', 'BEEN', 'THEIR', 'WOULD', 'THERE', 'COULD',
+    'OTHER', 'AFTER', 'FIRST', 'WELL', 'ALSO', 'JUST', 'WHERE', 'MOST', 'KNOW', 'GET',
+    'USE', 'YEAR', 'WORK', 'PART', 'TIME', 'VERY', 'WHEN', 'MUCH', 'NEW', 'NOW', 'OLD',
+    'SEE', 'HIM', 'TWO', 'HOW', 'ITS', 'WHO', 'OIL', 'SIT', 'SET', 'HAD', 'LET', 'SAY',
+    'SHE', 'MAY', 'HER', 'HIS', 'HAS', 'ONE', 'OUR', 'OUT', 'DAY', 'WAY', 'PUT', 'END',
+    'WHY', 'TRY', 'GOD', 'SIX', 'DOG', 'EAT', 'AGO', 'SIR', 'FAR', 'SEA', 'EYE', 'BIG',
+    'BOX', 'YET', 'OFF', 'CUT', 'YES', 'CAR', 'JOB', 'LOT', 'FUN', 'RUN', 'TOP', 'ARM',
+    'BAD', 'BED', 'WIN', 'FIRE', 'FOUR', 'FIVE', 'SIZE', 'ONCE', 'TAKE', 'BACK', 'COME',
+    'GIVE', 'LOOK', 'MOVE', 'LIVE', 'SEEM', 'FEEL', 'KEEP', 'TURN', 'CALL', 'HELP', 'NEED',
+    'TELL', 'LONG', 'LATE', 'LAST', 'HIGH', 'GOOD', 'BEST', 'NEXT', 'OPEN', 'SURE', 'FULL',
+    'HARD', 'LEFT', 'EACH', 'REAL', 'BOTH', 'SAME', 'TRUE', 'MANY', 'SOME', 'FIND', 'SHOW',
+    'PRICE', 'OF',
+})
+
 class DevChatMessage(BaseModel):
     content: str
     message_type: str = "user"
@@ -29,7 +47,6 @@ async def send_dev_message(
     """Development chat endpoint with smart responses - no authentication required"""
     from datetime import datetime
     import re
-    import yfinance as yf
     import asyncio
     
     content = message.content.lower()
@@ -37,215 +54,15 @@ async def send_dev_message(
     # Improved stock symbol detection - include symbols starting with numbers
     symbols = re.findall(r'\b([0-9]*[A-Z][A-Z0-9]{1,9})\b', message.content.upper())
     
-    # Indian stock symbols and company name mappings (NSE symbols)
-    indian_stocks = {
-        # Financial Services with numbers
-        '360ONE': '360 ONE WAM Ltd.',
-        '360 ONE WAM': '360ONE',
-        '360 ONE': '360ONE',
-        '3MINDIA': '3M India Ltd.',
-        '3M INDIA': '3MINDIA',
-        
-        # Major IT Companies (NSE symbols)
-        'TCS': 'Tata Consultancy Services',
-        'TATA CONSULTANCY SERVICES': 'TCS',
-        'TATA CONSULTANCY': 'TCS',
-        'INFY': 'Infosys Limited',
-        'INFOSYS': 'INFY',
-        'HDFCBANK': 'HDFC Bank Limited',
-        'HDFC BANK': 'HDFCBANK',
-        'HDFC BANK LIMITED': 'HDFCBANK',
-        'HDFCAMC': 'HDFC Asset Management Company Limited',
-        'HDFC ASSET MANAGEMENT': 'HDFCAMC',
-        'HDFC AMC': 'HDFCAMC',
-        'ICICIBANK': 'ICICI Bank Limited',
-        'ICICI BANK': 'ICICIBANK',
-        'ICICI BANK LIMITED': 'ICICIBANK',
-        'ICICIGI': 'ICICI Lombard General Insurance Company Limited',
-        'ICICI LOMBARD': 'ICICIGI',
-        'ICICIPRULI': 'ICICI Prudential Life Insurance Company Limited',
-        'ICICI PRUDENTIAL': 'ICICIPRULI',
-        'JIOFIN': 'Jio Financial Services Limited',
-        'JIO FINANCIAL': 'JIOFIN',
-        'JIO FINANCIAL SERVICES': 'JIOFIN',
-        'WIT': 'Wipro Limited',     # ADR symbol for Wipro
-        'WIPRO': 'WIT',
-        'HCLTECH': 'HCL Technologies',
-        'HCL TECHNOLOGIES': 'HCLTECH',
-        'HCL': 'HCLTECH',
-        'TECHM': 'Tech Mahindra',
-        'TECH MAHINDRA': 'TECHM',
-        
-        # Banking & Financial Services  
-        'RELIANCE': 'Reliance Industries',
-        'RELIANCE INDUSTRIES': 'RELIANCE',
-        'SBIN': 'State Bank of India',
-        'STATE BANK OF INDIA': 'SBIN',
-        'SBI': 'SBIN',
-        'KOTAKBANK': 'Kotak Mahindra Bank',
-        'KOTAK MAHINDRA BANK': 'KOTAKBANK',
-        'KOTAK': 'KOTAKBANK',
-        'AXISBANK': 'Axis Bank',
-        'AXIS BANK': 'AXISBANK',
-        'AXIS': 'AXISBANK',
-        'INDUSINDBK': 'IndusInd Bank',
-        'INDUSIND BANK': 'INDUSINDBK',
-        'INDUSIND': 'INDUSINDBK',
-        'BAJFINANCE': 'Bajaj Finance',
-        'BAJAJ FINANCE': 'BAJFINANCE',
-        'BAJAJ': 'BAJFINANCE',
-        
-        # Automobiles
-        'MARUTI': 'Maruti Suzuki India',
-        'MARUTI SUZUKI': 'MARUTI',
-        'TATAMOTOR': 'Tata Motors',
-        'TATA MOTORS': 'TATAMOTOR',
-        'M&M': 'Mahindra & Mahindra',
-        'MAHINDRA': 'M&M',
-        'MAHINDRA & MAHINDRA': 'M&M',
-        'BAJAJ-AUTO': 'Bajaj Auto',
-        'BAJAJ AUTO': 'BAJAJ-AUTO',
-        'EICHERMOT': 'Eicher Motors',
-        'EICHER MOTORS': 'EICHERMOT',
-        'EICHER': 'EICHERMOT',
-        'TATAMOTORS': 'Tata Motors',
-        
-        # Pharmaceuticals
-        'SUNPHARMA': 'Sun Pharmaceutical',
-        'SUN PHARMACEUTICAL': 'SUNPHARMA',
-        'SUN PHARMA': 'SUNPHARMA',
-        'DRREDDY': "Dr. Reddy's Laboratories",
-        'DR REDDY': 'DRREDDY',
-        'DR REDDYS': 'DRREDDY',
-        'CIPLA': 'Cipla Limited',
-        'BIOCON': 'Biocon Limited',
-        'LUPIN': 'Lupin Limited',
-        'AUROPHARMA': 'Aurobindo Pharma',
-        'AUROBINDO PHARMA': 'AUROPHARMA',
-        'AUROBINDO': 'AUROPHARMA',
-        
-        # Telecom
-        'BHARTIARTL': 'Bharti Airtel',
-        'BHARTI AIRTEL': 'BHARTIARTL',
-        'AIRTEL': 'BHARTIARTL',
-        'JIO': 'Reliance Jio', # Note: Jio is part of Reliance
-        'RELIANCE JIO': 'RELIANCE',
-        
-        # Consumer Goods & Retail
-        'ITC': 'ITC Limited',
-        'HINDUNILVR': 'Hindustan Unilever',
-        'HINDUSTAN UNILEVER': 'HINDUNILVR',
-        'HUL': 'HINDUNILVR',
-        'NESTLEIND': 'Nestle India',
-        'TRENT': 'Trent Limited',
-        'TRENT LIMITED': 'TRENT',
-        'NESTLE INDIA': 'NESTLEIND',
-        'NESTLE': 'NESTLEIND',
-        'BRITANNIA': 'Britannia Industries',
-        'BRITANNIA INDUSTRIES': 'BRITANNIA',
-        'DABUR': 'Dabur India',
-        'DABUR INDIA': 'DABUR',
-        'GODREJCP': 'Godrej Consumer Products',
-        'GODREJ': 'GODREJCP',
-        
-        # Metals & Mining
-        'TATASTEEL': 'Tata Steel',
-        'TATA STEEL': 'TATASTEEL',
-        'HINDALCO': 'Hindalco Industries',
-        'HINDALCO INDUSTRIES': 'HINDALCO',
-        'JSWSTEEL': 'JSW Steel',
-        'JSW STEEL': 'JSWSTEEL',
-        'JSW': 'JSWSTEEL',
-        'SAILSTEEL': 'Steel Authority of India',
-        'SAIL': 'SAILSTEEL',
-        'VEDL': 'Vedanta Limited',
-        'VEDANTA': 'VEDL',
-        
-        # Oil & Gas
-        'ONGC': 'Oil and Natural Gas Corporation',
-        'OIL AND NATURAL GAS': 'ONGC',
-        'BPCL': 'Bharat Petroleum Corporation',
-        'BHARAT PETROLEUM': 'BPCL',
-        'IOCL': 'Indian Oil Corporation',
-        'INDIAN OIL': 'IOCL',
-        'GAIL': 'GAIL (India) Limited',
-        'GAIL INDIA': 'GAIL',
-        
-        # Power & Infrastructure
-        'NTPC': 'NTPC Limited',
-        'POWERGRID': 'Power Grid Corporation',
-        'POWER GRID': 'POWERGRID',
-        'LT': 'Larsen & Toubro',
-        'LARSEN TOUBRO': 'LT',
-        'LARSEN & TOUBRO': 'LT',
-        'L&T': 'LT',
-        'ADANIPORTS': 'Adani Ports',
-        'ADANI PORTS': 'ADANIPORTS',
-        'ADANI': 'ADANIPORTS',
-        
-        # Cement
-        'ULTRACEMCO': 'UltraTech Cement',
-        'ULTRATECH CEMENT': 'ULTRACEMCO',
-        'ULTRATECH': 'ULTRACEMCO',
-        'AMBUJACEM': 'Ambuja Cements',
-        'AMBUJA CEMENTS': 'AMBUJACEM',
-        'AMBUJA': 'AMBUJACEM',
-        'ACC': 'ACC Limited',
-        'SHREECEM': 'Shree Cement',
-        'SHREE CEMENT': 'SHREECEM',
-        
-        # Miscellaneous
-        'ASIANPAINT': 'Asian Paints',
-        'ASIAN PAINTS': 'ASIANPAINT',
-        'ASIAN PAINT': 'ASIANPAINT',
-        'TITAN': 'Titan Company',
-        'TITAN COMPANY': 'TITAN',
-        'BAJAJFINSV': 'Bajaj Finserv',
-        'BAJAJ FINSERV': 'BAJAJFINSV',
-        'HDFCLIFE': 'HDFC Life Insurance',
-        'HDFC LIFE': 'HDFCLIFE',
-        'SBILIFE': 'SBI Life Insurance',
-        'SBI LIFE': 'SBILIFE',
-        
-        # Wind Energy & Others
-        'INOXWIND': 'Inox Wind Limited',
-        'INOX WIND': 'INOXWIND',  # Company name to symbol mapping
-        'INOX WIND LIMITED': 'INOXWIND',
-        'PVRINOX': 'PVR INOX Limited',
-        'PVR INOX': 'PVRINOX',
-        'PVR INOX LIMITED': 'PVRINOX',
-        'GMDCLTD': 'Gujarat Mineral Development Corporation',
-        'GUJARAT MINERAL DEVELOPMENT': 'GMDCLTD',
-        'GUJARAT MINERAL DEVELOPMENT CORPORATION': 'GMDCLTD'
-    }
-    
-    # Extract known symbols from the mapping
-    known_stocks = list(set([v if v in indian_stocks else k for k, v in indian_stocks.items() if len(k) <= 10 and (k.isupper() or any(c.isdigit() for c in k))]))
-    
-    # Add some global stocks for comparison
-    known_stocks.extend(['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN', 'META', 'NFLX', 'NVDA', 'AMD', 'INTC'])
-    
-    # Common English words to exclude
-    common_words = ['WHAT', 'THE', 'FOR', 'AND', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'WILL', 'HAVE', 'THIS', 'THAT', 'WITH', 'FROM', 'THEY', 'BEEN', 'HAVE', 'THEIR', 'WOULD', 'THERE', 'COULD', 'OTHER', 'AFTER', 'FIRST', 'WELL', 'ALSO', 'JUST', 'WHERE', 'MOST', 'KNOW', 'GET', 'USE', 'YEAR', 'WORK', 'PART', 'TIME', 'VERY', 'WHEN', 'MUCH', 'NEW', 'NOW', 'OLD', 'SEE', 'HIM', 'TWO', 'HOW', 'ITS', 'WHO', 'OIL', 'SIT', 'SET', 'HAD', 'LET', 'SAY', 'SHE', 'MAY', 'HER', 'HIM', 'HIS', 'HAS', 'ONE', 'OUR', 'OUT', 'DAY', 'WAY', 'PUT', 'END', 'WHY', 'TRY', 'GOD', 'SIX', 'DOG', 'EAT', 'AGO', 'SIR', 'FAR', 'SEA', 'EYE', 'BIG', 'BOX', 'YET', 'OFF', 'CUT', 'YES', 'CAR', 'JOB', 'LOT', 'FUN', 'RUN', 'TOP', 'ARM', 'BAD', 'BED', 'WIN', 'FIRE', 'FOUR', 'FIVE', 'SIZE', 'ONCE', 'TAKE', 'BACK', 'COME', 'GIVE', 'LOOK', 'MOVE', 'LIVE', 'SEEM', 'FEEL', 'KEEP', 'TURN', 'CALL', 'HELP', 'NEED', 'TELL', 'LONG', 'LATE', 'LAST', 'HIGH', 'GOOD', 'BEST', 'NEXT', 'OPEN', 'SURE', 'FULL', 'HARD', 'LEFT', 'EACH', 'REAL', 'BOTH', 'SAME', 'TRUE', 'MANY', 'SOME', 'FIND', 'SHOW', 'PRICE', 'OF']
-    
     # Enhanced symbol detection for Indian stocks
     def detect_stock_symbols(text):
         detected_symbols = []
         text_upper = text.upper()
         
         # Method 1: Company name matching FIRST (prioritize multi-word company names)
-        # Sort by length (longer first) to match "INOX WIND LIMITED" before "INOX WIND" before "INOX"
-        sorted_companies = sorted(indian_stocks.items(), key=lambda x: len(x[0]), reverse=True)
-        
-        for company_name, symbol in sorted_companies:
-            if company_name in text_upper:
-                # Always use the symbol (shorter identifier)
-                if len(symbol) <= 10 and symbol.isupper():
-                    detected_symbols.append(symbol)
-                elif len(company_name) <= 10 and company_name.isupper():
-                    detected_symbols.append(company_name)
-                # Once we find a match, break to avoid multiple matches
-                break
+        # Longest names match first: "INOX WIND LIMITED" before "INOX WIND" before "INOX"
+        # Only the best match is used to avoid multiple matches
+        detected_symbols.extend(symbol_registry.match_names(text)[:1])
         
         # Method 2: Look for exact stock symbols as standalone words (only if no company names found)
         if not detected_symbols:
@@ -255,20 +72,20 @@ async def send_dev_message(
                 clean_word = ''.join(c for c in word if c.isalnum())
                 if clean_word and len(clean_word) >= 2:
                     # Check if this is a known symbol or could be a stock symbol
-                    if clean_word in known_stocks:
+                    if clean_word in symbol_registry:
                         detected_symbols.append(clean_word)
-                    elif len(clean_word) >= 3 and clean_word.isalpha() and clean_word not in common_words:
+                    elif len(clean_word) >= 3 and clean_word.isalpha() and clean_word not in COMMON_WORDS:
                         # Potential stock symbol - add it for testing
                         detected_symbols.append(clean_word)
         
         # Method 3: Fallback to regex matching only if still no symbols
         if not detected_symbols:
-            regex_symbols = [s for s in symbols if s in known_stocks]
+            regex_symbols = [s for s in symbols if s in symbol_registry]
             detected_symbols.extend(regex_symbols)
             
             # If still nothing, try filtered regex
             if not detected_symbols:
-                detected_symbols = [s for s in symbols if s not in common_words and len(s) >= 2 and len(s) <= 10 and s.isalpha()]
+                detected_symbols = [s for s in symbols if s not in COMMON_WORDS and len(s) >= 2 and len(s) <= 10 and s.isalpha()]
         
         # Remove duplicates and return
         detected_symbols = list(dict.fromkeys(detected_symbols))  # Preserve order while removing duplicates
@@ -351,13 +168,13 @@ async def send_dev_message(
                         clean_word = ''.join(c for c in word if c.isalnum())
                         if (clean_word != failed_upper and 
                             len(clean_word) >= 3 and
-                            clean_word not in common_words):
+                            clean_word not in COMMON_WORDS):
                             # Check if it's a known symbol
-                            if clean_word in known_stocks:
+                            if clean_word in symbol_registry:
                                 suggestions.append(clean_word)
                             # Check if it's similar to known symbols (partial matching)
                             elif len(clean_word) >= 4:
-                                for known_symbol in known_stocks:
+                                for known_symbol in symbol_registry.symbols:
                                     if (len(known_symbol) >= 4 and
                                         (clean_word in known_symbol or 
                                          known_symbol in clean_word or
@@ -366,7 +183,7 @@ async def send_dev_message(
                     
                     # Method 2: Check similarity with failed symbol
                     if len(failed_upper) >= 3:
-                        for known_symbol in known_stocks:
+                        for known_symbol in symbol_registry.symbols:
                             # String similarity checks
                             if (failed_upper in known_symbol or 
                                 known_symbol in failed_upper or
@@ -1,44 +1,123 @@
+import hashlib
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from app.models.user import User
-from app.models.stock import StockResponse
-from app.services.stock_service import StockService
+from app.core.config import settings
+from app.core.http_cache import cache_control, etag_matches, make_etag, not_modified
+from app.core.microcache import micro_cache
+from app.core.serialization import model_response
+from app.models.stock import Stock, StockResponse, StockSummaryResponse, StockQuoteResponse
+from app.services.stock_service import StockService, StockSnapshot
 from app.api.deps import get_current_active_user
 
 router = APIRouter()
 
-@router.get("/search", response_model=List[StockResponse])
+FIELDS_DESCRIPTION = "Comma-separated fields to return (symbol is always included)"
+
+# Fields selectable on endpoints reading stored documents vs. full StockResponse snapshots
+DOCUMENT_FIELDS = [f for f in Stock.__fields__ if f not in ("id", "revision_id")]
+RESPONSE_FIELDS = list(StockResponse.__fields__)
+
+def _parse_fields(fields: Optional[str], allowed: List[str]) -> Optional[List[str]]:
+    """Validate a fields= selection"""
+    if not fields:
+        return None
+    
+    selected = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in selected if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return selected or None
+
+def _fields_tag(fields: Optional[List[str]]) -> str:
+    """ETag component identifying a fields= selection"""
+    if not fields:
+        return "all"
+    return hashlib.sha1(",".join(sorted(fields)).encode()).hexdigest()[:8]
+
+@router.get("/search", response_model=List[StockSummaryResponse], response_model_exclude_unset=True)
+@micro_cache(ttl=2)
 async def search_stocks(
     q: str = Query(..., description="Search query (symbol or company name)"),
     limit: int = Query(10, ge=1, le=50, description="Number of results to return"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    typeahead: bool = Query(False, description="Only return symbol, name and match type from the in-memory index"),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Search for stocks by symbol or company name"""
-    return await StockService.search_stocks(q, limit)
+    """Search for stocks by symbol, company name or alias"""
+    if typeahead:
+        return StockService.suggest_stocks(q, limit)
+    
+    return await StockService.search_stocks(q, limit, _parse_fields(fields, DOCUMENT_FIELDS))
 
-@router.get("/trending", response_model=List[StockResponse])
+@router.get("/trending", response_model=List[StockSummaryResponse], response_model_exclude_unset=True)
+@micro_cache(ttl=5)
 async def get_trending_stocks(
     limit: int = Query(10, ge=1, le=50, description="Number of results to return"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get trending stocks"""
-    return await StockService.get_trending_stocks(limit)
+    return await StockService.get_trending_stocks(limit, _parse_fields(fields, DOCUMENT_FIELDS))
+
+@router.get("/quotes", response_model=List[StockQuoteResponse])
+async def get_stock_quotes(
+    symbols: str = Query(..., description="Comma-separated stock symbols"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get quotes for many stocks in one call"""
+    symbol_list = [symbol.strip().upper() for symbol in symbols.split(",") if symbol.strip()]
+    
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="No symbols provided")
+    
+    if len(symbol_list) > settings.STOCK_QUOTES_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.STOCK_QUOTES_MAX_SYMBOLS} symbols per request"
+        )
+    
+    return await StockService.get_stock_quotes(symbol_list)
 
 @router.get("/{symbol}", response_model=StockResponse)
+@micro_cache(ttl=1)
 async def get_stock(
     symbol: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get detailed information about a specific stock"""
-    stock_data = await StockService.get_stock_data(symbol)
+    selected_fields = _parse_fields(fields, RESPONSE_FIELDS)
+    snapshot = await StockService.get_stock_snapshot(symbol)
     
-    if not stock_data:
+    if not snapshot:
         raise HTTPException(
             status_code=404,
             detail=f"Stock with symbol '{symbol}' not found"
         )
     
-    return stock_data
+    headers = {"X-Snapshot-Version": str(snapshot.version)}
+    if snapshot.response.is_stale:
+        # Stale bodies carry their age, so no two are identical
+        headers["Cache-Control"] = "no-cache"
+    else:
+        headers["ETag"] = make_etag(snapshot.response.symbol, snapshot.version, _fields_tag(selected_fields))
+        headers["Cache-Control"] = cache_control(StockService.fresh_for(symbol))
+        if etag_matches(if_none_match, headers["ETag"]):
+            return not_modified(headers)
+    
+    if selected_fields:
+        # Partial documents don't satisfy StockResponse - serialize just the selection
+        response = model_response(snapshot.response, include={"symbol", *selected_fields})
+        response.headers.update(headers)
+        return response
+    
+    # Send the snapshot's pre-serialized bytes as-is
+    return Response(content=snapshot.json, media_type="application/json", headers=headers)
 
 @router.post("/watchlist/{symbol}")
 async def add_to_watchlist(
@@ -73,16 +152,32 @@ async def remove_from_watchlist(
     
     return {"message": f"Removed {symbol} from watchlist"}
 
-@router.get("/watchlist/my", response_model=List[StockResponse])
+@router.get("/watchlist/my", response_model=List[StockSummaryResponse], response_model_exclude_unset=True)
 async def get_my_watchlist(
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user's watchlist with current stock data"""
-    watchlist_data = []
+    selected_fields = _parse_fields(fields, RESPONSE_FIELDS)
+    watchlist_data = await StockService.get_watchlist_data(current_user.watchlist)
     
-    for symbol in current_user.watchlist:
-        stock_data = await StockService.get_stock_data(symbol)
-        if stock_data:
-            watchlist_data.append(stock_data)
+    if any(stock_data.is_stale for stock_data in watchlist_data):
+        response.headers["Cache-Control"] = "no-cache"
+    else:
+        # The list changes when any member's data version (or the list itself) does
+        versions = "|".join(
+            f"{stock_data.symbol}:{StockSnapshot.version_of(stock_data)}" for stock_data in watchlist_data
+        )
+        headers = {
+            "ETag": make_etag("watchlist", hashlib.sha1(versions.encode()).hexdigest()[:16], _fields_tag(selected_fields)),
+            "Cache-Control": cache_control(min(
+                (StockService.fresh_for(stock_data.symbol) for stock_data in watchlist_data), default=0.0
+            )),
+        }
+        if etag_matches(if_none_match, headers["ETag"]):
+            return not_modified(headers)
+        response.headers.update(headers)
     
-    return watchlist_data
\ No newline at end of file
+    return [StockService.summarize(stock_data, selected_fields) for stock_data in watchlist_data]
\ No newline at end of file
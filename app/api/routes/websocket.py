@@ -4,6 +4,7 @@ from app.services.websocket_service import connection_manager
 from app.core.security import verify_token
 from app.models.user import User
 from app.services.stock_service import StockService
+from app.services.trending_service import trending_tracker
 import logging
 
 logger = logging.getLogger(__name__)
@@ -58,6 +59,7 @@ async def websocket_endpoint(
                     symbol = message.get("symbol", "").upper()
                     if symbol:
                         await connection_manager.subscribe_to_symbol(user_id, symbol)
+                        trending_tracker.record_subscribe(symbol)
                         
                 elif message_type == "unsubscribe":
                     symbol = message.get("symbol", "").upper()
@@ -67,14 +69,14 @@ async def websocket_endpoint(
                 elif message_type == "get_stock_data":
                     symbol = message.get("symbol", "").upper()
                     if symbol:
-                        stock_data = await StockService.get_stock_data(symbol)
-                        if stock_data:
-                            await connection_manager.send_personal_message({
+                        snapshot = await StockService.get_stock_snapshot(symbol)
+                        if snapshot:
+                            await connection_manager.send_personal_frame({
                                 "type": "stock_data_response",
                                 "symbol": symbol,
-                                "data": stock_data.dict(),
-                                "timestamp": stock_data.last_updated.isoformat()
-                            }, user_id)
+                                "version": snapshot.version,
+                                "timestamp": snapshot.response.last_updated.isoformat()
+                            }, snapshot.json, user_id)
                         else:
                             await connection_manager.send_personal_message({
                                 "type": "error",
@@ -0,0 +1,141 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate in-memory size of an object and its attribute values in bytes
+
+    Only one level deep: caches of nested values should pass their own sizeof.
+    """
+    size = sys.getsizeof(value)
+    attributes = getattr(value, "__dict__", None)
+    if isinstance(value, dict):
+        attributes = value
+    if attributes:
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in attributes.items())
+    return size
+
+class LRUTTLCache(Generic[V]):
+    """
+    Bounded in-memory cache with least-recently-used eviction and per-entry TTL.
+
+    Both the number of entries and their approximate total size are bounded;
+    the least recently used entries are evicted when either limit is exceeded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: int,
+        default_ttl: float,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[Hashable, Tuple[V, float, int]]" = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return a live entry and mark it as recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Return a live entry without touching recency or hit/miss counters"""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def ttl_remaining(self, key: Hashable) -> Optional[float]:
+        """Seconds until an entry expires, None if absent"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return max(0.0, entry[1] - time.monotonic())
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None):
+        """Insert or replace an entry, evicting LRU entries if over capacity"""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            self.invalidate(key)
+            return
+
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            # Never cacheable - don't flush the whole cache for it
+            self.invalidate(key)
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self.current_bytes += size
+
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop an entry, e.g. after the underlying data was written"""
+        if key in self._entries:
+            self._remove(key)
+            self.invalidations += 1
+            return True
+        return False
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -36,6 +36,83 @@ class Settings(BaseSettings):
     # WebSocket
     WEBSOCKET_PING_INTERVAL: int = Field(default=30)
     
+    # Symbol master CSV (stock universe); reloaded when the file changes, 0 disables watching
+    SYMBOL_MASTER_CSV_PATH: str = Field(default="data/symbol_master.csv")
+    SYMBOL_MASTER_RELOAD_SECONDS: int = Field(default=60)
+    
+    # Market data provider: "yfinance", "record" (yfinance + capture to disk) or "replay" (offline)
+    MARKET_DATA_PROVIDER: str = Field(default="yfinance")
+    MARKET_DATA_RECORDINGS_DIR: str = Field(default="recordings/market_data")
+    MARKET_DATA_REPLAY_LATENCY_MS: int = Field(default=0)
+    
+    # Dedicated thread pool for upstream I/O; background work (history backfills)
+    # may use at most UPSTREAM_BACKGROUND_MAX_WORKERS of its threads
+    UPSTREAM_MAX_WORKERS: int = Field(default=16)
+    UPSTREAM_BACKGROUND_MAX_WORKERS: int = Field(default=4)
+    
+    # Upstream rate limiting (token bucket) and circuit breaker
+    UPSTREAM_RATE_LIMIT_PER_SECOND: float = Field(default=5.0)
+    UPSTREAM_RATE_LIMIT_BURST: int = Field(default=10)
+    UPSTREAM_RATE_LIMIT_MAX_WAIT_SECONDS: float = Field(default=10.0)
+    UPSTREAM_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5)
+    UPSTREAM_CIRCUIT_OPEN_SECONDS: float = Field(default=30.0)
+    UPSTREAM_CIRCUIT_MAX_OPEN_SECONDS: float = Field(default=600.0)
+    
+    # Stock data freshness (per field group)
+    STOCK_QUOTE_TTL_SECONDS: int = Field(default=30)
+    STOCK_INFO_TTL_HOURS: int = Field(default=6)
+    STOCK_STATEMENTS_TTL_DAYS: int = Field(default=7)
+    
+    # Stale-while-revalidate: serve stale snapshots while refreshing in the background,
+    # blocking only once a field group is overdue by more than the max staleness
+    STOCK_STALE_WHILE_REVALIDATE: bool = Field(default=True)
+    STOCK_MAX_STALENESS_SECONDS: int = Field(default=900)
+    
+    # Batched quotes endpoint
+    STOCK_QUOTES_MAX_SYMBOLS: int = Field(default=300)
+    
+    # Watchlist resolution
+    WATCHLIST_REFRESH_CONCURRENCY: int = Field(default=5)
+    
+    # Write-behind buffer for Stock documents: changed fields are flushed in one bulk write per interval
+    STOCK_WRITE_FLUSH_INTERVAL_SECONDS: float = Field(default=2.0)
+    # Last persisted fields kept to diff against, for at most this many symbols and this long
+    STOCK_WRITE_BASELINE_MAX_SYMBOLS: int = Field(default=5000)
+    STOCK_WRITE_BASELINE_TTL_SECONDS: int = Field(default=3600)
+    
+    # Historical price ingestion: rows per unordered bulk upsert, and weekdays without rows
+    # (exchange holidays) tolerated when indexing coverage of rows stored before it was tracked
+    HISTORY_BULK_BATCH_SIZE: int = Field(default=1000)
+    HISTORY_GAP_TOLERANCE_DAYS: int = Field(default=3)
+    # Daily price layout: "rows" (a document per symbol and day) or "buckets" (a document per
+    # symbol and month with OHLCV arrays). Switching doesn't migrate stored history; clear
+    # history_coverage so the next sync downloads it again in the new layout
+    STOCK_PRICE_STORAGE: str = Field(default="rows")
+    
+    # Memory-mapped per-symbol price columns for analytics reads; at most PRICE_CACHE_MAX_OPEN mapped at once
+    PRICE_CACHE_DIR: str = Field(default="cache/prices")
+    PRICE_CACHE_MAX_OPEN: int = Field(default=256)
+    
+    # Ticker resolution negative cache (exponential backoff for unknown symbols)
+    TICKER_NEGATIVE_TTL_SECONDS: int = Field(default=300)
+    TICKER_NEGATIVE_MAX_TTL_SECONDS: int = Field(default=86400)
+    # Consecutive empty results of a resolved ticker before its variants are probed again
+    TICKER_EMPTY_REPROBE_THRESHOLD: int = Field(default=3)
+    
+    # Activity-based trending (exponentially decayed view/mention/subscribe counters)
+    TRENDING_HALF_LIFE_MINUTES: int = Field(default=60)
+    TRENDING_MAX_SYMBOLS: int = Field(default=5000)
+    TRENDING_SNAPSHOT_INTERVAL_SECONDS: int = Field(default=60)
+    
+    # In-process StockResponse snapshot cache
+    STOCK_SNAPSHOT_CACHE_MAX_ENTRIES: int = Field(default=2000)
+    STOCK_SNAPSHOT_CACHE_MAX_BYTES: int = Field(default=32 * 1024 * 1024)
+    
+    # Opt-in micro-cache of whole GET responses for @micro_cache endpoints
+    MICRO_CACHE_ENABLED: bool = Field(default=False)
+    MICRO_CACHE_MAX_ENTRIES: int = Field(default=10000)
+    MICRO_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
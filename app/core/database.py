@@ -2,7 +2,10 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from app.core.config import settings
 from app.models.user import User
-from app.models.stock import Stock, StockPrice
+from app.models.stock import (
+    Stock, StockPrice, StockPriceBucket, HistoryCoverage, FinancialStatement, BalanceSheet, CashFlow,
+    TickerResolution, TrendingScore
+)
 from app.models.chat import ChatHistory
 
 class Database:
@@ -31,7 +34,11 @@ async def init_database():
         # Initialize Beanie with all document models
         await init_beanie(
             database=db.database,
-            document_models=[User, Stock, StockPrice, ChatHistory]
+            document_models=[
+                User, Stock, StockPrice, StockPriceBucket, HistoryCoverage,
+                FinancialStatement, BalanceSheet, CashFlow,
+                TickerResolution, TrendingScore, ChatHistory
+            ]
         )
         
         print(f"✅ Connected to MongoDB database: {settings.DATABASE_NAME}")
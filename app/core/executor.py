@@ -0,0 +1,149 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Priority of upstream calls made by the current task
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("upstream_priority", default=INTERACTIVE)
+
+class _PriorityStats:
+    """Counters for one priority class"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+        self.queued = 0  # Submitted but not yet running
+        self.running = 0
+        self.max_queued = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        started = self.completed + self.running
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "errors": self.errors,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queued": self.max_queued,
+            "avg_wait_seconds": self.total_wait_seconds / started if started else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "avg_run_seconds": self.total_run_seconds / self.completed if self.completed else 0.0,
+            "max_run_seconds": self.max_run_seconds,
+        }
+
+class UpstreamExecutor:
+    """
+    Dedicated thread pool for blocking upstream I/O.
+
+    Calls made while background priority is active (see background()) may
+    occupy at most background_max_workers threads, so backfills can never
+    take the slots interactive fetches need. Queue depth, wait time (submit
+    to start) and run time are tracked per priority.
+    """
+
+    def __init__(self, name: str, max_workers: int, background_max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.background_max_workers = max(1, min(background_max_workers, max_workers - 1))
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._background_slots: Optional[asyncio.Semaphore] = None
+        self._stats = {INTERACTIVE: _PriorityStats(), BACKGROUND: _PriorityStats()}
+
+    async def run(self, fn: Callable[[], T], before_start: Optional[Callable[[], Awaitable[Any]]] = None) -> T:
+        """
+        Run a blocking callable on the pool at the current task's priority
+
+        `before_start` (e.g. taking a rate-limit token) is awaited once the
+        call holds its slot, so queued background calls don't reserve
+        anything ahead of interactive ones.
+        """
+        priority = _priority.get()
+        stats = self._stats[priority]
+        stats.submitted += 1
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        submitted_at = time.perf_counter()
+
+        if priority == BACKGROUND:
+            if self._background_slots is None:
+                self._background_slots = asyncio.Semaphore(self.background_max_workers)
+            try:
+                await self._background_slots.acquire()
+            except asyncio.CancelledError:
+                stats.queued -= 1
+                raise
+
+        loop = asyncio.get_running_loop()
+        state = {"started": False}
+
+        def timed_call():
+            state["started"] = True
+            started_at = time.perf_counter()
+            loop.call_soon_threadsafe(self._on_start, stats, started_at - submitted_at)
+            try:
+                return fn()
+            finally:
+                loop.call_soon_threadsafe(self._on_finish, stats, time.perf_counter() - started_at)
+
+        try:
+            if before_start is not None:
+                await before_start()
+            return await loop.run_in_executor(self._pool, timed_call)
+        except asyncio.CancelledError:
+            # Never reached a thread - it no longer counts as queued
+            if not state["started"]:
+                stats.queued -= 1
+            raise
+        except Exception:
+            if not state["started"]:
+                stats.queued -= 1
+            stats.errors += 1
+            raise
+        finally:
+            if priority == BACKGROUND:
+                self._background_slots.release()
+
+    @staticmethod
+    def _on_start(stats: _PriorityStats, wait_seconds: float):
+        stats.queued -= 1
+        stats.running += 1
+        stats.total_wait_seconds += wait_seconds
+        stats.max_wait_seconds = max(stats.max_wait_seconds, wait_seconds)
+
+    @staticmethod
+    def _on_finish(stats: _PriorityStats, run_seconds: float):
+        stats.running -= 1
+        stats.completed += 1
+        stats.total_run_seconds += run_seconds
+        stats.max_run_seconds = max(stats.max_run_seconds, run_seconds)
+
+    @staticmethod
+    async def background(coro: Awaitable[T]) -> T:
+        """Await a coroutine with its upstream calls at background priority"""
+        token = _priority.set(BACKGROUND)
+        try:
+            return await coro
+        finally:
+            _priority.reset(token)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool size and per-priority queue depth, wait time and run time"""
+        return {
+            "max_workers": self.max_workers,
+            "background_max_workers": self.background_max_workers,
+            **{priority: stats.as_dict() for priority, stats in self._stats.items()},
+        }
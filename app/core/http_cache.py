@@ -0,0 +1,25 @@
+from typing import Optional
+
+from fastapi import Response
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag from the parts identifying a representation"""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation (weak comparison, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def cache_control(fresh_for_seconds: float) -> str:
+    """Let clients reuse a response for as long as its data stays fresh"""
+    if fresh_for_seconds >= 1:
+        return f"private, max-age={int(fresh_for_seconds)}"
+    return "private, no-cache"
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,210 @@
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import LRUTTLCache
+from app.core.config import settings
+from app.core.http_cache import etag_matches
+from app.core.singleflight import SingleFlight
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+def micro_cache(ttl: float) -> Callable[[F], F]:
+    """
+    Mark a GET endpoint as cacheable by MicroCacheMiddleware
+
+    Successful responses are reused for `ttl` seconds (meant to be 1-5) by
+    identical requests: same path, query string and Authorization header.
+    """
+    def decorator(endpoint: F) -> F:
+        endpoint.micro_cache_ttl = ttl
+        return endpoint
+    return decorator
+
+class CachedResponse:
+    """A fully buffered HTTP response"""
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    # Headers repeated on a 304 built from this response
+    NOT_MODIFIED_HEADERS = {b"etag", b"cache-control", b"vary", b"x-snapshot-version"}
+
+    def header(self, name: bytes) -> Optional[bytes]:
+        for header_name, value in self.headers:
+            if header_name == name:
+                return value
+        return None
+
+    @property
+    def cacheable(self) -> bool:
+        # "private" is fine: entries are already keyed by auth scope
+        if self.status != 200 or self.header(b"set-cookie") is not None:
+            return False
+        return b"no-store" not in (self.header(b"cache-control") or b"")
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        etag = self.header(b"etag")
+        return self.status == 200 and etag is not None and etag_matches(if_none_match, etag.decode("latin-1"))
+
+class _RouteStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0  # Requests that ran the endpoint
+        self.coalesced = 0  # Requests that joined an identical one in flight
+
+    def as_dict(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / requests if requests else 0.0,
+        }
+
+class ResponseMicroCache:
+    """
+    Short-lived cache of whole GET responses.
+
+    Identical concurrent requests are collapsed into one execution, and its
+    response is then served from memory until the route's TTL expires, so a
+    burst of identical traffic costs one computation per window.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._responses: LRUTTLCache[CachedResponse] = LRUTTLCache(
+            "micro_cache",
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            default_ttl=1.0,
+        )
+        self._flight = SingleFlight("micro_cache")
+        self._routes: Dict[str, _RouteStats] = {}
+
+    @staticmethod
+    def key(scope: Scope) -> str:
+        """Path + query + auth scope (a digest of the Authorization header)"""
+        authorization = b""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+                break
+        auth_scope = hashlib.sha256(authorization).hexdigest() if authorization else "anonymous"
+        return f"{scope['path']}?{scope['query_string'].decode('latin-1')}#{auth_scope}"
+
+    async def get_or_fetch(
+        self, route: str, key: str, ttl: float, fetch: Callable[[], Any]
+    ) -> Tuple[CachedResponse, str]:
+        """The response for a request key, and whether it was a HIT, COALESCED or MISS"""
+        stats = self._routes.setdefault(route, _RouteStats())
+        response = self._responses.get(key)
+        if response is not None:
+            stats.hits += 1
+            return response, "HIT"
+
+        leader = not self._flight.in_flight(key)
+
+        async def fetch_and_store() -> CachedResponse:
+            fetched = await fetch()
+            if fetched.cacheable:
+                self._responses.set(key, fetched, ttl=ttl)
+            return fetched
+
+        response = await self._flight.do(key, fetch_and_store)
+        if leader:
+            stats.misses += 1
+            return response, "MISS"
+        stats.coalesced += 1
+        return response, "COALESCED"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-route hit rates and cache occupancy"""
+        return {
+            "cache": self._responses.get_stats(),
+            "routes": {route: stats.as_dict() for route, stats in self._routes.items()},
+        }
+
+class MicroCacheMiddleware:
+    """
+    ASGI middleware serving @micro_cache endpoints through a ResponseMicroCache
+
+    Routes are resolved against `router` before the request is handled, so
+    only endpoints that opted in are cached; everything else passes through.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseMicroCache, router: Router):
+        self.app = app
+        self.cache = cache
+        self.router = router
+
+    def _route_ttl(self, scope: Scope) -> Optional[Tuple[str, float]]:
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                ttl = getattr(getattr(route, "endpoint", None), "micro_cache_ttl", None)
+                return (route.path, ttl) if ttl else None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        route_ttl = self._route_ttl(scope)
+        if route_ttl is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, ttl = route_ttl
+
+        # The endpoint always renders the full response, so it can be shared;
+        # conditional requests are answered here from its ETag
+        if_none_match = None
+        headers = []
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+            else:
+                headers.append((name, value))
+        scope = {**scope, "headers": headers}
+
+        response, outcome = await self.cache.get_or_fetch(
+            route, self.cache.key(scope), ttl, lambda: self._buffer(scope, receive)
+        )
+        if response.not_modified(if_none_match):
+            status = 304
+            headers = [header for header in response.headers if header[0] in CachedResponse.NOT_MODIFIED_HEADERS]
+            body = b""
+        else:
+            status, headers, body = response.status, response.headers, response.body
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + [(b"x-micro-cache", outcome.encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _buffer(self, scope: Scope, receive: Receive) -> CachedResponse:
+        """Run the request and collect its response"""
+        start: Dict[str, Any] = {}
+        body: List[bytes] = []
+
+        async def capture(message: Message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        return CachedResponse(start.get("status", 500), list(start.get("headers", [])), b"".join(body))
+
+# Global response micro-cache instance
+response_micro_cache = ResponseMicroCache(
+    max_entries=settings.MICRO_CACHE_MAX_ENTRIES,
+    max_bytes=settings.MICRO_CACHE_MAX_BYTES,
+)
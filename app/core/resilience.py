@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict
+
+class UpstreamUnavailableError(Exception):
+    """An upstream call was rejected locally without being attempted"""
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """The circuit breaker is open"""
+
+class RateLimitExceededError(UpstreamUnavailableError):
+    """A rate limiter token would not be available within the allowed wait"""
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Callers
+    wait for their token; if that wait would exceed `max_wait` seconds the
+    call is rejected instead of queueing behind a long backlog.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_wait: float):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Take one token, sleeping until it is available"""
+        self._refill()
+        # Tokens may go negative: each waiter reserves its place in line
+        wait = max(0.0, (1 - self._tokens) / self.rate)
+        if wait > self.max_wait:
+            self.rejected += 1
+            raise RateLimitExceededError(f"{self.name}: no token within {self.max_wait}s")
+
+        self._tokens -= 1
+        self.acquired += 1
+        if wait > 0:
+            self.total_wait_seconds += wait
+            await asyncio.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Token counters"""
+        self._refill()
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "avg_wait_seconds": self.total_wait_seconds / self.acquired if self.acquired else 0.0,
+        }
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected. The open period grows exponentially with each
+    consecutive trip (capped at `max_open_seconds`) and is jittered so
+    instances don't retry in lockstep. Once it elapses, a single probe call
+    is let through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, open_seconds: float, max_open_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._trips = 0  # Consecutive openings without a successful probe
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.total_trips = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go upstream now"""
+        if self.state == self.OPEN and time.monotonic() >= self._open_until:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probe_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = True
+
+    def cancel_call(self):
+        """The allowed call never reached upstream - free the half-open probe slot"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            print(f"✅ {self.name} circuit closed")
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._trips = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        # Late failures of calls started before the circuit opened don't extend it
+        if self.state == self.OPEN:
+            return
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self):
+        self._trips += 1
+        self.total_trips += 1
+        backoff = min(self.open_seconds * 2 ** (self._trips - 1), self.max_open_seconds)
+        backoff *= random.uniform(0.8, 1.2)
+        self.state = self.OPEN
+        self._open_until = time.monotonic() + backoff
+        self._probe_in_flight = False
+        print(f"⚠️ {self.name} circuit opened for {backoff:.1f}s after {self._consecutive_failures} failures")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker state and counters"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "open_for_seconds": max(0.0, self._open_until - time.monotonic()) if self.state == self.OPEN else 0.0,
+            "trips": self.total_trips,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,28 @@
+from typing import Any, Iterable, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+def _default(value: Any) -> Any:
+    """Fallback for types orjson doesn't know natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(value: Any) -> bytes:
+    """Serialize to JSON bytes (datetimes, dataclasses, numpy values and models included)"""
+    return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def dumps_text(value: Any) -> str:
+    """Serialize to a JSON string, e.g. for WebSocket text frames"""
+    return dumps(value).decode()
+
+def model_response(model: BaseModel, include: Optional[Iterable[str]] = None) -> ORJSONResponse:
+    """
+    Respond with an already validated model as-is
+
+    Returning a Response skips FastAPI's response_model re-validation and
+    jsonable_encoder pass; the route's response_model still documents the schema.
+    """
+    return ORJSONResponse(model.model_dump(include=set(include) if include is not None else None))
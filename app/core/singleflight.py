@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Per-key request coalescing.
+
+    Concurrent callers for the same key share a single in-flight task instead
+    of each starting their own. The task is shielded, so a cancelled caller
+    (e.g. a dropped HTTP request) does not cancel the work for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.calls = 0  # Total calls to do()/spawn()
+        self.executions = 0  # Calls that actually started the work
+        self.coalesced = 0  # Calls that joined work already in flight
+        self.errors = 0  # Executions that raised
+
+    def in_flight(self, key: str) -> bool:
+        """Check if work for a key is currently running"""
+        return key in self._in_flight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn for key, or await the run already in flight for that key"""
+        return await asyncio.shield(self._get_or_start(key, fn))
+
+    def spawn(self, key: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """Start fn for key in the background unless it is already running"""
+        already_running = key in self._in_flight
+        self._get_or_start(key, fn)
+        return not already_running
+
+    def _get_or_start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        self.executions += 1
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda t, k=key: self._finish(k, t))
+        return task
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so background runs don't log "never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing counters"""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": self.coalesced / self.calls if self.calls else 0.0,
+        }
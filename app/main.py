@@ -2,11 +2,23 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
 from app.core.database import init_database, close_database
+from app.core.microcache import MicroCacheMiddleware, response_micro_cache
 from app.api.routes import auth, stocks, chat, websocket
+from app.services.market_data_provider import (
+    market_data_provider, upstream_circuit, upstream_executor, upstream_rate_limiter
+)
+from app.services.price_cache import price_column_cache
 from app.services.price_updater import price_updater
+from app.services.search_index import stock_search_index
+from app.services.symbol_registry import symbol_registry
+from app.services.trending_service import trending_tracker
+from app.services.stock_service import StockService, stock_snapshot_cache
+from app.services.stock_write_buffer import stock_write_buffer
+from app.services.ticker_resolver import ticker_resolver
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -14,6 +26,21 @@ async def lifespan(app: FastAPI):
     await init_database()
     print("Database initialized")
     
+    # Load the symbol universe and watch the master file for changes
+    await symbol_registry.load()
+    await symbol_registry.start()
+    
+    # Warm the shared ticker resolution cache and build the search index
+    await ticker_resolver.load()
+    await stock_search_index.load()
+    
+    # Restore trending scores and start snapshotting them
+    await trending_tracker.load()
+    await trending_tracker.start()
+    
+    # Start flushing buffered stock writes
+    await stock_write_buffer.start()
+    
     # Start background price updater
     await price_updater.start()
     print("Price updater started")
@@ -24,6 +51,15 @@ async def lifespan(app: FastAPI):
     await price_updater.stop()
     print("Price updater stopped")
     
+    # Write out everything still buffered before the database goes away
+    await stock_write_buffer.stop()
+    
+    await trending_tracker.stop()
+    
+    await symbol_registry.stop()
+    
+    upstream_executor.shutdown()
+    
     await close_database()
     print("Shutting down...")
 
@@ -32,9 +68,14 @@ app = FastAPI(
     description="Conversational Stock Analysis Platform Backend",
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Response micro-cache - innermost, so host checks and CORS headers still run per request
+if settings.MICRO_CACHE_ENABLED:
+    app.add_middleware(MicroCacheMiddleware, cache=response_micro_cache, router=app.router)
+
 # Security Middleware
 app.add_middleware(
     TrustedHostMiddleware, 
@@ -79,6 +120,23 @@ async def health_check():
         }
     }
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "coalescing": StockService.get_coalescing_stats(),
+        "snapshot_cache": stock_snapshot_cache.get_stats(),
+        "stock_writes": stock_write_buffer.get_stats(),
+        "price_cache": price_column_cache.get_stats(),
+        "ticker_resolution": ticker_resolver.get_stats(),
+        "market_data_provider": market_data_provider.get_stats(),
+        "upstream_executor": upstream_executor.get_stats(),
+        "upstream_rate_limiter": upstream_rate_limiter.get_stats(),
+        "upstream_circuit": upstream_circuit.get_stats(),
+        "trending": trending_tracker.get_stats(),
+        "symbol_registry": symbol_registry.get_stats(),
+        "micro_cache": response_micro_cache.get_stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
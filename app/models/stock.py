@@ -3,6 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 from beanie import Document
 from pydantic import BaseModel, Field
+from pymongo import IndexModel
 
 class Stock(Document):
     symbol: str = Field(..., index=True, unique=True)
@@ -14,9 +15,15 @@ class Stock(Document):
     current_price: Optional[float] = None
     price_change: Optional[float] = None
     price_change_percent: Optional[float] = None
+    volume: Optional[int] = None
     last_updated: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = Field(default=True)
     
+    # Per field-group freshness (see StockService.FIELD_GROUPS)
+    quote_updated: Optional[datetime] = None  # Price, change, volume
+    info_updated: Optional[datetime] = None  # Info-derived ratios and fundamentals
+    statements_updated: Optional[datetime] = None  # QoQ/YoY variance fields
+    
     # Financial metrics
     pe_ratio: Optional[float] = None
     pb_ratio: Optional[float] = None
@@ -76,6 +83,34 @@ class Stock(Document):
             "sector",
         ]
 
+class TickerResolution(Document):
+    """Which Yahoo Finance ticker variant works for a symbol (or that none does)"""
+    symbol: str = Field(..., index=True, unique=True)
+    ticker_symbol: Optional[str] = None  # e.g. "TCS.NS", "WIT", "XYZ.BO"
+    exchange: Optional[str] = None
+    is_unknown: bool = Field(default=False)  # No variant returned data
+    failure_count: int = Field(default=0)  # Consecutive failed resolutions
+    retry_after: Optional[datetime] = None  # Negative-cache expiry for unknown symbols
+    last_checked: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        collection = "ticker_resolutions"
+        indexes = [
+            "symbol",
+        ]
+
+class TrendingScore(Document):
+    """Snapshot of a symbol's time-decayed activity score"""
+    symbol: str = Field(..., index=True, unique=True)
+    score: float  # Decayed to snapshot_at
+    snapshot_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        collection = "trending_scores"
+        indexes = [
+            "symbol",
+        ]
+
 class StockPrice(Document):
     symbol: str = Field(..., index=True)
     timestamp: datetime = Field(..., index=True)
@@ -91,10 +126,51 @@ class StockPrice(Document):
         collection = "stock_prices"
         indexes = [
             [("symbol", 1), ("timestamp", -1)],
-            [("symbol", 1), ("date", -1)],
+            # One row per symbol and trading day; the upsert key of bulk ingestion
+            IndexModel([("symbol", 1), ("date", 1)], unique=True),
             "date",
         ]
 
+class StockPriceBucket(Document):
+    """
+    One month of a symbol's daily OHLCV bars as parallel arrays, sorted by date
+    
+    Alternative layout to StockPrice (one document per day), selected with
+    STOCK_PRICE_STORAGE="buckets".
+    """
+    symbol: str
+    month: str  # YYYY-MM
+    dates: List[str] = Field(default_factory=list)  # YYYY-MM-DD
+    timestamps: List[datetime] = Field(default_factory=list)
+    open_prices: List[float] = Field(default_factory=list)
+    high_prices: List[float] = Field(default_factory=list)
+    low_prices: List[float] = Field(default_factory=list)
+    close_prices: List[float] = Field(default_factory=list)
+    adj_close_prices: List[Optional[float]] = Field(default_factory=list)
+    volumes: List[int] = Field(default_factory=list)
+    
+    class Settings:
+        collection = "stock_price_buckets"
+        indexes = [
+            IndexModel([("symbol", 1), ("month", 1)], unique=True),
+        ]
+
+class CoveredRange(BaseModel):
+    start: str  # YYYY-MM-DD, inclusive
+    end: str  # YYYY-MM-DD, inclusive
+
+class HistoryCoverage(Document):
+    """Date ranges of a symbol's daily price history already synced from upstream"""
+    symbol: str = Field(..., index=True, unique=True)
+    ranges: List[CoveredRange] = Field(default_factory=list)  # Sorted, non-overlapping
+    last_synced: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Settings:
+        collection = "history_coverage"
+        indexes = [
+            "symbol",
+        ]
+
 class FinancialStatement(Document):
     """Quarterly and Annual Financial Statements"""
     symbol: str = Field(..., index=True)
@@ -233,6 +309,10 @@ class StockResponse(BaseModel):
     pe_ratio: Optional[float]
     last_updated: datetime
     
+    # Set when served past its freshness window while a background refresh runs
+    is_stale: bool = False
+    data_age_seconds: Optional[float] = None
+    
     # Extended fundamentals
     pb_ratio: Optional[float] = None
     dividend_yield: Optional[float] = None
@@ -268,6 +348,39 @@ class StockResponse(BaseModel):
     revenue_yoy: Optional[float] = None
     eps_yoy: Optional[float] = None
 
+class StockSummaryResponse(BaseModel):
+    """
+    Lean stock representation for list endpoints (search, trending, watchlist)
+    
+    Fields requested via `fields=` beyond the defaults are carried as extras.
+    """
+    symbol: str
+    name: Optional[str] = None
+    exchange: Optional[str] = None
+    current_price: Optional[float] = None
+    price_change: Optional[float] = None
+    price_change_percent: Optional[float] = None
+    market_cap: Optional[float] = None
+    pe_ratio: Optional[float] = None
+    last_updated: Optional[datetime] = None
+    # Set when built from a full StockResponse (e.g. watchlist)
+    is_stale: Optional[bool] = None
+    data_age_seconds: Optional[float] = None
+    
+    class Config:
+        extra = "allow"
+
+class StockQuoteResponse(BaseModel):
+    """Lightweight quote returned by the batched quotes endpoint and WebSocket ticks"""
+    symbol: str
+    name: Optional[str] = None
+    exchange: Optional[str] = None
+    current_price: Optional[float] = None
+    price_change: Optional[float] = None
+    price_change_percent: Optional[float] = None
+    volume: Optional[int] = None
+    last_updated: Optional[datetime] = None
+
 class StockPriceResponse(BaseModel):
     symbol: str
     timestamp: datetime
@@ -3,7 +3,10 @@ from datetime import datetime
 import re
 from app.models.chat import ChatHistory, ChatMessage, ChatResponse, MessageType
 from app.models.user import User
+from app.services.search_index import stock_search_index
 from app.services.stock_service import StockService
+from app.services.symbol_registry import symbol_registry
+from app.services.trending_service import trending_tracker
 
 class ChatService:
     @staticmethod
@@ -24,6 +27,10 @@ class ChatService:
         )
         await user_chat.save()
         
+        # Count mentions of known stocks towards trending
+        for symbol in ChatService._extract_stock_symbols(message.content):
+            trending_tracker.record_chat_mention(symbol)
+        
         # Process the message and generate response
         response_content = await ChatService._generate_response(message.content, user)
         
@@ -68,16 +75,12 @@ class ChatService:
     
     @staticmethod
     def _extract_stock_symbols(message: str) -> List[str]:
-        """Extract potential stock symbols from message"""
-        # Look for patterns like AAPL, GOOGL, RELIANCE, etc.
-        symbols = re.findall(r'\b[A-Z]{2,10}\b', message.upper())
-        
-        # Common stock symbols
-        known_symbols = ['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN', 'RELIANCE', 'TCS', 'INFY', 'HDFCBANK']
-        
-        # Filter to known symbols or return all uppercase words
-        result = [s for s in symbols if s in known_symbols] or symbols[:3]  # Max 3 symbols
-        return result
+        """Known stocks mentioned in a message, by company name or alias first, then by symbol"""
+        words = re.findall(r'\b[0-9]*[A-Z][A-Z0-9&]{1,9}\b', message.upper())
+        symbols = symbol_registry.match_names(message) + [
+            word for word in words if word in symbol_registry or word in stock_search_index
+        ]
+        return list(dict.fromkeys(symbols))[:3]  # Max 3 symbols
     
     @staticmethod
     async def _handle_price_query(symbol: str) -> Dict[str, Any]:
@@ -147,18 +150,17 @@ class ChatService:
         content = "📋 **Your Watchlist:**\n\n"
         watchlist_data = []
         
-        for symbol in user.watchlist:
-            stock_data = await StockService.get_stock_data(symbol)
-            if stock_data:
-                change_emoji = "📈" if stock_data.price_change >= 0 else "📉"
-                content += f"{change_emoji} **{stock_data.symbol}** - {stock_data.name}\n"
-                content += f"   ${stock_data.current_price:.2f} ({stock_data.price_change_percent:+.2f}%)\n\n"
-                
-                watchlist_data.append({
-                    "symbol": stock_data.symbol,
-                    "price": float(stock_data.current_price),
-                    "change_percent": float(stock_data.price_change_percent)
-                })
+        for stock_data in await StockService.get_watchlist_data(user.watchlist):
+            change_emoji = "📈" if stock_data.price_change >= 0 else "📉"
+            content += f"{change_emoji} **{stock_data.symbol}** - {stock_data.name}\n"
+            content += f"   ${stock_data.current_price:.2f} ({stock_data.price_change_percent:+.2f}%)\n\n"
+            
+            watchlist_data.append({
+                "symbol": stock_data.symbol,
+                "price": float(stock_data.current_price),
+                "change_percent": float(stock_data.price_change_percent),
+                "is_stale": stock_data.is_stale
+            })
         
         return {
             "content": content,
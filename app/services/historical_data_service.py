@@ -3,105 +3,311 @@ Historical Data Service
 Comprehensive service for fetching and storing historical OHLC data and financial statements
 """
 
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-import yfinance as yf
+from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import numpy as np
 import pandas as pd
 import asyncio
-from app.models.stock import StockPrice, FinancialStatement, BalanceSheet, CashFlow
+import re
+from app.core.config import settings
+from app.models.stock import HistoryCoverage, FinancialStatement, BalanceSheet, CashFlow
+from app.services.market_data_provider import market_data_provider
+from app.services.price_cache import PriceColumns, price_column_cache
+from app.services.price_store import price_store
+from app.services.ticker_resolver import ticker_resolver
+
+# Inclusive (start, end) trading-date range
+DateRange = Tuple[date, date]
+
+@dataclass
+class PriceDownload:
+    """Bars downloaded for a symbol and the date ranges they bring up to date"""
+    ranges: List[DateRange]  # Coverage before the download
+    frames: List[Tuple[Optional[date], date, pd.DataFrame]]  # (start, None for "max", end, bars)
+    full: bool  # Whole-period download rather than missing ranges only
+
+@dataclass
+class CompleteHistory:
+    """Everything a complete fetch downloaded for a symbol, stored as one unit"""
+    symbol: str
+    prices: Optional[PriceDownload]  # None if the download failed
+    statements: Dict[Tuple[str, str], pd.DataFrame]  # (statement, frequency) -> frame
 
 class HistoricalDataService:
     
     @staticmethod
     async def fetch_and_store_historical_prices(symbol: str, period: str = "10y") -> bool:
         """
-        Fetch and store historical OHLC data
+        Fetch and store historical OHLC data (a full download of the period)
         
         Args:
             symbol: Stock symbol
             period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
         """
         try:
-            # Determine ticker symbol for Indian stocks
-            ticker_symbol = f"{symbol.upper()}.NS"
-            
-            loop = asyncio.get_event_loop()
-            ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
-            
-            # Get historical data
-            hist = await loop.run_in_executor(
-                None, 
-                lambda: ticker.history(period=period)
-            )
-            
-            if hist.empty:
-                # Try without .NS suffix (for ADRs)
-                ticker_symbol = symbol.upper()
-                ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
-                hist = await loop.run_in_executor(
-                    None, 
-                    lambda: ticker.history(period=period)
-                )
-            
-            if hist.empty:
+            # Determine ticker symbol (.NS/.BO/ADR) via the shared resolver
+            resolved = await ticker_resolver.resolve(symbol)
+            if not resolved:
                 print(f"❌ No historical data found for {symbol}")
                 return False
             
-            # Convert DataFrame to list of documents
-            price_documents = []
-            for date, row in hist.iterrows():
-                price_doc = {
-                    "symbol": symbol.upper(),
-                    "timestamp": date.to_pydatetime(),
-                    "date": date.strftime("%Y-%m-%d"),
-                    "open_price": float(row['Open']),
-                    "high_price": float(row['High']),
-                    "low_price": float(row['Low']),
-                    "close_price": float(row['Close']),
-                    "adj_close_price": float(row.get('Adj Close', row['Close'])),
-                    "volume": int(row['Volume'])
-                }
-                price_documents.append(price_doc)
+            download = await HistoricalDataService._download_prices(symbol, resolved.ticker_symbol, period, full=True)
+            return await HistoricalDataService._store_prices(symbol, download)
             
-            # Bulk upsert to MongoDB
-            if price_documents:
-                # Delete existing data for this symbol and period to avoid duplicates
-                await StockPrice.find({"symbol": symbol.upper()}).delete()
-                
-                # Insert new data
-                for doc in price_documents:
-                    await StockPrice.find_one_and_update(
-                        {"symbol": doc["symbol"], "date": doc["date"]},
-                        {"$set": doc},
-                        upsert=True
+        except Exception as e:
+            print(f"❌ Error fetching historical prices for {symbol}: {e}")
+            return False
+    
+    @staticmethod
+    async def get_price_history(symbol: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Stored daily bars (StockPrice fields) between two dates, inclusive, whatever the storage layout"""
+        return await price_store.read(
+            symbol, start.isoformat() if start else None, end.isoformat() if end else None
+        )
+    
+    @staticmethod
+    async def get_price_columns(
+        symbol: str, start: Optional[date] = None, end: Optional[date] = None
+    ) -> Optional[PriceColumns]:
+        """
+        Stored daily bars between two dates as NumPy columns, for analytics
+        
+        Served as zero-copy views of the symbol's memory-mapped column cache,
+        which is built from MongoDB on first use.
+        """
+        columns = price_column_cache.get(symbol)
+        if columns is None:
+            # Merges wait for the build, so none is lost to the older snapshot
+            async with price_column_cache.lock(symbol):
+                columns = price_column_cache.get(symbol)
+                if columns is None:
+                    fields = await price_store.read_columns(symbol)
+                    if not fields["date"]:
+                        return None
+                    columns = await asyncio.to_thread(
+                        price_column_cache.write, PriceColumns.from_fields(symbol.upper(), fields)
                     )
-                
-                print(f"✅ Stored {len(price_documents)} historical price records for {symbol}")
-                return True
+        return columns.between(start, end)
+    
+    @staticmethod
+    async def sync_historical_prices(symbol: str, period: str = "10y") -> bool:
+        """
+        Bring stored OHLC history up to date, fetching only what is missing
+        
+        The symbol's coverage index (date ranges already synced) determines what
+        to download: the days since the last synced date, plus any gaps within
+        the period. Symbols without any stored history get a full download.
+        """
+        try:
+            resolved = await ticker_resolver.resolve(symbol)
+            if not resolved:
+                print(f"❌ No historical data found for {symbol}")
+                return False
+            
+            download = await HistoricalDataService._download_prices(symbol, resolved.ticker_symbol, period)
+            return await HistoricalDataService._store_prices(symbol, download)
             
         except Exception as e:
-            print(f"❌ Error fetching historical prices for {symbol}: {e}")
+            print(f"❌ Error syncing historical prices for {symbol}: {e}")
             return False
     
+    @staticmethod
+    async def needs_history_sync(symbol: str, max_age: timedelta) -> bool:
+        """Whether a symbol's history hasn't been synced up to within max_age of today"""
+        ranges = await HistoricalDataService._load_coverage(symbol, bootstrap=False)
+        return not ranges or max(end for _, end in ranges) < datetime.utcnow().date() - max_age
+    
+    @staticmethod
+    async def _download_prices(symbol: str, ticker_symbol: str, period: str, full: bool = False) -> PriceDownload:
+        """Download the whole period (`full`, or nothing synced yet) or only the ranges coverage is missing"""
+        today = datetime.utcnow().date()
+        window_start = HistoricalDataService._period_start(period, today)
+        ranges = await HistoricalDataService._load_coverage(symbol, bootstrap=not full)
+        
+        if full or not ranges:
+            hist = await market_data_provider.history(ticker_symbol, period=period)
+            return PriceDownload(ranges=ranges, frames=[(window_start, today, hist)], full=True)
+        
+        missing = HistoricalDataService._missing_ranges(ranges, window_start, today)
+        frames = await asyncio.gather(*[
+            market_data_provider.history_range(ticker_symbol, start.isoformat(), (end + timedelta(days=1)).isoformat())
+            for start, end in missing
+        ], return_exceptions=True)
+        
+        download = PriceDownload(ranges=ranges, frames=[], full=False)
+        for (start, end), hist in zip(missing, frames):
+            if isinstance(hist, Exception):
+                print(f"⚠️ Warning: Failed to fetch {symbol} history {start}..{end}: {hist}")
+                continue
+            download.frames.append((start, end, hist))
+        return download
+    
+    @staticmethod
+    async def _store_prices(symbol: str, download: PriceDownload) -> bool:
+        """Upsert downloaded bars, then record the ranges they brought up to date"""
+        ranges = download.ranges
+        stored = 0
+        for start, end, hist in download.frames:
+            # Upsert on the unique (symbol, date) key - re-running only overwrites
+            price_documents = HistoricalDataService._price_documents(symbol, hist)
+            if download.full and not price_documents:
+                print(f"❌ No historical data found for {symbol}")
+                return False
+            
+            written = await price_store.store(price_documents)
+            stored += written
+            async with price_column_cache.lock(symbol):
+                if written == len(price_documents):
+                    await asyncio.to_thread(price_column_cache.merge, symbol, price_documents)
+                else:
+                    # Only MongoDB knows which rows made it - rebuild from there on next read
+                    await asyncio.to_thread(price_column_cache.invalidate, symbol)
+            # No rows (holidays, not yet listed) still means the range is synced
+            if written == len(price_documents):
+                start = start or date.fromisoformat(price_documents[0]["date"])
+                ranges = HistoricalDataService._add_range(ranges, start, end)
+        
+        await HistoricalDataService._save_coverage(symbol, ranges)
+        if download.full:
+            print(f"✅ Stored {stored} historical price records for {symbol}")
+            return stored > 0
+        print(f"✅ Synced {stored} historical price records for {symbol} ({len(download.frames)} ranges)")
+        return True
+    
+    @staticmethod
+    def _period_start(period: str, today: date) -> Optional[date]:
+        """First day of a yfinance-style period ending today (None for max)"""
+        if period == "max":
+            return None
+        if period == "ytd":
+            return today.replace(month=1, day=1)
+        match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+        if not match:
+            raise ValueError(f"Unknown history period {period!r}")
+        unit = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}[match.group(2)]
+        return (pd.Timestamp(today) - pd.DateOffset(**{unit: int(match.group(1))})).date()
+    
+    @staticmethod
+    def _add_range(ranges: List[DateRange], start: date, end: date) -> List[DateRange]:
+        """Insert a synced range, merging ranges that overlap or only have a weekend between them"""
+        merged: List[DateRange] = []
+        for range_start, range_end in sorted([*ranges, (start, end)]):
+            if merged and np.busday_count(merged[-1][1] + timedelta(days=1), range_start) <= 0:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+        return merged
+    
+    @staticmethod
+    def _missing_ranges(ranges: List[DateRange], window_start: Optional[date], today: date) -> List[DateRange]:
+        """
+        Date ranges to fetch so that coverage spans window_start..today
+        
+        Gaps without a single weekday are skipped. The last synced day is always
+        fetched again, as it may have been stored before the session closed.
+        """
+        missing = []
+        cursor = window_start
+        for start, end in ranges:
+            if cursor is not None and cursor < start and np.busday_count(cursor, start) > 0:
+                missing.append((cursor, start - timedelta(days=1)))
+            cursor = max(cursor or end, end + timedelta(days=1))
+        missing.append((min(ranges[-1][1], today), today))
+        return missing
+    
+    @staticmethod
+    def _ranges_from_dates(dates: List[date]) -> List[DateRange]:
+        """
+        Coverage implied by stored rows
+        
+        Consecutive dates more than HISTORY_GAP_TOLERANCE_DAYS weekdays apart
+        (longer than any exchange holiday) start a new range, leaving a gap.
+        """
+        ranges: List[DateRange] = []
+        for day in dates:
+            if ranges and np.busday_count(ranges[-1][1] + timedelta(days=1), day) <= settings.HISTORY_GAP_TOLERANCE_DAYS:
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+        return ranges
+    
+    @staticmethod
+    async def _load_coverage(symbol: str, bootstrap: bool = True) -> List[DateRange]:
+        """
+        A symbol's synced date ranges
+        
+        History stored before coverage was tracked is indexed from its rows on
+        first use (with `bootstrap`), so gaps in it are detected and filled.
+        """
+        coverage = await HistoryCoverage.find_one({"symbol": symbol.upper()})
+        if coverage:
+            return [(date.fromisoformat(r.start), date.fromisoformat(r.end)) for r in coverage.ranges]
+        if not bootstrap:
+            return []
+        
+        dates = await price_store.dates(symbol)
+        return HistoricalDataService._ranges_from_dates([date.fromisoformat(day) for day in dates])
+    
+    @staticmethod
+    async def _save_coverage(symbol: str, ranges: List[DateRange]):
+        try:
+            await HistoryCoverage.get_motor_collection().update_one(
+                {"symbol": symbol.upper()},
+                {"$set": {
+                    "ranges": [{"start": start.isoformat(), "end": end.isoformat()} for start, end in ranges],
+                    "last_synced": datetime.utcnow(),
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to save history coverage for {symbol}: {e}")
+    
+    @staticmethod
+    def _price_documents(symbol: str, hist: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Convert an OHLC DataFrame to StockPrice documents
+        
+        Columns are converted as whole arrays and zipped into dicts of native
+        Python values, instead of boxing every row with iterrows(). Rows without
+        a complete OHLC quote are dropped and missing volume counts as 0.
+        """
+        if hist.empty:
+            return []
+        hist = hist.dropna(subset=["Open", "High", "Low", "Close"])
+        if hist.empty:
+            return []
+        
+        # Trading day in the exchange's own timezone
+        local_index = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+        close = hist["Close"].astype(float)
+        adj_close = hist["Adj Close"].astype(float).fillna(close) if "Adj Close" in hist.columns else close
+        columns = {
+            "timestamp": hist.index.to_pydatetime().tolist(),
+            "date": np.datetime_as_string(local_index.values, unit="D").tolist(),
+            "open_price": hist["Open"].astype(float).tolist(),
+            "high_price": hist["High"].astype(float).tolist(),
+            "low_price": hist["Low"].astype(float).tolist(),
+            "close_price": close.tolist(),
+            "adj_close_price": adj_close.tolist(),
+            "volume": hist["Volume"].fillna(0).astype("int64").tolist(),
+        }
+        symbol = symbol.upper()
+        keys = ["symbol", *columns]
+        return [dict(zip(keys, (symbol, *row))) for row in zip(*columns.values())]
+    
     @staticmethod
     async def fetch_and_store_financial_statements(symbol: str) -> bool:
         """Fetch and store quarterly and annual financial statements"""
         try:
-            ticker_symbol = f"{symbol.upper()}.NS"
-            
-            loop = asyncio.get_event_loop()
-            ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
+            resolved = await ticker_resolver.resolve(symbol)
+            if not resolved:
+                print(f"❌ No financial statements found for {symbol}")
+                return False
             
             # Get financial data
-            quarterly_financials = await loop.run_in_executor(None, lambda: ticker.quarterly_financials)
-            annual_financials = await loop.run_in_executor(None, lambda: ticker.financials)
-            
-            if quarterly_financials.empty and annual_financials.empty:
-                # Try without .NS suffix
-                ticker_symbol = symbol.upper()
-                ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
-                quarterly_financials = await loop.run_in_executor(None, lambda: ticker.quarterly_financials)
-                annual_financials = await loop.run_in_executor(None, lambda: ticker.financials)
+            quarterly_financials = await market_data_provider.statements(resolved.ticker_symbol, "income", "quarterly")
+            annual_financials = await market_data_provider.statements(resolved.ticker_symbol, "income", "annual")
             
             statements_stored = 0
             
@@ -128,21 +334,14 @@ class HistoricalDataService:
     async def fetch_and_store_balance_sheets(symbol: str) -> bool:
         """Fetch and store quarterly and annual balance sheets"""
         try:
-            ticker_symbol = f"{symbol.upper()}.NS"
-            
-            loop = asyncio.get_event_loop()
-            ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
+            resolved = await ticker_resolver.resolve(symbol)
+            if not resolved:
+                print(f"❌ No balance sheets found for {symbol}")
+                return False
             
             # Get balance sheet data
-            quarterly_balance_sheet = await loop.run_in_executor(None, lambda: ticker.quarterly_balance_sheet)
-            annual_balance_sheet = await loop.run_in_executor(None, lambda: ticker.balance_sheet)
-            
-            if quarterly_balance_sheet.empty and annual_balance_sheet.empty:
-                # Try without .NS suffix
-                ticker_symbol = symbol.upper()
-                ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
-                quarterly_balance_sheet = await loop.run_in_executor(None, lambda: ticker.quarterly_balance_sheet)
-                annual_balance_sheet = await loop.run_in_executor(None, lambda: ticker.balance_sheet)
+            quarterly_balance_sheet = await market_data_provider.statements(resolved.ticker_symbol, "balance_sheet", "quarterly")
+            annual_balance_sheet = await market_data_provider.statements(resolved.ticker_symbol, "balance_sheet", "annual")
             
             sheets_stored = 0
             
@@ -169,21 +368,14 @@ class HistoricalDataService:
     async def fetch_and_store_cash_flows(symbol: str) -> bool:
         """Fetch and store quarterly and annual cash flow statements"""
         try:
-            ticker_symbol = f"{symbol.upper()}.NS"
-            
-            loop = asyncio.get_event_loop()
-            ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
+            resolved = await ticker_resolver.resolve(symbol)
+            if not resolved:
+                print(f"❌ No cash flow statements found for {symbol}")
+                return False
             
             # Get cash flow data
-            quarterly_cashflow = await loop.run_in_executor(None, lambda: ticker.quarterly_cashflow)
-            annual_cashflow = await loop.run_in_executor(None, lambda: ticker.cashflow)
-            
-            if quarterly_cashflow.empty and annual_cashflow.empty:
-                # Try without .NS suffix
-                ticker_symbol = symbol.upper()
-                ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
-                quarterly_cashflow = await loop.run_in_executor(None, lambda: ticker.quarterly_cashflow)
-                annual_cashflow = await loop.run_in_executor(None, lambda: ticker.cashflow)
+            quarterly_cashflow = await market_data_provider.statements(resolved.ticker_symbol, "cash_flow", "quarterly")
+            annual_cashflow = await market_data_provider.statements(resolved.ticker_symbol, "cash_flow", "annual")
             
             cashflows_stored = 0
             
@@ -207,29 +399,88 @@ class HistoricalDataService:
             return False
     
     @staticmethod
-    async def fetch_and_store_complete_historical_data(symbol: str) -> Dict[str, bool]:
+    async def fetch_and_store_complete_historical_data(symbol: str, period: str = "10y") -> Dict[str, bool]:
         """Fetch and store all historical data for a symbol"""
-        results = {}
-        
         print(f"🔄 Fetching complete historical data for {symbol}...")
         
-        # Fetch historical prices
-        results['prices'] = await HistoricalDataService.fetch_and_store_historical_prices(symbol)
-        
-        # Fetch financial statements
-        results['financials'] = await HistoricalDataService.fetch_and_store_financial_statements(symbol)
-        
-        # Fetch balance sheets
-        results['balance_sheets'] = await HistoricalDataService.fetch_and_store_balance_sheets(symbol)
-        
-        # Fetch cash flows
-        results['cash_flows'] = await HistoricalDataService.fetch_and_store_cash_flows(symbol)
+        history = await HistoricalDataService.fetch_complete_historical_data(symbol, period)
+        if history is None:
+            results = {category: False for category in ("prices", "financials", "balance_sheets", "cash_flows")}
+        else:
+            results = await HistoricalDataService.store_complete_historical_data(history)
         
         success_count = sum(1 for success in results.values() if success)
         print(f"📊 Historical data fetch for {symbol}: {success_count}/4 categories successful")
         
         return results
     
+    @staticmethod
+    async def fetch_complete_historical_data(symbol: str, period: str = "10y") -> Optional[CompleteHistory]:
+        """
+        Download prices and every financial statement for a symbol
+        
+        The ticker is resolved once; the price download (incremental, as in
+        sync_historical_prices) and the six statement frames, which share one
+        upstream session, run concurrently. Parts that fail are left empty.
+        """
+        resolved = await ticker_resolver.resolve(symbol)
+        if not resolved:
+            print(f"❌ No historical data found for {symbol}")
+            return None
+        
+        prices, statements = await asyncio.gather(
+            HistoricalDataService._download_prices(symbol, resolved.ticker_symbol, period),
+            market_data_provider.all_statements(resolved.ticker_symbol),
+            return_exceptions=True
+        )
+        if isinstance(prices, Exception):
+            print(f"❌ Error fetching historical prices for {symbol}: {prices}")
+            prices = None
+        if isinstance(statements, Exception):
+            print(f"❌ Error fetching financial statements for {symbol}: {statements}")
+            statements = {}
+        return CompleteHistory(symbol=symbol, prices=prices, statements=statements)
+    
+    @staticmethod
+    async def store_complete_historical_data(history: CompleteHistory) -> Dict[str, bool]:
+        """Store everything a complete fetch downloaded; returns per-category success"""
+        symbol = history.symbol
+        
+        async def store_prices() -> bool:
+            if history.prices is None:
+                return False
+            try:
+                return await HistoricalDataService._store_prices(symbol, history.prices)
+            except Exception as e:
+                print(f"❌ Error storing historical prices for {symbol}: {e}")
+                return False
+        
+        async def store_statements(statement: str, label: str, store) -> bool:
+            try:
+                stored = 0
+                for frequency in ("quarterly", "annual"):
+                    frame = history.statements.get((statement, frequency))
+                    if frame is not None and not frame.empty:
+                        stored += await store(symbol, frame, frequency)
+                print(f"✅ Stored {stored} {label} for {symbol}")
+                return stored > 0
+            except Exception as e:
+                print(f"❌ Error storing {label} for {symbol}: {e}")
+                return False
+        
+        prices, financials, balance_sheets, cash_flows = await asyncio.gather(
+            store_prices(),
+            store_statements("income", "financial statements", HistoricalDataService._store_financial_statements),
+            store_statements("balance_sheet", "balance sheets", HistoricalDataService._store_balance_sheets),
+            store_statements("cash_flow", "cash flow statements", HistoricalDataService._store_cash_flows),
+        )
+        return {
+            "prices": prices,
+            "financials": financials,
+            "balance_sheets": balance_sheets,
+            "cash_flows": cash_flows,
+        }
+    
     @staticmethod
     async def _store_financial_statements(symbol: str, df: pd.DataFrame, period_type: str) -> int:
         """Helper method to store financial statements"""
@@ -292,7 +543,7 @@ class HistoricalDataService:
                         financial_data['profit_margin'] = (net_income / revenue) * 100
                 
                 # Store in MongoDB
-                await FinancialStatement.find_one_and_update(
+                await FinancialStatement.get_motor_collection().update_one(
                     {"symbol": symbol.upper(), "period_string": period_string},
                     {"$set": financial_data},
                     upsert=True
@@ -371,7 +622,7 @@ class HistoricalDataService:
                     balance_sheet_data['debt_to_assets'] = total_debt / total_assets
                 
                 # Store in MongoDB
-                await BalanceSheet.find_one_and_update(
+                await BalanceSheet.get_motor_collection().update_one(
                     {"symbol": symbol.upper(), "period_string": period_string},
                     {"$set": balance_sheet_data},
                     upsert=True
@@ -437,7 +688,7 @@ class HistoricalDataService:
                         cash_flow_data['free_cash_flow'] = operating_cf + capex  # capex is usually negative
                 
                 # Store in MongoDB
-                await CashFlow.find_one_and_update(
+                await CashFlow.get_motor_collection().update_one(
                     {"symbol": symbol.upper(), "period_string": period_string},
                     {"$set": cash_flow_data},
                     upsert=True
@@ -7,6 +7,7 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import statistics
 import math
+from app.services.symbol_registry import symbol_registry
 
 @dataclass
 class IndustryBenchmark:
@@ -31,97 +32,8 @@ class PeerComparison:
 class IndustryAnalysisService:
     """Service for industry analysis and peer comparison"""
     
-    # Industry classification for Indian stocks
-    INDUSTRY_MAPPING = {
-        # Technology & IT Services
-        'TCS': 'IT Services',
-        'INFY': 'IT Services', 
-        'WIPRO': 'IT Services',
-        'HCLTECH': 'IT Services',
-        'TECHM': 'IT Services',
-        'LTI': 'IT Services',
-        'MINDTREE': 'IT Services',
-        
-        # Banking & Financial Services
-        'HDFCBANK': 'Private Banking',
-        'ICICIBANK': 'Private Banking',
-        'KOTAKBANK': 'Private Banking',
-        'AXISBANK': 'Private Banking',
-        'INDUSINDBK': 'Private Banking',
-        'SBIN': 'Public Banking',
-        'PNB': 'Public Banking',
-        'CANFIN': 'Public Banking',
-        
-        # Non-Banking Financial Services
-        'BAJFINANCE': 'NBFC',
-        'BAJAJFINSV': 'NBFC',
-        'HDFCLIFE': 'Insurance',
-        'SBILIFE': 'Insurance',
-        'ICICIPRULI': 'Insurance',
-        
-        # Oil & Gas
-        'RELIANCE': 'Oil & Gas',
-        'ONGC': 'Oil & Gas',
-        'BPCL': 'Oil & Gas',
-        'IOCL': 'Oil & Gas',
-        'GAIL': 'Oil & Gas',
-        
-        # Automobiles
-        'MARUTI': 'Automobiles',
-        'TATAMOTORS': 'Automobiles',
-        'M&M': 'Automobiles',
-        'BAJAJ-AUTO': 'Automobiles',
-        'EICHERMOT': 'Automobiles',
-        'HEROMOTOCO': 'Automobiles',
-        
-        # Pharmaceuticals
-        'SUNPHARMA': 'Pharmaceuticals',
-        'DRREDDY': 'Pharmaceuticals',
-        'CIPLA': 'Pharmaceuticals',
-        'BIOCON': 'Pharmaceuticals',
-        'LUPIN': 'Pharmaceuticals',
-        'AUROPHARMA': 'Pharmaceuticals',
-        
-        # FMCG & Consumer Goods
-        'HINDUNILVR': 'FMCG',
-        'ITC': 'FMCG',
-        'NESTLEIND': 'FMCG',
-        'BRITANNIA': 'FMCG',
-        'DABUR': 'FMCG',
-        'GODREJCP': 'FMCG',
-        'MARICO': 'FMCG',
-        
-        # Retail
-        'TRENT': 'Retail',
-        'AVENUE': 'Retail',
-        'SHOPSSTOP': 'Retail',
-        
-        # Metals & Mining
-        'TATASTEEL': 'Metals',
-        'JSWSTEEL': 'Metals',
-        'HINDALCO': 'Metals',
-        'VEDL': 'Metals',
-        'NMDC': 'Metals',
-        'COALINDIA': 'Mining',
-        
-        # Power & Infrastructure
-        'NTPC': 'Power',
-        'POWERGRID': 'Power',
-        'LT': 'Infrastructure',
-        'ADANIPORTS': 'Infrastructure',
-        
-        # Telecom
-        'BHARTIARTL': 'Telecom',
-        'IDEA': 'Telecom',
-        
-        # Cement
-        'ULTRACEMCO': 'Cement',
-        'ACC': 'Cement',
-        'AMBUJCEM': 'Cement',
-        'SHREECEM': 'Cement',
-    }
-    
-    # Industry benchmark data (approximate values for Indian markets)
+    # Industry benchmark data (approximate values for Indian markets), keyed by
+    # the Industry column of the symbol master
     INDUSTRY_BENCHMARKS = {
         'IT Services': IndustryBenchmark(
             pe_ratio_avg=25.0, pb_ratio_avg=8.5, profit_margin_avg=22.0,
@@ -188,7 +100,7 @@ class IndustryAnalysisService:
     @staticmethod
     def get_industry(symbol: str) -> Optional[str]:
         """Get industry for a stock symbol"""
-        return IndustryAnalysisService.INDUSTRY_MAPPING.get(symbol.upper())
+        return symbol_registry.industry(symbol)
     
     @staticmethod
     def get_peers(symbol: str) -> List[str]:
@@ -198,8 +110,8 @@ class IndustryAnalysisService:
             return []
         
         peers = [
-            s for s, i in IndustryAnalysisService.INDUSTRY_MAPPING.items() 
-            if i == industry and s != symbol.upper()
+            s for s in symbol_registry.symbols_in_industry(industry)
+            if s != symbol.upper()
         ]
         return peers[:4]  # Return top 4 peers
     
@@ -0,0 +1,407 @@
+"""
+Market Data Provider
+Pluggable upstream access (quote, history, info, statements, news, recommendations)
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from pathlib import Path
+import asyncio
+import re
+import time
+import pandas as pd
+import yfinance as yf
+from app.core.config import settings
+from app.core.executor import UpstreamExecutor
+from app.core.resilience import CircuitBreaker, TokenBucket, UpstreamUnavailableError
+
+class MarketDataProvider(ABC):
+    """
+    Upstream market data source.
+
+    Services call the public coroutines; implementations provide the
+    underscore-prefixed hooks. Every call is timed per method so provider
+    implementations can be compared via get_stats().
+    """
+
+    name = "base"
+
+    # statement -> (quarterly attribute, annual attribute) on yf.Ticker
+    STATEMENTS = {
+        "income": ("quarterly_financials", "financials"),
+        "balance_sheet": ("quarterly_balance_sheet", "balance_sheet"),
+        "cash_flow": ("quarterly_cashflow", "cashflow"),
+    }
+
+    def __init__(self):
+        # method -> {"calls", "errors", "total_seconds", "max_seconds"}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    async def quote(self, ticker_symbol: str) -> pd.DataFrame:
+        """Last two daily bars, from which the live quote is derived"""
+        return await self._timed("quote", lambda: self._history(ticker_symbol, "2d"))
+
+    async def history(self, ticker_symbol: str, period: str = "1mo") -> pd.DataFrame:
+        """Daily OHLCV bars for a period (1d, 5d, 1mo, ... 10y, ytd, max)"""
+        return await self._timed("history", lambda: self._history(ticker_symbol, period))
+
+    async def history_range(self, ticker_symbol: str, start: str, end: str) -> pd.DataFrame:
+        """Daily OHLCV bars from start up to, but excluding, end (YYYY-MM-DD)"""
+        return await self._timed("history_range", lambda: self._history_range(ticker_symbol, start, end))
+
+    async def history_batch(self, ticker_symbols: List[str], period: str = "2d") -> Dict[str, pd.DataFrame]:
+        """Daily bars for many tickers; tickers without data are omitted"""
+        return await self._timed("history_batch", lambda: self._history_batch(ticker_symbols, period))
+
+    async def info(self, ticker_symbol: str) -> Dict[str, Any]:
+        """Company profile, valuation and analyst target fields"""
+        return await self._timed("info", lambda: self._info(ticker_symbol))
+
+    async def statements(self, ticker_symbol: str, statement: str, frequency: str = "quarterly") -> pd.DataFrame:
+        """
+        Financial statement frame (line items x period end dates)
+
+        Args:
+            statement: "income", "balance_sheet" or "cash_flow"
+            frequency: "quarterly" or "annual"
+        """
+        if statement not in self.STATEMENTS or frequency not in ("quarterly", "annual"):
+            raise ValueError(f"Unknown statement {statement!r} ({frequency})")
+        return await self._timed("statements", lambda: self._statements(ticker_symbol, statement, frequency))
+
+    async def all_statements(self, ticker_symbol: str) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        Every statement frame, keyed by (statement, frequency), fetched concurrently
+
+        Frames that fail to download are left out.
+        """
+        return await self._timed("all_statements", lambda: self._all_statements(ticker_symbol))
+
+    async def news(self, ticker_symbol: str) -> List[Dict[str, Any]]:
+        """Recent news items"""
+        return await self._timed("news", lambda: self._news(ticker_symbol))
+
+    async def recommendations(self, ticker_symbol: str) -> Optional[pd.DataFrame]:
+        """Analyst recommendation counts by period"""
+        return await self._timed("recommendations", lambda: self._recommendations(ticker_symbol))
+
+    @abstractmethod
+    async def _history(self, ticker_symbol: str, period: str) -> pd.DataFrame: ...
+
+    @abstractmethod
+    async def _history_range(self, ticker_symbol: str, start: str, end: str) -> pd.DataFrame: ...
+
+    async def _history_batch(self, ticker_symbols: List[str], period: str) -> Dict[str, pd.DataFrame]:
+        frames = await asyncio.gather(*[self._history(t, period) for t in ticker_symbols])
+        return {t: frame for t, frame in zip(ticker_symbols, frames) if not frame.empty}
+
+    @abstractmethod
+    async def _info(self, ticker_symbol: str) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    async def _statements(self, ticker_symbol: str, statement: str, frequency: str) -> pd.DataFrame: ...
+
+    async def _all_statements(self, ticker_symbol: str) -> Dict[Tuple[str, str], pd.DataFrame]:
+        return await self._gather_statements(
+            ticker_symbol, lambda statement, frequency: self._statements(ticker_symbol, statement, frequency)
+        )
+
+    async def _gather_statements(
+        self, ticker_symbol: str, fetch: Callable[[str, str], Awaitable[pd.DataFrame]]
+    ) -> Dict[Tuple[str, str], pd.DataFrame]:
+        keys = [(statement, frequency) for statement in self.STATEMENTS for frequency in ("quarterly", "annual")]
+        frames = await asyncio.gather(*[fetch(*key) for key in keys], return_exceptions=True)
+        statements = {}
+        for (statement, frequency), frame in zip(keys, frames):
+            if isinstance(frame, Exception):
+                print(f"⚠️ Warning: Failed to fetch {frequency} {statement} for {ticker_symbol}: {frame}")
+            elif isinstance(frame, BaseException):
+                raise frame
+            else:
+                statements[(statement, frequency)] = frame
+        return statements
+
+    @abstractmethod
+    async def _news(self, ticker_symbol: str) -> List[Dict[str, Any]]: ...
+
+    @abstractmethod
+    async def _recommendations(self, ticker_symbol: str) -> Optional[pd.DataFrame]: ...
+
+    async def _timed(self, method: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        stats = self._stats.setdefault(
+            method, {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        stats["calls"] += 1
+        started = time.perf_counter()
+        try:
+            return await fn()
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-method call counts and latencies"""
+        return {
+            "provider": self.name,
+            "methods": {
+                method: {
+                    **stats,
+                    "avg_seconds": stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0,
+                }
+                for method, stats in self._stats.items()
+            },
+        }
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Yahoo Finance via yfinance.
+
+    Every call is guarded by the upstream circuit breaker before it is queued
+    on the dedicated upstream executor, and rate limited once it holds an
+    executor slot, so a throttling upstream fails fast instead of
+    accumulating doomed jobs.
+    """
+
+    name = "yfinance"
+
+    @staticmethod
+    async def _run(fn: Callable[[], Any]) -> Any:
+        upstream_circuit.before_call()
+        try:
+            # The token is taken once the call holds an executor slot, so a
+            # backlog of background calls can't exhaust interactive calls' max_wait
+            result = await upstream_executor.run(fn, before_start=upstream_rate_limiter.acquire)
+        except (UpstreamUnavailableError, asyncio.CancelledError):
+            upstream_circuit.cancel_call()
+            raise
+        except Exception:
+            upstream_circuit.record_failure()
+            raise
+        upstream_circuit.record_success()
+        return result
+
+    async def _history(self, ticker_symbol: str, period: str) -> pd.DataFrame:
+        return await self._run(lambda: yf.Ticker(ticker_symbol).history(period=period))
+
+    async def _history_range(self, ticker_symbol: str, start: str, end: str) -> pd.DataFrame:
+        return await self._run(lambda: yf.Ticker(ticker_symbol).history(start=start, end=end))
+
+    async def _history_batch(self, ticker_symbols: List[str], period: str) -> Dict[str, pd.DataFrame]:
+        # One multi-ticker request instead of one per ticker
+        data = await self._run(
+            lambda: yf.download(
+                tickers=ticker_symbols,
+                period=period,
+                group_by="ticker",
+                threads=True,
+                progress=False,
+                auto_adjust=False,
+            )
+        )
+        if data is None or data.empty:
+            return {}
+
+        frames = {}
+        if isinstance(data.columns, pd.MultiIndex):
+            available = set(data.columns.get_level_values(0))
+            for ticker_symbol in ticker_symbols:
+                if ticker_symbol in available:
+                    frame = data[ticker_symbol].dropna(how="all")
+                    if not frame.empty:
+                        frames[ticker_symbol] = frame
+        elif len(ticker_symbols) == 1:
+            frame = data.dropna(how="all")
+            if not frame.empty:
+                frames[ticker_symbols[0]] = frame
+        return frames
+
+    async def _info(self, ticker_symbol: str) -> Dict[str, Any]:
+        return await self._run(lambda: yf.Ticker(ticker_symbol).info)
+
+    async def _statements(self, ticker_symbol: str, statement: str, frequency: str) -> pd.DataFrame:
+        return await self._statement_of(yf.Ticker(ticker_symbol), statement, frequency)
+
+    async def _all_statements(self, ticker_symbol: str) -> Dict[Tuple[str, str], pd.DataFrame]:
+        # One yf.Ticker (one session and crumb) shared by all six downloads
+        ticker = yf.Ticker(ticker_symbol)
+        return await self._gather_statements(
+            ticker_symbol, lambda statement, frequency: self._statement_of(ticker, statement, frequency)
+        )
+
+    async def _statement_of(self, ticker: yf.Ticker, statement: str, frequency: str) -> pd.DataFrame:
+        quarterly_attr, annual_attr = self.STATEMENTS[statement]
+        attr = quarterly_attr if frequency == "quarterly" else annual_attr
+        return await self._run(lambda: getattr(ticker, attr))
+
+    async def _news(self, ticker_symbol: str) -> List[Dict[str, Any]]:
+        return await self._run(lambda: yf.Ticker(ticker_symbol).news)
+
+    async def _recommendations(self, ticker_symbol: str) -> Optional[pd.DataFrame]:
+        return await self._run(lambda: yf.Ticker(ticker_symbol).recommendations)
+
+class RecordingNotFoundError(LookupError):
+    """Replay was asked for a response that was never recorded"""
+
+class _RecordingStore:
+    """Captured responses on disk, one pickle per method call"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def path(self, method: str, *args: str) -> Path:
+        key = "__".join(re.sub(r"[^A-Za-z0-9._-]", "_", str(arg)) for arg in args)
+        return self.directory / method / f"{key}.pkl"
+
+    def save(self, value: Any, method: str, *args: str):
+        path = self.path(method, *args)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.to_pickle(value, path)
+
+    def load(self, method: str, *args: str) -> Any:
+        path = self.path(method, *args)
+        if not path.exists():
+            raise RecordingNotFoundError(f"No recorded {method} response for {', '.join(args)}")
+        return pd.read_pickle(path)
+
+class RecordingProvider(MarketDataProvider):
+    """Pass-through to another provider that captures every response to disk"""
+
+    name = "record"
+
+    def __init__(self, inner: MarketDataProvider, directory: str):
+        super().__init__()
+        self.inner = inner
+        self.store = _RecordingStore(directory)
+
+    async def _history(self, ticker_symbol: str, period: str) -> pd.DataFrame:
+        value = await self.inner._history(ticker_symbol, period)
+        self.store.save(value, "history", ticker_symbol, period)
+        return value
+
+    async def _history_range(self, ticker_symbol: str, start: str, end: str) -> pd.DataFrame:
+        value = await self.inner._history_range(ticker_symbol, start, end)
+        self.store.save(value, "history_range", ticker_symbol, start, end)
+        return value
+
+    async def _history_batch(self, ticker_symbols: List[str], period: str) -> Dict[str, pd.DataFrame]:
+        frames = await self.inner._history_batch(ticker_symbols, period)
+        # Recorded per ticker so replay can serve any combination of them
+        for ticker_symbol in ticker_symbols:
+            self.store.save(frames.get(ticker_symbol, pd.DataFrame()), "history_batch", ticker_symbol, period)
+        return frames
+
+    async def _info(self, ticker_symbol: str) -> Dict[str, Any]:
+        value = await self.inner._info(ticker_symbol)
+        self.store.save(value, "info", ticker_symbol)
+        return value
+
+    async def _statements(self, ticker_symbol: str, statement: str, frequency: str) -> pd.DataFrame:
+        value = await self.inner._statements(ticker_symbol, statement, frequency)
+        self.store.save(value, "statements", ticker_symbol, statement, frequency)
+        return value
+
+    async def _all_statements(self, ticker_symbol: str) -> Dict[Tuple[str, str], pd.DataFrame]:
+        statements = await self.inner._all_statements(ticker_symbol)
+        # Recorded like single statements, so replay serves either call
+        for (statement, frequency), value in statements.items():
+            self.store.save(value, "statements", ticker_symbol, statement, frequency)
+        return statements
+
+    async def _news(self, ticker_symbol: str) -> List[Dict[str, Any]]:
+        value = await self.inner._news(ticker_symbol)
+        self.store.save(value, "news", ticker_symbol)
+        return value
+
+    async def _recommendations(self, ticker_symbol: str) -> Optional[pd.DataFrame]:
+        value = await self.inner._recommendations(ticker_symbol)
+        self.store.save(value, "recommendations", ticker_symbol)
+        return value
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves responses captured by RecordingProvider, fully offline.
+
+    An optional fixed latency per call emulates the upstream round trip so the
+    service stack can be benchmarked deterministically.
+    """
+
+    name = "replay"
+
+    def __init__(self, directory: str, latency_seconds: float = 0.0):
+        super().__init__()
+        self.store = _RecordingStore(directory)
+        self.latency_seconds = latency_seconds
+
+    async def _load(self, method: str, *args: str) -> Any:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self.store.load(method, *args)
+
+    async def _history(self, ticker_symbol: str, period: str) -> pd.DataFrame:
+        return await self._load("history", ticker_symbol, period)
+
+    async def _history_range(self, ticker_symbol: str, start: str, end: str) -> pd.DataFrame:
+        return await self._load("history_range", ticker_symbol, start, end)
+
+    async def _history_batch(self, ticker_symbols: List[str], period: str) -> Dict[str, pd.DataFrame]:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        frames = {}
+        for ticker_symbol in ticker_symbols:
+            try:
+                frame = self.store.load("history_batch", ticker_symbol, period)
+            except RecordingNotFoundError:
+                continue
+            if not frame.empty:
+                frames[ticker_symbol] = frame
+        return frames
+
+    async def _info(self, ticker_symbol: str) -> Dict[str, Any]:
+        return await self._load("info", ticker_symbol)
+
+    async def _statements(self, ticker_symbol: str, statement: str, frequency: str) -> pd.DataFrame:
+        return await self._load("statements", ticker_symbol, statement, frequency)
+
+    async def _news(self, ticker_symbol: str) -> List[Dict[str, Any]]:
+        return await self._load("news", ticker_symbol)
+
+    async def _recommendations(self, ticker_symbol: str) -> Optional[pd.DataFrame]:
+        return await self._load("recommendations", ticker_symbol)
+
+def create_market_data_provider(
+    kind: Optional[str] = None, directory: Optional[str] = None
+) -> MarketDataProvider:
+    """Build the provider selected by MARKET_DATA_PROVIDER (yfinance, record or replay)"""
+    kind = (kind or settings.MARKET_DATA_PROVIDER).lower()
+    directory = directory or settings.MARKET_DATA_RECORDINGS_DIR
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if kind == "record":
+        return RecordingProvider(YFinanceProvider(), directory)
+    if kind == "replay":
+        return ReplayProvider(directory, latency_seconds=settings.MARKET_DATA_REPLAY_LATENCY_MS / 1000)
+    raise ValueError(f"Unknown market data provider: {kind}")
+
+# Global upstream guards, executor and market data provider instances
+upstream_rate_limiter = TokenBucket(
+    "upstream",
+    rate=settings.UPSTREAM_RATE_LIMIT_PER_SECOND,
+    burst=settings.UPSTREAM_RATE_LIMIT_BURST,
+    max_wait=settings.UPSTREAM_RATE_LIMIT_MAX_WAIT_SECONDS,
+)
+upstream_circuit = CircuitBreaker(
+    "upstream",
+    failure_threshold=settings.UPSTREAM_CIRCUIT_FAILURE_THRESHOLD,
+    open_seconds=settings.UPSTREAM_CIRCUIT_OPEN_SECONDS,
+    max_open_seconds=settings.UPSTREAM_CIRCUIT_MAX_OPEN_SECONDS,
+)
+upstream_executor = UpstreamExecutor(
+    "upstream",
+    max_workers=settings.UPSTREAM_MAX_WORKERS,
+    background_max_workers=settings.UPSTREAM_BACKGROUND_MAX_WORKERS,
+)
+market_data_provider = create_market_data_provider()
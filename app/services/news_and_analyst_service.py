@@ -6,10 +6,11 @@ Provides real-time news and analyst recommendations for Indian stocks
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-import yfinance as yf
 import asyncio
 import re
 from enum import Enum
+from app.services.market_data_provider import market_data_provider
+from app.services.ticker_resolver import ticker_resolver
 
 class RecommendationType(str, Enum):
     STRONG_BUY = "Strong Buy"
@@ -83,20 +84,13 @@ class NewsAndAnalystService:
     async def get_stock_news(symbol: str, limit: int = 5) -> List[NewsItem]:
         """Get recent news for a stock symbol"""
         try:
-            # Try NSE symbol first
-            ticker_symbol = f"{symbol.upper()}.NS"
-            
-            loop = asyncio.get_event_loop()
-            ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
-            
-            # Get news from yfinance
-            news_data = await loop.run_in_executor(None, lambda: ticker.news)
+            # Use the shared resolver instead of guessing .NS then bare symbol
+            resolved = await ticker_resolver.resolve(symbol)
+            if not resolved:
+                return NewsAndAnalystService._generate_sample_news(symbol)
             
-            if not news_data:
-                # Try without .NS suffix
-                ticker_symbol = symbol.upper()
-                ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
-                news_data = await loop.run_in_executor(None, lambda: ticker.news)
+            # Get news from the market data provider
+            news_data = await market_data_provider.news(resolved.ticker_symbol)
             
             if not news_data:
                 return NewsAndAnalystService._generate_sample_news(symbol)
@@ -164,21 +158,13 @@ class NewsAndAnalystService:
     async def get_analyst_recommendations(symbol: str) -> Optional[ConsensusRating]:
         """Get analyst recommendations and consensus"""
         try:
-            ticker_symbol = f"{symbol.upper()}.NS"
-            
-            loop = asyncio.get_event_loop()
-            ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
+            resolved = await ticker_resolver.resolve(symbol)
+            if not resolved:
+                return NewsAndAnalystService._generate_sample_consensus(symbol)
             
             # Get analyst recommendations
-            recommendations = await loop.run_in_executor(None, lambda: ticker.recommendations)
-            analyst_info = await loop.run_in_executor(None, lambda: ticker.info)
-            
-            if recommendations is None or recommendations.empty:
-                # Try without .NS suffix
-                ticker_symbol = symbol.upper()
-                ticker = await loop.run_in_executor(None, lambda: yf.Ticker(ticker_symbol))
-                recommendations = await loop.run_in_executor(None, lambda: ticker.recommendations)
-                analyst_info = await loop.run_in_executor(None, lambda: ticker.info)
+            recommendations = await market_data_provider.recommendations(resolved.ticker_symbol)
+            analyst_info = await market_data_provider.info(resolved.ticker_symbol)
             
             # Extract target price info
             target_high = analyst_info.get('targetHighPrice')
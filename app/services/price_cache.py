@@ -0,0 +1,289 @@
+"""
+Price Column Cache
+Per-symbol daily bars as memory-mapped NumPy columns for analytics reads
+"""
+
+from typing import Any, Dict, List, Optional, Union
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+import asyncio
+import logging
+import os
+import struct
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Column -> (dtype, StockPrice field it is built from)
+COLUMNS = {
+    "dates": ("datetime64[D]", "date"),
+    "timestamps": ("datetime64[ms]", "timestamp"),
+    "open": ("float64", "open_price"),
+    "high": ("float64", "high_price"),
+    "low": ("float64", "low_price"),
+    "close": ("float64", "close_price"),
+    "adj_close": ("float64", "adj_close_price"),
+    "volume": ("int64", "volume"),
+}
+
+# One cache file row: a day's bar with every column
+RECORD = np.dtype([(name, dtype) for name, (dtype, _) in COLUMNS.items()])
+
+def _header_text(count: Union[int, str]) -> str:
+    descr = np.lib.format.dtype_to_descr(RECORD)
+    return f"{{'descr': {descr!r}, 'fortran_order': False, 'shape': ({count},), }}"
+
+# NPY 1.0 header size, padded for any row count so appends can rewrite it in place
+HEADER_SIZE = -(-(10 + len(_header_text("9" * 21)) + 1) // 64) * 64
+
+def _header(count: int) -> bytes:
+    """NPY 1.0 header of a file holding `count` records"""
+    text = _header_text(count).ljust(HEADER_SIZE - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", HEADER_SIZE - 10) + text.encode("latin1")
+
+class PriceColumns:
+    """
+    A symbol's daily bars as column arrays, sorted by date.
+
+    Arrays read from the cache are read-only (strided) views into the
+    memory-mapped file; between() narrows them to a date range without copying.
+    """
+
+    def __init__(self, symbol: str, columns: Dict[str, np.ndarray]):
+        self.symbol = symbol
+        self.dates: np.ndarray = columns["dates"]
+        self.timestamps: np.ndarray = columns["timestamps"]
+        self.open: np.ndarray = columns["open"]
+        self.high: np.ndarray = columns["high"]
+        self.low: np.ndarray = columns["low"]
+        self.close: np.ndarray = columns["close"]
+        self.adj_close: np.ndarray = columns["adj_close"]
+        self.volume: np.ndarray = columns["volume"]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def between(
+        self, start: Optional[Union[date, str]] = None, end: Optional[Union[date, str]] = None
+    ) -> "PriceColumns":
+        """Bars from start to end (inclusive, open-ended if None) as views of these arrays"""
+        low = np.searchsorted(self.dates, np.datetime64(start, "D"), "left") if start else 0
+        high = np.searchsorted(self.dates, np.datetime64(end, "D"), "right") if end else len(self.dates)
+        return PriceColumns(self.symbol, {name: values[low:high] for name, values in self.columns.items()})
+
+    def to_frame(self) -> pd.DataFrame:
+        """OHLCV DataFrame indexed by date (copies the data)"""
+        columns = self.columns
+        index = pd.DatetimeIndex(columns.pop("dates"), name="date")
+        return pd.DataFrame(columns, index=index)
+
+    @staticmethod
+    def from_fields(symbol: str, fields: Dict[str, List[Any]]) -> "PriceColumns":
+        """
+        Build from parallel lists keyed by StockPrice field, as returned by
+        PriceStore.read_columns(); rows are sorted and a date keeps its last row
+        """
+        columns = {}
+        for name, (dtype, field_name) in COLUMNS.items():
+            values = fields[field_name]
+            if name == "timestamps":
+                # Naive values (read back from MongoDB) are UTC
+                values = pd.to_datetime(values, utc=True).tz_convert(None).values
+            elif name == "adj_close":
+                values = [np.nan if value is None else value for value in values]
+            columns[name] = np.asarray(values).astype(dtype)
+        return PriceColumns(symbol, PriceColumns._deduplicate(columns))
+
+    @staticmethod
+    def _deduplicate(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Sort by date, keeping the last occurrence of each date"""
+        order = np.argsort(columns["dates"], kind="stable")
+        dates = columns["dates"][order]
+        keep = np.append(dates[1:] != dates[:-1], True)
+        return {name: values[order][keep] for name, values in columns.items()}
+
+class PriceColumnCache:
+    """
+    On-disk columnar copy of stored daily prices, one file per symbol.
+
+    Each file is a .npy of day records (RECORD), so one memory map (one file
+    descriptor) serves every column. New days are appended in place and the
+    header, padded to a fixed size, is rewritten with the new row count;
+    re-fetched days overwrite their rows. Only days landing inside the cached
+    range rewrite the whole file, via a temporary path renamed into place.
+    At most `max_open` symbols stay mapped.
+
+    The cache is built from MongoDB on a symbol's first read and afterwards
+    kept current by the ingestion path via merge(). Both do blocking file
+    I/O: call them off the event loop, holding lock(symbol), so a build
+    cannot overwrite rows merged meanwhile.
+    """
+
+    def __init__(self, directory: str, max_open: int):
+        self.directory = Path(directory)
+        self.max_open = max_open
+        self._open: "OrderedDict[str, PriceColumns]" = OrderedDict()
+        self._open_lock = threading.Lock()
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.appends = 0
+
+    def path(self, symbol: str) -> Path:
+        return self.directory / f"{symbol.upper()}.npy"
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._open or self.path(symbol).exists()
+
+    def lock(self, symbol: str) -> asyncio.Lock:
+        """Lock serializing builds and merges of a symbol's cache"""
+        symbol = symbol.upper()
+        lock = self._locks.get(symbol)
+        if lock is None:
+            lock = self._locks[symbol] = asyncio.Lock()
+        return lock
+
+    def get(self, symbol: str) -> Optional[PriceColumns]:
+        """A symbol's cached columns, memory-mapped on first access"""
+        symbol = symbol.upper()
+        with self._open_lock:
+            columns = self._open.get(symbol)
+            if columns is not None:
+                self._open.move_to_end(symbol)
+        if columns is None:
+            columns = self._map(symbol)
+        if columns is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return columns
+
+    def write(self, columns: PriceColumns) -> PriceColumns:
+        """Replace a symbol's cache file; returns the memory-mapped columns"""
+        records = self._records(columns)
+        path = self.path(columns.symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temporary, "wb") as file:
+            file.write(_header(len(records)))
+            file.write(records.tobytes())
+        os.replace(temporary, path)
+        self.writes += 1
+
+        return self._map(columns.symbol)
+
+    def merge(self, symbol: str, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Fold newly stored StockPrice rows into a symbol's cache
+
+        Symbols without a cache file are skipped; their cache is built from
+        the complete stored history on first read instead.
+        """
+        symbol = symbol.upper()
+        if not rows or symbol not in self:
+            return False
+        existing = self.get(symbol)
+        if existing is None:
+            return False
+
+        fields = {field_name: [row.get(field_name) for row in rows] for _, field_name in COLUMNS.values()}
+        update = PriceColumns.from_fields(symbol, fields)
+        count = len(existing)
+        positions = np.searchsorted(existing.dates, update.dates)
+        cached = positions < count
+        cached[cached] = existing.dates[positions[cached]] == update.dates[cached]
+
+        new_dates = update.dates[~cached]
+        if count and len(new_dates) and new_dates[0] < existing.dates[-1]:
+            # Days inside the cached range (a filled gap) - rewrite the file
+            combined = PriceColumns._deduplicate({
+                name: np.concatenate([getattr(existing, name), values])
+                for name, values in update.columns.items()
+            })
+            self.write(PriceColumns(symbol, combined))
+            return True
+
+        records = self._records(update)
+        with open(self.path(symbol), "r+b") as file:
+            if cached.any():
+                # Re-fetched days (e.g. the last session) replace their rows
+                mapped = np.memmap(file, dtype=RECORD, mode="r+", offset=HEADER_SIZE, shape=(count,))
+                mapped[positions[cached]] = records[cached]
+                mapped.flush()
+                del mapped
+            appended = records[~cached]
+            if len(appended):
+                # Rows first, then the header that makes them visible
+                file.seek(HEADER_SIZE + count * RECORD.itemsize)
+                file.write(appended.tobytes())
+                file.flush()
+                file.seek(0)
+                file.write(_header(count + len(appended)))
+        self.appends += 1
+        self._map(symbol)
+        return True
+
+    def invalidate(self, symbol: str):
+        """Drop a symbol's cache; it is rebuilt from MongoDB on the next read"""
+        symbol = symbol.upper()
+        with self._open_lock:
+            self._open.pop(symbol, None)
+        self.path(symbol).unlink(missing_ok=True)
+
+    @staticmethod
+    def _records(columns: PriceColumns) -> np.ndarray:
+        records = np.empty(len(columns), dtype=RECORD)
+        for name, values in columns.columns.items():
+            records[name] = values
+        return records
+
+    def _map(self, symbol: str) -> Optional[PriceColumns]:
+        """Memory-map a symbol's file, replacing any older mapping"""
+        with self._open_lock:
+            self._open.pop(symbol, None)
+        try:
+            records = np.load(self.path(symbol), mmap_mode="r")
+            if records.dtype != RECORD:
+                raise ValueError(f"unexpected layout {records.dtype}")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable price cache for {symbol}: {e}")
+            self.path(symbol).unlink(missing_ok=True)
+            return None
+
+        columns = PriceColumns(symbol, {name: records[name] for name in COLUMNS})
+        with self._open_lock:
+            self._open[symbol] = columns
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+        return columns
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Mapped symbols and hit/miss/write counters"""
+        lookups = self.hits + self.misses
+        return {
+            "mapped_symbols": len(self._open),
+            "max_open": self.max_open,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "appends": self.appends,
+        }
+
+# Global price column cache instance
+price_column_cache = PriceColumnCache(
+    directory=settings.PRICE_CACHE_DIR,
+    max_open=settings.PRICE_CACHE_MAX_OPEN,
+)
@@ -0,0 +1,200 @@
+"""
+Price Store
+Daily OHLCV storage in one of two layouts: a document per day or a bucket per month
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import bisect
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.models.stock import StockPrice, StockPriceBucket
+
+# StockPrice field -> StockPriceBucket array
+BUCKET_COLUMNS = {
+    "date": "dates",
+    "timestamp": "timestamps",
+    "open_price": "open_prices",
+    "high_price": "high_prices",
+    "low_price": "low_prices",
+    "close_price": "close_prices",
+    "adj_close_price": "adj_close_prices",
+    "volume": "volumes",
+}
+
+class PriceStore:
+    """
+    Reads and writes daily price rows in the configured layout.
+
+    Callers always deal in StockPrice-shaped rows ({"symbol", "timestamp",
+    "date", "open_price", ...}) sorted by date:
+
+    - "rows": one StockPrice document per symbol and day, upserted on
+      (symbol, date).
+    - "buckets": one StockPriceBucket per symbol and month holding parallel
+      arrays, so a 10-year read decodes ~120 documents instead of ~2,500.
+      Writes merge new days into the stored month and replace it whole.
+    """
+
+    LAYOUTS = ("rows", "buckets")
+
+    def __init__(self, layout: str, batch_size: int):
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown price storage layout: {layout}")
+        self.layout = layout
+        self.batch_size = batch_size
+
+    async def store(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Upsert rows in unordered bulk writes of about batch_size rows
+
+        Returns the number of rows written; failures are reported and skipped
+        without aborting the rest of the batch.
+        """
+        if self.layout == "buckets":
+            return await self._store_buckets(rows)
+
+        collection = StockPrice.get_motor_collection()
+        stored = 0
+        for offset in range(0, len(rows), self.batch_size):
+            operations = [
+                UpdateOne({"symbol": row["symbol"], "date": row["date"]}, {"$set": row}, upsert=True)
+                for row in rows[offset:offset + self.batch_size]
+            ]
+            stored += await self._bulk_write(collection, operations, [1] * len(operations))
+        return stored
+
+    async def read(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rows of a symbol between two YYYY-MM-DD dates (inclusive, open-ended if None)"""
+        symbol = symbol.upper()
+        if self.layout == "buckets":
+            query = self._month_query(symbol, start, end)
+            rows = []
+            async for bucket in StockPriceBucket.get_motor_collection().find(query).sort("month", 1):
+                rows.extend(
+                    row for row in self._bucket_rows(bucket)
+                    if (start is None or row["date"] >= start) and (end is None or row["date"] <= end)
+                )
+            return rows
+
+        query: Dict[str, Any] = {"symbol": symbol}
+        if start or end:
+            query["date"] = {**({"$gte": start} if start else {}), **({"$lte": end} if end else {})}
+        return await StockPrice.get_motor_collection().find(
+            query, {"_id": 0, "revision_id": 0}
+        ).sort("date", 1).to_list(None)
+
+    async def read_columns(
+        self, symbol: str, start: Optional[str] = None, end: Optional[str] = None
+    ) -> Dict[str, List[Any]]:
+        """Like read(), as parallel lists keyed by StockPrice field (bucket arrays are used as-is)"""
+        columns: Dict[str, List[Any]] = {field_name: [] for field_name in BUCKET_COLUMNS}
+        if self.layout == "buckets":
+            query = self._month_query(symbol.upper(), start, end)
+            async for bucket in StockPriceBucket.get_motor_collection().find(query).sort("month", 1):
+                for field_name, column in BUCKET_COLUMNS.items():
+                    columns[field_name].extend(bucket[column])
+            # Trim the partial first and last months
+            dates = columns["date"]
+            low = bisect.bisect_left(dates, start) if start else 0
+            high = bisect.bisect_right(dates, end) if end else len(dates)
+            return {field_name: values[low:high] for field_name, values in columns.items()}
+
+        for row in await self.read(symbol, start, end):
+            for field_name, values in columns.items():
+                values.append(row.get(field_name))
+        return columns
+
+    async def dates(self, symbol: str) -> List[str]:
+        """All stored dates of a symbol, sorted"""
+        symbol = symbol.upper()
+        if self.layout == "buckets":
+            buckets = await StockPriceBucket.get_motor_collection().find(
+                {"symbol": symbol}, {"dates": 1, "_id": 0}
+            ).sort("month", 1).to_list(None)
+            return [day for bucket in buckets for day in bucket["dates"]]
+
+        rows = await StockPrice.get_motor_collection().find(
+            {"symbol": symbol}, {"date": 1, "_id": 0}
+        ).sort("date", 1).to_list(None)
+        return [row["date"] for row in rows]
+
+    @staticmethod
+    def _month_query(symbol: str, start: Optional[str], end: Optional[str]) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"symbol": symbol}
+        if start or end:
+            query["month"] = {**({"$gte": start[:7]} if start else {}), **({"$lte": end[:7]} if end else {})}
+        return query
+
+    @staticmethod
+    def _bucket_rows(bucket: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+        """Unpack a bucket's parallel arrays into rows"""
+        symbol = bucket["symbol"]
+        fields = list(BUCKET_COLUMNS)
+        columns = [bucket[column] for column in BUCKET_COLUMNS.values()]
+        for values in zip(*columns):
+            row = {"symbol": symbol}
+            row.update(zip(fields, values))
+            yield row
+
+    @staticmethod
+    def _bucket_document(symbol: str, month: str, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pack rows of one month (sorted by date) into a bucket"""
+        rows = list(rows)
+        bucket: Dict[str, Any] = {"symbol": symbol, "month": month}
+        for field_name, column in BUCKET_COLUMNS.items():
+            bucket[column] = [row.get(field_name) for row in rows]
+        return bucket
+
+    async def _store_buckets(self, rows: List[Dict[str, Any]]) -> int:
+        # (symbol, month) -> date -> row; later rows for a day win
+        months: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+        for row in rows:
+            months.setdefault((row["symbol"], row["date"][:7]), {})[row["date"]] = row
+
+        collection = StockPriceBucket.get_motor_collection()
+        keys = list(months)
+        stored = 0
+        while keys:
+            # Months per bulk write, so that each carries about batch_size rows
+            batch: List[Tuple[str, str]] = []
+            batch_rows = 0
+            while keys and (not batch or batch_rows + len(months[keys[0]]) <= self.batch_size):
+                batch_rows += len(months[keys[0]])
+                batch.append(keys.pop(0))
+
+            # Merge into the stored months, then replace them whole
+            existing = {}
+            async for bucket in collection.find({
+                "symbol": {"$in": list({symbol for symbol, _ in batch})},
+                "month": {"$in": list({month for _, month in batch})},
+            }):
+                existing[(bucket["symbol"], bucket["month"])] = bucket
+
+            operations = []
+            for symbol, month in batch:
+                merged = {row["date"]: row for row in self._bucket_rows(existing[(symbol, month)])} \
+                    if (symbol, month) in existing else {}
+                merged.update(months[(symbol, month)])
+                operations.append(ReplaceOne(
+                    {"symbol": symbol, "month": month},
+                    self._bucket_document(symbol, month, (merged[day] for day in sorted(merged))),
+                    upsert=True
+                ))
+            stored += await self._bulk_write(collection, operations, [len(months[key]) for key in batch])
+        return stored
+
+    @staticmethod
+    async def _bulk_write(collection, operations: List[Any], rows_per_operation: List[int]) -> int:
+        """Run an unordered bulk write; returns the rows written by the operations that succeeded"""
+        try:
+            await collection.bulk_write(operations, ordered=False)
+            return sum(rows_per_operation)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            print(f"⚠️ Warning: {len(errors)} of {len(operations)} price writes failed: {errors[:1]}")
+            failed = {error["index"] for error in errors}
+            return sum(rows for index, rows in enumerate(rows_per_operation) if index not in failed)
+
+# Global price store instance
+price_store = PriceStore(layout=settings.STOCK_PRICE_STORAGE, batch_size=settings.HISTORY_BULK_BATCH_SIZE)
@@ -61,14 +61,16 @@ class PriceUpdater:
     async def _update_symbol_price(self, symbol: str):
         """Update price for a specific symbol and broadcast to subscribers"""
         try:
-            # Fetch latest stock data
-            stock_data = await StockService.get_stock_data(symbol)
+            # Fetch latest quote only - fundamentals are refreshed by get_stock_data
+            stock_data = await StockService.get_stock_quote(symbol)
             
             if stock_data:
-                # Broadcast update to all subscribers
+                # Broadcast the snapshot's pre-serialized quote to all subscribers
+                snapshot = StockService.snapshot_of(symbol, stock_data)
                 await connection_manager.broadcast_stock_update(
-                    symbol, 
-                    stock_data.dict()
+                    symbol,
+                    snapshot.quote_json,
+                    snapshot.version
                 )
                 logger.debug(f"Updated price for {symbol}: {stock_data.current_price}")
             else:
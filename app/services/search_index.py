@@ -0,0 +1,291 @@
+"""
+Stock Search Index
+In-memory prefix trie and trigram index over symbols, company names and aliases
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+import heapq
+import re
+from app.models.stock import Stock
+
+# Match ranks, best first
+EXACT_SYMBOL = 0
+EXACT_NAME = 1
+SYMBOL_PREFIX = 2
+NAME_PREFIX = 3
+FUZZY = 4
+
+MATCH_TYPES = {
+    EXACT_SYMBOL: "exact",
+    EXACT_NAME: "exact_name",
+    SYMBOL_PREFIX: "prefix",
+    NAME_PREFIX: "name_prefix",
+    FUZZY: "fuzzy",
+}
+
+@dataclass
+class SearchMatch:
+    symbol: str
+    name: str
+    rank: int
+    score: float = 1.0
+
+    @property
+    def match_type(self) -> str:
+        return MATCH_TYPES[self.rank]
+
+@dataclass
+class _IndexedStock:
+    name: str
+    symbol_key: str
+    aliases: List[str] = field(default_factory=list)
+    full_keys: List[str] = field(default_factory=list)  # Normalized name and aliases
+    word_keys: List[str] = field(default_factory=list)  # Further words of those
+    trigrams: Set[str] = field(default_factory=set)
+
+    @property
+    def text_keys(self) -> List[str]:
+        return self.full_keys + self.word_keys
+
+class _TrieNode:
+    __slots__ = ("children", "symbols")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Every symbol with a key passing through this node
+        self.symbols: List[str] = []
+
+class _PrefixTrie:
+    """
+    Character trie mapping key prefixes to symbols.
+
+    Only the first MAX_DEPTH characters of each key are stored; lookups for
+    longer prefixes return a superset that the caller must verify.
+    """
+
+    MAX_DEPTH = 12
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def add(self, key: str, symbol: str):
+        node = self.root
+        for char in key[:self.MAX_DEPTH]:
+            node = node.children.setdefault(char, _TrieNode())
+            if not node.symbols or node.symbols[-1] != symbol:
+                node.symbols.append(symbol)
+
+    def remove(self, key: str, symbol: str):
+        path = []
+        node = self.root
+        for char in key[:self.MAX_DEPTH]:
+            child = node.children.get(char)
+            if child is None:
+                return
+            path.append((node, char, child))
+            node = child
+        # Walk back up, pruning nodes nothing passes through anymore. Callers
+        # remove all keys of a symbol together, so shared paths are safe to drop.
+        for parent, char, child in reversed(path):
+            child.symbols = [s for s in child.symbols if s != symbol]
+            if not child.symbols:
+                del parent.children[char]
+
+    def lookup(self, prefix: str) -> List[str]:
+        node = self.root
+        for char in prefix[:self.MAX_DEPTH]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.symbols
+
+class StockSearchIndex:
+    """
+    Typeahead index over the stock universe.
+
+    Symbols, full company names, individual name words and aliases are
+    indexed in prefix tries; every key is also broken into trigrams for fuzzy
+    matching. Results are ranked exact symbol > exact name/alias > symbol
+    prefix > name prefix > fuzzy. Entries are updated incrementally as
+    stocks are upserted.
+    """
+
+    MIN_FUZZY_LENGTH = 3
+    MIN_FUZZY_SCORE = 0.3
+    # Trigrams shared by more than this fraction of stocks carry no signal
+    MAX_TRIGRAM_FREQUENCY = 0.1
+    # Company-name boilerplate that would otherwise match half the universe
+    STOPWORDS = {"LTD", "LIMITED", "THE", "AND", "&", "CO", "COMPANY", "CORPORATION", "CORP", "INC"}
+
+    def __init__(self):
+        self._stocks: Dict[str, _IndexedStock] = {}
+        self._symbol_trie = _PrefixTrie()
+        self._text_trie = _PrefixTrie()
+        self._exact_text: Dict[str, Set[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Upper-case and collapse punctuation/whitespace to single spaces"""
+        return " ".join(re.sub(r"[^A-Z0-9&]+", " ", text.upper()).split())
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        compact = text.replace(" ", "")
+        return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+    def __len__(self) -> int:
+        return len(self._stocks)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._stocks
+
+    def get_name(self, symbol: str) -> Optional[str]:
+        stock = self._stocks.get(symbol.upper())
+        return stock.name if stock else None
+
+    def upsert(self, symbol: str, name: Optional[str] = None, aliases: Optional[Iterable[str]] = None):
+        """Add or re-index a stock; a missing name or aliases keep the ones already indexed"""
+        symbol = symbol.upper()
+        existing = self._stocks.get(symbol)
+        name = name or (existing.name if existing else symbol)
+        aliases = list(aliases) if aliases is not None else (existing.aliases if existing else [])
+
+        symbol_key = self.normalize(symbol)
+        full_keys, word_keys = self._text_keys(symbol_key, name, aliases)
+
+        # Nothing to do for repeat upserts of an unchanged entry
+        if existing and existing.name == name and existing.full_keys == full_keys:
+            return
+
+        if existing:
+            self.remove(symbol)
+
+        entry = _IndexedStock(
+            name=name, symbol_key=symbol_key, aliases=aliases, full_keys=full_keys, word_keys=word_keys
+        )
+        self._symbol_trie.add(symbol_key, symbol)
+        for key in entry.text_keys:
+            self._text_trie.add(key, symbol)
+        for key in full_keys:
+            self._exact_text.setdefault(key, set()).add(symbol)
+        for key in [symbol_key, *entry.text_keys]:
+            entry.trigrams |= self.trigrams(key)
+        for trigram in entry.trigrams:
+            self._trigrams.setdefault(trigram, set()).add(symbol)
+        self._stocks[symbol] = entry
+
+    def _text_keys(self, symbol_key: str, name: str, aliases: List[str]) -> Tuple[List[str], List[str]]:
+        full_keys, word_keys = [], []
+        for text in [name, *aliases]:
+            normalized = " ".join(
+                word for word in self.normalize(text).split(" ") if word not in self.STOPWORDS
+            )
+            if not normalized or normalized == symbol_key:
+                continue
+            full_keys.append(normalized)
+            # Later words too, so "consultancy" finds "Tata Consultancy Services"
+            word_keys.extend(word for word in normalized.split(" ")[1:] if len(word) > 1)
+        full_keys = list(dict.fromkeys(full_keys))
+        word_keys = [key for key in dict.fromkeys(word_keys) if key not in full_keys]
+        return full_keys, word_keys
+
+    def remove(self, symbol: str):
+        symbol = symbol.upper()
+        entry = self._stocks.pop(symbol, None)
+        if not entry:
+            return
+        self._symbol_trie.remove(entry.symbol_key, symbol)
+        for key in entry.text_keys:
+            self._text_trie.remove(key, symbol)
+        for key in entry.full_keys:
+            exact = self._exact_text.get(key)
+            if exact:
+                exact.discard(symbol)
+                if not exact:
+                    del self._exact_text[key]
+        for trigram in entry.trigrams:
+            postings = self._trigrams.get(trigram)
+            if postings:
+                postings.discard(symbol)
+                if not postings:
+                    del self._trigrams[trigram]
+
+    def search(self, query: str, limit: int = 10) -> List[SearchMatch]:
+        """Ranked matches for a (partial) symbol, company name or alias"""
+        key = self.normalize(query)
+        if not key:
+            return []
+
+        results: List[SearchMatch] = []
+        seen: Set[str] = set()
+
+        def take(candidates: Iterable[Tuple[str, float]], rank: int, order: Callable[[Tuple[str, float]], Any]):
+            # Each rank class is only consulted while better ones leave room
+            fresh = [candidate for candidate in candidates if candidate[0] not in seen]
+            for symbol, score in heapq.nsmallest(limit - len(results), fresh, key=order):
+                seen.add(symbol)
+                results.append(SearchMatch(symbol=symbol, name=self._stocks[symbol].name, rank=rank, score=score))
+
+        by_symbol = lambda candidate: (len(candidate[0]), candidate[0])
+        by_name = lambda candidate: (len(self._stocks[candidate[0]].name), candidate[0])
+
+        if key in self._stocks:
+            take([(key, 1.0)], EXACT_SYMBOL, by_symbol)
+        if len(results) < limit:
+            take(((symbol, 1.0) for symbol in self._exact_text.get(key, ())), EXACT_NAME, by_name)
+        if len(results) < limit:
+            take(
+                ((symbol, 1.0) for symbol in self._symbol_trie.lookup(key)
+                 if len(key) <= _PrefixTrie.MAX_DEPTH or self._stocks[symbol].symbol_key.startswith(key)),
+                SYMBOL_PREFIX, by_symbol
+            )
+        if len(results) < limit:
+            take(
+                ((symbol, 1.0) for symbol in self._text_trie.lookup(key)
+                 if len(key) <= _PrefixTrie.MAX_DEPTH
+                 or any(k.startswith(key) for k in self._stocks[symbol].text_keys)),
+                NAME_PREFIX, by_name
+            )
+        if len(results) < limit and len(key) >= self.MIN_FUZZY_LENGTH:
+            take(self._fuzzy(key), FUZZY, lambda candidate: (-candidate[1], len(candidate[0]), candidate[0]))
+
+        return results
+
+    def _fuzzy(self, key: str) -> List[Tuple[str, float]]:
+        """Symbols containing a large enough fraction of the query's trigrams"""
+        query_trigrams = self.trigrams(key)
+        if not query_trigrams:
+            return []
+
+        max_postings = max(50, int(len(self._stocks) * self.MAX_TRIGRAM_FREQUENCY))
+        shared: Dict[str, int] = {}
+        for trigram in query_trigrams:
+            postings = self._trigrams.get(trigram, ())
+            if len(postings) > max_postings:
+                continue
+            for symbol in postings:
+                shared[symbol] = shared.get(symbol, 0) + 1
+
+        matches = []
+        for symbol, count in shared.items():
+            score = count / len(query_trigrams)
+            if score >= self.MIN_FUZZY_SCORE:
+                matches.append((symbol, score))
+        return matches
+
+    async def load(self):
+        """Index every stored stock"""
+        try:
+            documents = await Stock.get_motor_collection().find(
+                {}, {"_id": 0, "symbol": 1, "name": 1}
+            ).to_list(length=None)
+            for document in documents:
+                self.upsert(document["symbol"], document.get("name"))
+            print(f"✅ Indexed {len(self._stocks)} stocks for search")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to build stock search index: {e}")
+
+# Global stock search index instance
+stock_search_index = StockSearchIndex()
@@ -1,396 +1,927 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-import yfinance as yf
+from typing import List, Optional, Dict, Any, Set
+from datetime import datetime, timedelta, timezone
+import pandas as pd
 import asyncio
-from app.models.stock import Stock, StockPrice, StockResponse, StockPriceResponse, FinancialStatement, BalanceSheet, CashFlow
+from app.core.cache import LRUTTLCache
+from app.core.config import settings
+from app.core.serialization import dumps
+from app.core.singleflight import SingleFlight
+from app.models.stock import Stock, StockPrice, StockResponse, StockSummaryResponse, StockQuoteResponse, StockPriceResponse, FinancialStatement, BalanceSheet, CashFlow
 from app.services.historical_data_service import HistoricalDataService
+from app.services.market_data_provider import market_data_provider, upstream_executor
+from app.services.search_index import stock_search_index
+from app.services.stock_write_buffer import stock_write_buffer
+from app.services.trending_service import trending_tracker
+from app.services.ticker_resolver import ticker_resolver, ResolvedTicker
+
+RESPONSE_FIELDS = list(StockResponse.__fields__)
+
+# Default list fields; staleness flags only exist on responses, not documents
+SUMMARY_FIELDS = [
+    field_name for field_name in StockSummaryResponse.__fields__
+    if field_name not in ("is_stale", "data_age_seconds")
+]
+
+class StockSnapshot:
+    """
+    A StockResponse together with its canonical JSON encoding.
+
+    The JSON is produced once when the snapshot is built, i.e. once per data
+    change, and every REST and WebSocket consumer sends those same bytes. The
+    version is the data's last_updated time in milliseconds, so it increases
+    whenever the stored data changes.
+    """
+
+    # Deep size of the StockResponse and the snapshot itself, besides the
+    # encoded bytes (measured at ~7.5 KB)
+    OVERHEAD_BYTES = 8 * 1024
+
+    def __init__(self, response: StockResponse):
+        self.response = response
+        self.version = StockSnapshot.version_of(response)
+        self.json = dumps(response)
+        # Encoded quote fields, e.g. for WebSocket ticks
+        self.quote_json = dumps(StockService.to_quote(response))
+    
+    @staticmethod
+    def version_of(response: StockResponse) -> int:
+        """Data version of a response: its last_updated time in milliseconds"""
+        return int(response.last_updated.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+    def size(self) -> int:
+        """Approximate memory held by the snapshot, for the cache's byte bound"""
+        return StockSnapshot.OVERHEAD_BYTES + len(self.json) + len(self.quote_json)
 
 class StockService:
+    # Field groups with independent freshness. Each group is refreshed and
+    # written back on its own, stamped with its own *_updated timestamp.
+    QUOTE_FIELDS = ["exchange", "current_price", "price_change", "price_change_percent", "volume"]
+    INFO_FIELDS = [
+        "name", "sector", "industry", "market_cap", "pe_ratio", "pb_ratio",
+        "price_to_sales", "price_to_earnings_growth", "eps", "gross_margin",
+        "operating_margin", "profit_margin", "book_value", "current_ratio",
+        "debt_to_equity", "beta", "revenue_growth", "earnings_growth",
+        "enterprise_value", "ebitda", "free_cash_flow", "revenue", "net_income",
+        "dividend_yield", "dividend_per_share", "payout_ratio",
+    ]
+    STATEMENT_FIELDS = [
+        "pe_ratio_qoq", "current_ratio_qoq", "debt_to_equity_qoq", "profit_margin_qoq",
+        "revenue_qoq", "eps_qoq", "pe_ratio_yoy", "current_ratio_yoy",
+        "debt_to_equity_yoy", "profit_margin_yoy", "revenue_yoy", "eps_yoy",
+    ]
+    FIELD_GROUPS = {
+        "quote": (QUOTE_FIELDS, "quote_updated"),
+        "info": (INFO_FIELDS, "info_updated"),
+        "statements": (STATEMENT_FIELDS, "statements_updated"),
+    }
+    
+    @staticmethod
+    def _group_ttl(group: str) -> timedelta:
+        """Time-to-live of a field group"""
+        if group == "quote":
+            return timedelta(seconds=settings.STOCK_QUOTE_TTL_SECONDS)
+        if group == "info":
+            return timedelta(hours=settings.STOCK_INFO_TTL_HOURS)
+        return timedelta(days=settings.STOCK_STATEMENTS_TTL_DAYS)
+    
+    @staticmethod
+    def _get_stale_groups(stock: Optional[Stock]) -> Set[str]:
+        """Field groups of a stored document that are missing or past their TTL"""
+        if not stock:
+            return set(StockService.FIELD_GROUPS)
+        
+        now = datetime.utcnow()
+        stale_groups = set()
+        for group, (_, timestamp_field) in StockService.FIELD_GROUPS.items():
+            updated = getattr(stock, timestamp_field)
+            if updated is None or updated <= now - StockService._group_ttl(group):
+                stale_groups.add(group)
+        return stale_groups
+    
+    @staticmethod
+    def _build_response(
+        stock_dict: Dict[str, Any],
+        data_age_seconds: Optional[float] = None,
+        validate: bool = True
+    ) -> StockResponse:
+        """
+        Create a StockResponse from a stock document or fetched data
+        
+        Pass validate=False for dumps of loaded Stock documents: their values were
+        validated on load, so the response is constructed without re-running validation.
+        Upstream data must always be validated.
+        """
+        response_fields = {}
+        for field_name in RESPONSE_FIELDS:
+            response_fields[field_name] = stock_dict.get(field_name)
+        # Only stale responses carry their age
+        response_fields["is_stale"] = data_age_seconds is not None
+        response_fields["data_age_seconds"] = data_age_seconds
+        if not validate:
+            return StockResponse.model_construct(**response_fields)
+        return StockResponse(**response_fields)
+    
+    @staticmethod
+    def _serve_stale(symbol: str, stock: Stock, stale_groups: Set[str]) -> Optional[StockResponse]:
+        """
+        Return a stale document immediately and refresh it in the background
+        
+        Returns None (the caller must block on a refresh) when a stale group was
+        never fetched or is overdue by more than STOCK_MAX_STALENESS_SECONDS.
+        """
+        now = datetime.utcnow()
+        for group in stale_groups:
+            updated = getattr(stock, StockService.FIELD_GROUPS[group][1])
+            if updated is None:
+                return None
+            overdue = now - (updated + StockService._group_ttl(group))
+            if overdue.total_seconds() > settings.STOCK_MAX_STALENESS_SECONDS:
+                return None
+        
+        started = stock_refresh_flight.spawn(
+            StockService._refresh_key(symbol, stale_groups),
+            lambda: StockService._refresh_stock(symbol, stock, stale_groups)
+        )
+        if started:
+            print(f"🔄 Serving stale {symbol}, refreshing {', '.join(sorted(stale_groups))} in background...")
+        
+        return StockService._build_response(
+            stock.dict(), data_age_seconds=StockService._data_age_seconds(stock, stale_groups), validate=False
+        )
+    
+    @staticmethod
+    def _refresh_key(symbol: str, groups: Set[str]) -> str:
+        """Single-flight key of a refresh; only refreshes of the same field groups are shared"""
+        return f"{symbol.upper()}:{','.join(sorted(groups))}"
+    
+    @staticmethod
+    def _data_age_seconds(stock: Stock, stale_groups: Set[str]) -> float:
+        """Age of the oldest stale field group of a stored document"""
+        updates = [
+            getattr(stock, StockService.FIELD_GROUPS[group][1]) or stock.last_updated
+            for group in stale_groups
+        ]
+        return (datetime.utcnow() - min(updates)).total_seconds()
+    
+    @staticmethod
+    def _snapshot_ttl(stock_dict: Dict[str, Any]) -> float:
+        """Seconds until the first field group of a snapshot goes stale"""
+        now = datetime.utcnow()
+        remaining = []
+        for group, (_, timestamp_field) in StockService.FIELD_GROUPS.items():
+            updated = stock_dict.get(timestamp_field)
+            if updated is None:
+                return 0.0
+            remaining.append((updated + StockService._group_ttl(group) - now).total_seconds())
+        return min(remaining)
+    
+    @staticmethod
+    def _cache_snapshot(symbol: str, stock_dict: Dict[str, Any], response: StockResponse) -> StockResponse:
+        """Keep a ready, serialized snapshot in memory until its data goes stale"""
+        ttl = StockService._snapshot_ttl(stock_dict)
+        if ttl > 0:
+            stock_snapshot_cache.set(symbol.upper(), StockSnapshot(response), ttl=ttl)
+        else:
+            stock_snapshot_cache.invalidate(symbol.upper())
+        return response
+    
+    @staticmethod
+    def fresh_for(symbol: str) -> float:
+        """Seconds until a symbol's cached snapshot goes stale (0 if not cached)"""
+        return stock_snapshot_cache.ttl_remaining(symbol.upper()) or 0.0
+    
+    @staticmethod
+    def snapshot_of(symbol: str, response: StockResponse) -> StockSnapshot:
+        """The cached snapshot of a response, or a new one for responses that aren't cached (e.g. stale)"""
+        snapshot = stock_snapshot_cache.peek(symbol.upper())
+        if snapshot is not None and snapshot.response is response:
+            return snapshot
+        return StockSnapshot(response)
+    
+    @staticmethod
+    async def get_stock_snapshot(symbol: str) -> Optional[StockSnapshot]:
+        """Get stock data for a symbol as a versioned, pre-serialized snapshot"""
+        snapshot = stock_snapshot_cache.get(symbol.upper())
+        if snapshot is not None:
+            trending_tracker.record_view(symbol)
+            return snapshot
+        
+        stock_data = await StockService.get_stock_data(symbol)
+        return StockService.snapshot_of(symbol, stock_data) if stock_data else None
+    
     @staticmethod
     async def get_stock_data(symbol: str) -> Optional[StockResponse]:
         """Get stock data for a symbol"""
+        # Hot symbols are served from memory without touching MongoDB
+        snapshot = stock_snapshot_cache.get(symbol.upper())
+        stock_data = snapshot.response if snapshot is not None else None
+        if stock_data is None:
+            # Concurrent callers for the same symbol share one lookup/fetch
+            stock_data = await stock_data_flight.do(
+                symbol.upper(),
+                lambda: StockService._get_stock_data(symbol)
+            )
+        
+        if stock_data is not None:
+            trending_tracker.record_view(symbol)
+        return stock_data
+    
+    @staticmethod
+    async def _get_stock_data(symbol: str) -> Optional[StockResponse]:
+        """Uncoalesced implementation of get_stock_data"""
         try:
             # First check if we have recent data in database
-            stock = await Stock.find_one({"symbol": symbol.upper()})
+            stock = stock_write_buffer.overlay(await Stock.find_one({"symbol": symbol.upper()}))
+            return await StockService._resolve_stock(symbol, stock)
             
-            if stock and stock.last_updated > datetime.utcnow() - timedelta(minutes=5):
+        except Exception as e:
+            print(f"Error fetching stock data for {symbol}: {e}")
+            return None
+    
+    @staticmethod
+    async def _resolve_stock(symbol: str, stock: Optional[Stock]) -> Optional[StockResponse]:
+        """Serve a stored document (or None) as-is, stale, or after refreshing its stale groups"""
+        try:
+            stale_groups = StockService._get_stale_groups(stock)
+            if not stale_groups:
                 # Create response with all available fields from database
                 stock_dict = stock.dict()
-                response_fields = {}
-                for field_name in StockResponse.__fields__:
-                    response_fields[field_name] = stock_dict.get(field_name)
-                return StockResponse(**response_fields)
-            
-            # Fetch fresh data from Yahoo Finance
-            fresh_data = await StockService._fetch_yahoo_finance_data(symbol)
-            if fresh_data:
-                # Save/Update the comprehensive data in MongoDB
-                try:
-                    # Prepare data for MongoDB storage
-                    stock_data_for_db = {}
-                    for field_name in Stock.__fields__:
-                        if field_name in fresh_data:
-                            stock_data_for_db[field_name] = fresh_data[field_name]
-                    
-                    # Update or create stock record in MongoDB
-                    await Stock.find_one_and_update(
-                        {"symbol": symbol.upper()},
-                        {"$set": stock_data_for_db},
-                        upsert=True
-                    )
-                    print(f"✅ Saved enhanced stock data for {symbol} to MongoDB with variance analysis")
-                    
-                except Exception as e:
-                    print(f"⚠️ Warning: Failed to save stock data to MongoDB: {e}")
-                    # Continue anyway - we can still return the data even if save fails
-                
-                # Optionally fetch and store comprehensive historical data
-                # This can be done asynchronously in the background
-                try:
-                    # Check if we have recent historical data
-                    recent_price_data = await StockPrice.find(
-                        {"symbol": symbol.upper()}
-                    ).sort([("timestamp", -1)]).limit(1).to_list()
-                    
-                    # If no recent price data, fetch historical data
-                    if not recent_price_data or \
-                       (recent_price_data[0].timestamp < datetime.utcnow() - timedelta(days=7)):
-                        print(f"🔄 Fetching historical data for {symbol} in background...")
-                        # Note: In production, this should be done asynchronously
-                        # For now, we'll just trigger it but not wait
-                        asyncio.create_task(
-                            HistoricalDataService.fetch_and_store_complete_historical_data(symbol)
-                        )
-                        
-                except Exception as e:
-                    print(f"⚠️ Warning: Failed to trigger historical data fetch: {e}")
-                
-                # Create StockResponse with all available fields
-                response_fields = {}
-                for field_name in StockResponse.__fields__:
-                    response_fields[field_name] = fresh_data.get(field_name)
-                return StockResponse(**response_fields)
+                return StockService._cache_snapshot(
+                    symbol, stock_dict, StockService._build_response(stock_dict, validate=False)
+                )
             
-            return None
+            if stock and settings.STOCK_STALE_WHILE_REVALIDATE:
+                stale_response = StockService._serve_stale(symbol, stock, stale_groups)
+                if stale_response:
+                    return stale_response
+            
+            # Fetch only the stale field groups from Yahoo Finance, joining any
+            # background refresh of the same groups already running for this symbol
+            stock_data = await stock_refresh_flight.do(
+                StockService._refresh_key(symbol, stale_groups),
+                lambda: StockService._refresh_stock(symbol, stock, stale_groups)
+            )
+            
+            # Upstream unavailable (e.g. circuit open) - serve what MongoDB has
+            if stock_data is None and stock:
+                return StockService._build_response(
+                    stock.dict(),
+                    data_age_seconds=StockService._data_age_seconds(stock, stale_groups),
+                    validate=False
+                )
+            return stock_data
             
         except Exception as e:
             print(f"Error fetching stock data for {symbol}: {e}")
             return None
     
     @staticmethod
-    async def _fetch_yahoo_finance_data(symbol: str) -> Optional[Dict[str, Any]]:
-        """Fetch data from Yahoo Finance"""
+    async def get_watchlist_data(symbols: List[str]) -> List[StockResponse]:
+        """
+        Get full stock data for a watchlist
+        
+        Cached snapshots are used as-is and the remaining symbols are read with a
+        single $in query. Only members whose data is missing or stale go upstream,
+        at most WATCHLIST_REFRESH_CONCURRENCY at a time. Results keep watchlist
+        order and carry per-item is_stale/data_age_seconds; unknown symbols are omitted.
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        results: Dict[str, Optional[StockResponse]] = {}
+        
+        for symbol in symbols:
+            snapshot = stock_snapshot_cache.get(symbol)
+            if snapshot is not None:
+                results[symbol] = snapshot.response
+        
+        misses = [symbol for symbol in symbols if symbol not in results]
+        if misses:
+            try:
+                stocks = await Stock.find({"symbol": {"$in": misses}}).to_list()
+            except Exception as e:
+                print(f"Error reading watchlist stocks: {e}")
+                stocks = []
+            stocks_by_symbol = {stock.symbol: stock_write_buffer.overlay(stock) for stock in stocks}
+            
+            refresh_slots = asyncio.Semaphore(settings.WATCHLIST_REFRESH_CONCURRENCY)
+            
+            async def resolve(symbol: str):
+                async with refresh_slots:
+                    results[symbol] = await StockService._resolve_stock(symbol, stocks_by_symbol.get(symbol))
+            
+            pending = []
+            for symbol in misses:
+                stock = stocks_by_symbol.get(symbol)
+                if stock and not StockService._get_stale_groups(stock):
+                    # Fresh documents never block on a slot
+                    stock_dict = stock.dict()
+                    results[symbol] = StockService._cache_snapshot(
+                        symbol, stock_dict, StockService._build_response(stock_dict, validate=False)
+                    )
+                else:
+                    pending.append(resolve(symbol))
+            await asyncio.gather(*pending)
+        
+        return [results[symbol] for symbol in symbols if results.get(symbol) is not None]
+    
+    @staticmethod
+    async def get_stock_quote(symbol: str) -> Optional[StockResponse]:
+        """Refresh only the live quote (price, change, volume) for a symbol, if it is stale"""
+        # A cached snapshot is dropped before any of its groups goes stale
+        snapshot = stock_snapshot_cache.get(symbol.upper())
+        if snapshot is not None:
+            return snapshot.response
+        
+        # A get_stock_data refresh in flight always includes the quote - join it
+        if stock_data_flight.in_flight(symbol.upper()):
+            return await StockService.get_stock_data(symbol)
+        
+        return await stock_quote_flight.do(
+            symbol.upper(),
+            lambda: StockService._get_stock_quote(symbol)
+        )
+    
+    @staticmethod
+    async def _get_stock_quote(symbol: str) -> Optional[StockResponse]:
+        """Uncoalesced implementation of get_stock_quote"""
         try:
-            # Determine the correct ticker symbol - prioritize Indian stocks
-            # Indian stocks need .NS or .BO suffix for NSE/BSE
-            indian_stocks = [
-                '360ONE', '3MINDIA', 'RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'HDFCAMC', 'BHARTIARTL', 'ITC', 'KOTAKBANK',
-                'ICICIBANK', 'ICICIGI', 'ICICIPRULI', 'JIOFIN', 'SBIN', 'AXISBANK', 'INDUSINDBK', 'BAJFINANCE', 'MARUTI',
-                'TATAMOTOR', 'M&M', 'BAJAJ-AUTO', 'EICHERMOT', 'SUNPHARMA', 'DRREDDY',
-                'CIPLA', 'BIOCON', 'LUPIN', 'AUROPHARMA', 'HINDUNILVR', 'NESTLEIND',
-                'BRITANNIA', 'DABUR', 'GODREJCP', 'TATASTEEL', 'HINDALCO', 'JSWSTEEL',
-                'SAILSTEEL', 'VEDL', 'ONGC', 'BPCL', 'IOCL', 'GAIL', 'NTPC', 'POWERGRID',
-                'LT', 'ADANIPORTS', 'ULTRACEMCO', 'AMBUJACEM', 'ACC', 'SHREECEM',
-                'ASIANPAINT', 'TITAN', 'BAJAJFINSV', 'HDFCLIFE', 'SBILIFE', 'WIPRO',
-                'HCLTECH', 'TECHM', 'LTI', 'LTTS'
-            ]
-            us_stocks = ['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN', 'META', 'NFLX', 'NVDA', 'AMD', 'INTC']
+            stock = stock_write_buffer.overlay(await Stock.find_one({"symbol": symbol.upper()}))
             
-            # For Indian market focus - prioritize NSE (.NS) over ADRs
-            if symbol.upper() in us_stocks:
-                # These are US stocks, use as-is
-                ticker_symbol = symbol.upper()
-                exchange = "NASDAQ"
-            else:
-                # For Indian stocks, try NSE first
-                ticker_symbol = f"{symbol.upper()}.NS"
-                exchange = "NSE (India)"
-            
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            ticker_data = await loop.run_in_executor(
-                None, 
-                lambda: yf.Ticker(ticker_symbol)
+            # Without a stored document we have no name/fundamentals to merge into
+            if not stock:
+                return await StockService.get_stock_data(symbol)
+            
+            # Quote still within its TTL - serve the stored document
+            if "quote" not in StockService._get_stale_groups(stock):
+                stock_dict = stock.dict()
+                return StockService._cache_snapshot(
+                    symbol, stock_dict, StockService._build_response(stock_dict, validate=False)
+                )
+            
+            stock_data = await StockService._refresh_stock(symbol, stock, {"quote"})
+            
+            # Fall back to the stored quote if the upstream fetch failed
+            return stock_data or StockService._build_response(
+                stock.dict(), data_age_seconds=StockService._data_age_seconds(stock, {"quote"}), validate=False
             )
             
-            info = await loop.run_in_executor(None, lambda: ticker_data.info)
-            hist = await loop.run_in_executor(
-                None, 
-                lambda: ticker_data.history(period="2d")
+        except Exception as e:
+            print(f"Error fetching stock quote for {symbol}: {e}")
+            return None
+    
+    @staticmethod
+    async def get_stock_quotes(symbols: List[str]) -> List[StockQuoteResponse]:
+        """
+        Get quotes for many symbols at once
+        
+        Fresh quotes come from the snapshot cache or a single $in read. Missing and
+        stale symbols are refreshed through one batched multi-ticker download.
+        Results keep the order of the requested symbols; unknown symbols are omitted.
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        quotes: Dict[str, Dict[str, Any]] = {}
+        
+        # Hot symbols straight from memory
+        uncached = []
+        for symbol in symbols:
+            cached = stock_snapshot_cache.get(symbol)
+            if cached is not None:
+                quotes[symbol] = cached.response.dict()
+            else:
+                uncached.append(symbol)
+        
+        stale_symbols = []
+        if uncached:
+            try:
+                stocks = await Stock.find({"symbol": {"$in": uncached}}).to_list()
+            except Exception as e:
+                print(f"Error reading quotes from MongoDB: {e}")
+                stocks = []
+            
+            stocks_by_symbol = {stock.symbol: stock_write_buffer.overlay(stock) for stock in stocks}
+            for symbol in uncached:
+                stock = stocks_by_symbol.get(symbol)
+                if stock:
+                    quotes[symbol] = stock.dict()
+                if not stock or "quote" in StockService._get_stale_groups(stock):
+                    stale_symbols.append(symbol)
+        
+        if stale_symbols:
+            fresh_quotes = await StockService._fetch_yahoo_quotes_batch(stale_symbols)
+            if fresh_quotes:
+                await StockService._save_quotes_batch(fresh_quotes)
+                for symbol, quote_data in fresh_quotes.items():
+                    quotes.setdefault(symbol, {"symbol": symbol, "name": symbol}).update(quote_data)
+        
+        return [
+            StockQuoteResponse(**{
+                field_name: quotes[symbol].get(field_name)
+                for field_name in StockQuoteResponse.__fields__
+            })
+            for symbol in symbols
+            if symbol in quotes
+        ]
+    
+    @staticmethod
+    async def _fetch_yahoo_quotes_batch(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes for many symbols with batched multi-ticker history downloads"""
+        quotes = {}
+        
+        # Known tickers go straight into the batch; unknown symbols are tried
+        # with their most likely variant first and probed individually only if that fails
+        pending = {}
+        for symbol in symbols:
+            if ticker_resolver.is_negatively_cached(symbol):
+                continue
+            resolved = ticker_resolver.peek(symbol)
+            if not resolved:
+                ticker_symbol, exchange = ticker_resolver.candidate_tickers(symbol)[0]
+                resolved = ResolvedTicker(ticker_symbol, exchange)
+            pending[symbol] = resolved
+        
+        for attempt in range(2):
+            if not pending:
+                break
+            
+            frames = await StockService._download_history_batch(
+                [resolved.ticker_symbol for resolved in pending.values()]
             )
+            if frames is None:
+                # Upstream failed or is unavailable - says nothing about the tickers
+                break
             
-            # Get additional fundamental data including historical
-            financials = await loop.run_in_executor(None, lambda: ticker_data.financials)
-            balance_sheet = await loop.run_in_executor(None, lambda: ticker_data.balance_sheet)
-            cash_flow = await loop.run_in_executor(None, lambda: ticker_data.cashflow)
-            quarterly_financials = await loop.run_in_executor(None, lambda: ticker_data.quarterly_financials)
-            quarterly_balance_sheet = await loop.run_in_executor(None, lambda: ticker_data.quarterly_balance_sheet)
-            
-            # If no data found, try different variants
-            if hist.empty:
-                # Try different exchanges and suffixes systematically
-                variants_to_try = []
-                if ticker_symbol.endswith('.NS'):
-                    # Try without suffix (for ADRs), BSE (.BO)
-                    variants_to_try = [
-                        symbol.upper(),  # US ADR version
-                        f"{symbol.upper()}.BO",  # BSE
-                    ]
-                else:
-                    # Try with NSE and BSE suffixes
-                    variants_to_try = [
-                        f"{symbol.upper()}.NS",  # NSE
-                        f"{symbol.upper()}.BO",  # BSE
-                    ]
+            now = datetime.utcnow()
+            unresolved = []
+            for symbol, resolved in pending.items():
+                hist = frames.get(resolved.ticker_symbol)
+                if hist is None or hist.empty:
+                    unresolved.append(symbol)
+                    continue
                 
-                for variant in variants_to_try:
-                    try:
-                        ticker_data = await loop.run_in_executor(
-                            None, 
-                            lambda v=variant: yf.Ticker(v)
-                        )
-                        info = await loop.run_in_executor(None, lambda: ticker_data.info)
-                        hist = await loop.run_in_executor(
-                            None, 
-                            lambda: ticker_data.history(period="2d")
+                await ticker_resolver.remember(symbol, resolved)
+                quote_data = StockService._parse_quote(hist)
+                quote_data["exchange"] = resolved.exchange
+                quote_data["quote_updated"] = now
+                quote_data["last_updated"] = now
+                quotes[symbol] = quote_data
+            
+            if attempt > 0 or not unresolved:
+                break
+            
+            # Let the resolver probe the misses (skipping the variant just tried), then
+            # batch the ones it found. An empty result for a known ticker is reported
+            # rather than treated as a wrong guess
+            known = {symbol for symbol in unresolved if ticker_resolver.peek(symbol)}
+            resolutions = await asyncio.gather(*[
+                ticker_resolver.report_empty(symbol) if symbol in known
+                else ticker_resolver.resolve(symbol, tried=(pending[symbol].ticker_symbol,))
+                for symbol in unresolved
+            ])
+            pending = {
+                symbol: resolved
+                for symbol, resolved in zip(unresolved, resolutions)
+                # A known ticker is retried only if the resolver switched to another variant
+                if resolved and (symbol not in known or resolved != pending[symbol])
+            }
+        
+        return quotes
+    
+    @staticmethod
+    async def _download_history_batch(ticker_symbols: List[str]) -> Optional[Dict[str, pd.DataFrame]]:
+        """Download a 2-day history for many tickers in a single upstream request (None on failure)"""
+        try:
+            return await market_data_provider.history_batch(ticker_symbols, period="2d")
+        except Exception as e:
+            print(f"Error downloading batched quotes: {e}")
+            return None
+    
+    @staticmethod
+    async def _save_quotes_batch(quotes: Dict[str, Dict[str, Any]]):
+        """Stage many refreshed quotes for the next bulk write"""
+        for symbol, quote_data in quotes.items():
+            stock_snapshot_cache.invalidate(symbol)
+            stock_write_buffer.stage(
+                symbol,
+                quote_data,
+                # New documents get a placeholder name; info is fetched on first full read
+                on_insert={"name": symbol, "is_active": True}
+            )
+            stock_search_index.upsert(symbol)
+    
+    @staticmethod
+    async def _refresh_stock(symbol: str, stock: Optional[Stock], groups: Set[str]) -> Optional[StockResponse]:
+        """Fetch the given field groups, write them back and return the merged snapshot"""
+        fresh_data = await StockService._fetch_yahoo_finance_data(symbol, groups)
+        if not fresh_data:
+            return None
+        
+        # Save/Update only the refreshed groups in MongoDB; the write buffer
+        # drops unchanged fields and flushes the rest in its next bulk write
+        stock_snapshot_cache.invalidate(symbol.upper())
+        stock_data_for_db = {
+            field_name: fresh_data[field_name]
+            for field_name in Stock.__fields__
+            if field_name in fresh_data
+        }
+        stock_write_buffer.stage(
+            symbol,
+            stock_data_for_db,
+            stored=stock,
+            # Quote-only refreshes of new symbols carry no name yet
+            on_insert={"name": symbol.upper(), "is_active": True}
+        )
+        stock_search_index.upsert(symbol, stock_data_for_db.get("name"))
+        
+        # Optionally fetch and store comprehensive historical data when the
+        # slower-moving groups are refreshed. This runs in the background.
+        if groups != {"quote"}:
+            try:
+                # Sync unless history was synced recently - by coverage, since halted or
+                # delisted names legitimately have no recent bars
+                if await HistoricalDataService.needs_history_sync(symbol, timedelta(days=7)):
+                    # Trigger it but don't wait - at most one backfill per symbol at a time
+                    started = historical_backfill_flight.spawn(
+                        symbol.upper(),
+                        lambda: upstream_executor.background(
+                            HistoricalDataService.fetch_and_store_complete_historical_data(symbol)
                         )
-                        
-                        if not hist.empty:
-                            ticker_symbol = variant
-                            if variant.endswith('.NS'):
-                                exchange = "NSE (India)"
-                            elif variant.endswith('.BO'):
-                                exchange = "BSE (India)"
-                            else:
-                                exchange = "NYSE/NASDAQ (ADR)"  # Clearly indicate it's an ADR
-                            break
-                    except:
-                        continue
-            
-            if hist.empty:
+                    )
+                    if started:
+                        print(f"🔄 Fetching historical data for {symbol} in background...")
+                    
+            except Exception as e:
+                print(f"⚠️ Warning: Failed to trigger historical data fetch: {e}")
+        
+        # Merge the fresh groups over the stored document
+        stock_dict = stock.dict() if stock else {}
+        stock_dict.update(fresh_data)
+        return StockService._cache_snapshot(
+            symbol, stock_dict, StockService._build_response(stock_dict)
+        )
+    
+    @staticmethod
+    async def _fetch_yahoo_finance_data(symbol: str, groups: Optional[Set[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch data from Yahoo Finance
+        
+        Args:
+            symbol: Stock symbol
+            groups: Field groups to fetch ("quote", "info", "statements"), all by default
+        
+        The quote (2-day history), info and quarterly statements are independent
+        downloads and run concurrently. Only fields of the requested groups are
+        returned, together with their *_updated timestamps.
+        """
+        try:
+            if groups is None:
+                groups = set(StockService.FIELD_GROUPS)
+            fundamental_groups = groups & {"info", "statements"}
+            
+            # Resolve the working ticker variant (.NS/.BO/ADR) once per symbol
+            resolved = await ticker_resolver.resolve(symbol)
+            if not resolved:
                 return None
             
-            latest = hist.iloc[-1]
-            previous = hist.iloc[-2] if len(hist) > 1 else latest
+            # Download the fundamentals alongside the quote
+            fundamentals_task = None
+            if fundamental_groups:
+                fundamentals_task = asyncio.ensure_future(
+                    StockService._fetch_yahoo_fundamentals(resolved.ticker_symbol, fundamental_groups)
+                )
             
-            current_price = float(latest['Close'])
-            previous_price = float(previous['Close'])
-            price_change = current_price - previous_price
-            price_change_percent = (price_change / previous_price) * 100 if previous_price > 0 else 0.0
+            now = datetime.utcnow()
+            fetched_data = {"symbol": symbol.upper()}
             
-            # Helper function to safely extract numeric values
-            def safe_float(value):
+            if "quote" in groups:
                 try:
-                    if value is None or value == 'N/A' or str(value).lower() == 'nan':
-                        return None
-                    return float(value)
-                except (ValueError, TypeError):
+                    hist = await market_data_provider.quote(resolved.ticker_symbol)
+                except Exception:
+                    if fundamentals_task:
+                        fundamentals_task.cancel()
+                    raise
+                
+                if hist.empty:
+                    # Usually transient (throttling, a halt) - the resolver only
+                    # re-probes the variants after repeated empty results
+                    if fundamentals_task:
+                        fundamentals_task.cancel()
+                    await ticker_resolver.report_empty(symbol)
                     return None
+                
+                ticker_resolver.report_data(symbol)
+                fetched_data.update(StockService._parse_quote(hist))
+                fetched_data["exchange"] = resolved.exchange
+                fetched_data["quote_updated"] = now
             
-            # Helper function to convert currency values to crores (for Indian context)
-            def to_crores(value):
-                if value is None:
+            if fundamentals_task:
+                fundamentals = await fundamentals_task
+                if "info" in fundamental_groups:
+                    fetched_data.update(StockService._parse_info(symbol, fundamentals["info"]))
+                    fetched_data["info_updated"] = now
+                if "statements" in fundamental_groups:
+                    fetched_data.update(StockService._parse_statements(
+                        fundamentals["quarterly_financials"],
+                        fundamentals["quarterly_balance_sheet"]
+                    ))
+                    fetched_data["statements_updated"] = now
+            
+            fetched_data["last_updated"] = now
+            return fetched_data
+            
+        except Exception as e:
+            print(f"Error fetching Yahoo Finance data for {symbol}: {e}")
+            return None
+    
+    @staticmethod
+    async def _fetch_yahoo_fundamentals(ticker_symbol: str, groups: Set[str]) -> Dict[str, Any]:
+        """Download info and/or quarterly statements for a ticker concurrently"""
+        downloads = {}
+        if "info" in groups:
+            downloads["info"] = market_data_provider.info(ticker_symbol)
+        if "statements" in groups:
+            downloads["quarterly_financials"] = market_data_provider.statements(
+                ticker_symbol, "income", "quarterly")
+            downloads["quarterly_balance_sheet"] = market_data_provider.statements(
+                ticker_symbol, "balance_sheet", "quarterly")
+        
+        results = await asyncio.gather(*downloads.values())
+        return dict(zip(downloads.keys(), results))
+    
+    @staticmethod
+    def _parse_quote(hist) -> Dict[str, Any]:
+        """Extract price, change and volume from a short price history"""
+        latest = hist.iloc[-1]
+        previous = hist.iloc[-2] if len(hist) > 1 else latest
+        
+        current_price = float(latest['Close'])
+        previous_price = float(previous['Close'])
+        price_change = current_price - previous_price
+        price_change_percent = (price_change / previous_price) * 100 if previous_price > 0 else 0.0
+        
+        return {
+            "current_price": current_price,
+            "price_change": price_change,
+            "price_change_percent": price_change_percent,
+            "volume": int(latest.get('Volume', 0)) if latest.get('Volume') else None,
+        }
+    
+    @staticmethod
+    def _safe_float(value) -> Optional[float]:
+        """Safely extract a numeric value"""
+        try:
+            if value is None or value == 'N/A' or str(value).lower() == 'nan':
+                return None
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+    
+    @staticmethod
+    def _to_crores(value: Optional[float]) -> Optional[float]:
+        """Convert currency values to crores (for Indian context)"""
+        if value is None:
+            return None
+        return value / 10000000  # Convert to crores (1 crore = 10 million)
+    
+    @staticmethod
+    def _parse_info(symbol: str, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract valuation, profitability and dividend fields from ticker info"""
+        safe_float = StockService._safe_float
+        to_crores = StockService._to_crores
+        
+        # Extract comprehensive fundamental data
+        info_data = {
+            "symbol": symbol.upper(),
+            "name": info.get('longName', symbol),
+            "sector": info.get('sector'),
+            "industry": info.get('industry'),
+            
+            # Basic valuation metrics
+            "market_cap": safe_float(info.get('marketCap')),
+            "pe_ratio": safe_float(info.get('trailingPE')),
+            "pb_ratio": safe_float(info.get('priceToBook')),
+            "price_to_sales": safe_float(info.get('priceToSalesTrailing12Months')),
+            "price_to_earnings_growth": safe_float(info.get('pegRatio')),
+            
+            # Profitability metrics
+            "eps": safe_float(info.get('trailingEps')),
+            "gross_margin": safe_float(info.get('grossMargins')) * 100 if safe_float(info.get('grossMargins')) else None,
+            "operating_margin": safe_float(info.get('operatingMargins')) * 100 if safe_float(info.get('operatingMargins')) else None,
+            "profit_margin": safe_float(info.get('profitMargins')) * 100 if safe_float(info.get('profitMargins')) else None,
+            "book_value": safe_float(info.get('bookValue')),
+            
+            # Financial strength metrics
+            "current_ratio": safe_float(info.get('currentRatio')),
+            "debt_to_equity": safe_float(info.get('debtToEquity')),
+            "beta": safe_float(info.get('beta')),
+            
+            # Growth metrics
+            "revenue_growth": safe_float(info.get('revenueGrowth')) * 100 if safe_float(info.get('revenueGrowth')) else None,
+            "earnings_growth": safe_float(info.get('earningsGrowth')) * 100 if safe_float(info.get('earningsGrowth')) else None,
+            
+            # Cash flow and enterprise value
+            "enterprise_value": safe_float(info.get('enterpriseValue')),
+            "ebitda": to_crores(safe_float(info.get('ebitda'))),
+            "free_cash_flow": to_crores(safe_float(info.get('freeCashflow'))),
+            
+            # Revenue and profit (in crores)
+            "revenue": to_crores(safe_float(info.get('totalRevenue'))),
+            "net_income": to_crores(safe_float(info.get('netIncomeToCommon'))),
+            
+            # Dividend metrics
+            "dividend_yield": safe_float(info.get('dividendYield')) * 100 if safe_float(info.get('dividendYield')) else None,
+            "dividend_per_share": safe_float(info.get('dividendRate')),
+            "payout_ratio": safe_float(info.get('payoutRatio')) * 100 if safe_float(info.get('payoutRatio')) else None,
+        }
+        
+        return info_data
+    
+    @staticmethod
+    def _parse_statements(quarterly_financials, quarterly_balance_sheet) -> Dict[str, Any]:
+        """Extract QoQ/YoY variance fields from quarterly statements"""
+        # Helper function to calculate historical metrics
+        def calculate_historical_metrics(current_val, df, metric_name, periods_back=1):
+            """Calculate historical values for QoQ and YoY comparison"""
+            try:
+                if df is None or df.empty or len(df.columns) < periods_back + 1:
                     return None
-                return value / 10000000  # Convert to crores (1 crore = 10 million)
+                
+                # Get the value from periods_back columns ago
+                if len(df.columns) >= periods_back + 1:
+                    historical_col = df.columns[periods_back]  # 1 = previous quarter, 4 = previous year
+                    if metric_name in df.index:
+                        historical_value = df.loc[metric_name, historical_col]
+                        return StockService._safe_float(historical_value)
+                return None
+            except:
+                return None
+                
+        # Calculate derived historical metrics
+        def calculate_historical_ratios():
+            """Calculate historical PE, current ratio, etc. from raw data"""
+            historical_metrics = {}
             
-            # Helper function to calculate historical metrics
-            def calculate_historical_metrics(current_val, df, metric_name, periods_back=1):
-                """Calculate historical values for QoQ and YoY comparison"""
-                try:
-                    if df is None or df.empty or len(df.columns) < periods_back + 1:
-                        return None
+            try:
+                # Historical P/E calculation (if we have EPS data)
+                if quarterly_financials is not None and not quarterly_financials.empty:
+                    # Get historical revenue and net income for margins
+                    historical_metrics['revenue_qoq'] = calculate_historical_metrics(
+                        None, quarterly_financials, 'Total Revenue', 1)
+                    historical_metrics['revenue_yoy'] = calculate_historical_metrics(
+                        None, quarterly_financials, 'Total Revenue', 4)
                     
-                    # Get the value from periods_back columns ago
-                    if len(df.columns) >= periods_back + 1:
-                        historical_col = df.columns[periods_back]  # 1 = previous quarter, 4 = previous year
-                        if metric_name in df.index:
-                            historical_value = df.loc[metric_name, historical_col]
-                            return safe_float(historical_value)
-                    return None
-                except:
-                    return None
+                    # Calculate historical profit margins
+                    # QoQ margin
+                    qoq_revenue = historical_metrics.get('revenue_qoq')
+                    qoq_net_income = calculate_historical_metrics(
+                        None, quarterly_financials, 'Net Income', 1)
+                    if qoq_revenue and qoq_net_income:
+                        historical_metrics['profit_margin_qoq'] = (qoq_net_income / qoq_revenue) * 100
                     
-            # Calculate derived historical metrics
-            def calculate_historical_ratios():
-                """Calculate historical PE, current ratio, etc. from raw data"""
-                historical_metrics = {}
+                    # YoY margin  
+                    yoy_revenue = historical_metrics.get('revenue_yoy')
+                    yoy_net_income = calculate_historical_metrics(
+                        None, quarterly_financials, 'Net Income', 4)
+                    if yoy_revenue and yoy_net_income:
+                        historical_metrics['profit_margin_yoy'] = (yoy_net_income / yoy_revenue) * 100
                 
-                try:
-                    # Historical P/E calculation (if we have EPS data)
-                    if quarterly_financials is not None and not quarterly_financials.empty:
-                        # Get historical revenue and net income for margins
-                        historical_metrics['revenue_qoq'] = calculate_historical_metrics(
-                            None, quarterly_financials, 'Total Revenue', 1)
-                        historical_metrics['revenue_yoy'] = calculate_historical_metrics(
-                            None, quarterly_financials, 'Total Revenue', 4)
-                        
-                        # Calculate historical profit margins
-                        current_revenue = safe_float(info.get('totalRevenue'))
-                        current_net_income = safe_float(info.get('netIncomeToCommon'))
-                        
-                        if current_revenue and current_net_income:
-                            current_margin = (current_net_income / current_revenue) * 100
-                            
-                            # QoQ margin
-                            qoq_revenue = historical_metrics.get('revenue_qoq')
-                            qoq_net_income = calculate_historical_metrics(
-                                None, quarterly_financials, 'Net Income', 1)
-                            if qoq_revenue and qoq_net_income:
-                                historical_metrics['profit_margin_qoq'] = (qoq_net_income / qoq_revenue) * 100
-                            
-                            # YoY margin  
-                            yoy_revenue = historical_metrics.get('revenue_yoy')
-                            yoy_net_income = calculate_historical_metrics(
-                                None, quarterly_financials, 'Net Income', 4)
-                            if yoy_revenue and yoy_net_income:
-                                historical_metrics['profit_margin_yoy'] = (yoy_net_income / yoy_revenue) * 100
+                # Historical balance sheet ratios
+                if quarterly_balance_sheet is not None and not quarterly_balance_sheet.empty:
+                    # Current Ratio = Current Assets / Current Liabilities
+                    current_assets_qoq = calculate_historical_metrics(
+                        None, quarterly_balance_sheet, 'Current Assets', 1)
+                    current_liabilities_qoq = calculate_historical_metrics(
+                        None, quarterly_balance_sheet, 'Current Liabilities', 1)
                     
-                    # Historical balance sheet ratios
-                    if quarterly_balance_sheet is not None and not quarterly_balance_sheet.empty:
-                        # Current Ratio = Current Assets / Current Liabilities
-                        current_assets_qoq = calculate_historical_metrics(
-                            None, quarterly_balance_sheet, 'Current Assets', 1)
-                        current_liabilities_qoq = calculate_historical_metrics(
-                            None, quarterly_balance_sheet, 'Current Liabilities', 1)
-                        
-                        if current_assets_qoq and current_liabilities_qoq:
-                            historical_metrics['current_ratio_qoq'] = current_assets_qoq / current_liabilities_qoq
-                        
-                        # YoY Current Ratio
-                        current_assets_yoy = calculate_historical_metrics(
-                            None, quarterly_balance_sheet, 'Current Assets', 4)
-                        current_liabilities_yoy = calculate_historical_metrics(
-                            None, quarterly_balance_sheet, 'Current Liabilities', 4)
-                        
-                        if current_assets_yoy and current_liabilities_yoy:
-                            historical_metrics['current_ratio_yoy'] = current_assets_yoy / current_liabilities_yoy
-                        
-                        # Debt to Equity historical
-                        total_debt_qoq = calculate_historical_metrics(
-                            None, quarterly_balance_sheet, 'Total Debt', 1)
-                        total_equity_qoq = calculate_historical_metrics(
-                            None, quarterly_balance_sheet, 'Total Equity Gross Minority Interest', 1)
-                        
-                        if total_debt_qoq and total_equity_qoq:
-                            historical_metrics['debt_to_equity_qoq'] = total_debt_qoq / total_equity_qoq
-                        
-                        # YoY Debt to Equity
-                        total_debt_yoy = calculate_historical_metrics(
-                            None, quarterly_balance_sheet, 'Total Debt', 4)
-                        total_equity_yoy = calculate_historical_metrics(
-                            None, quarterly_balance_sheet, 'Total Equity Gross Minority Interest', 4)
+                    if current_assets_qoq and current_liabilities_qoq:
+                        historical_metrics['current_ratio_qoq'] = current_assets_qoq / current_liabilities_qoq
+                    
+                    # YoY Current Ratio
+                    current_assets_yoy = calculate_historical_metrics(
+                        None, quarterly_balance_sheet, 'Current Assets', 4)
+                    current_liabilities_yoy = calculate_historical_metrics(
+                        None, quarterly_balance_sheet, 'Current Liabilities', 4)
+                    
+                    if current_assets_yoy and current_liabilities_yoy:
+                        historical_metrics['current_ratio_yoy'] = current_assets_yoy / current_liabilities_yoy
+                    
+                    # Debt to Equity historical
+                    total_debt_qoq = calculate_historical_metrics(
+                        None, quarterly_balance_sheet, 'Total Debt', 1)
+                    total_equity_qoq = calculate_historical_metrics(
+                        None, quarterly_balance_sheet, 'Total Equity Gross Minority Interest', 1)
+                    
+                    if total_debt_qoq and total_equity_qoq:
+                        historical_metrics['debt_to_equity_qoq'] = total_debt_qoq / total_equity_qoq
+                    
+                    # YoY Debt to Equity
+                    total_debt_yoy = calculate_historical_metrics(
+                        None, quarterly_balance_sheet, 'Total Debt', 4)
+                    total_equity_yoy = calculate_historical_metrics(
+                        None, quarterly_balance_sheet, 'Total Equity Gross Minority Interest', 4)
+                    
+                    if total_debt_yoy and total_equity_yoy:
+                        historical_metrics['debt_to_equity_yoy'] = total_debt_yoy / total_equity_yoy
                         
-                        if total_debt_yoy and total_equity_yoy:
-                            historical_metrics['debt_to_equity_yoy'] = total_debt_yoy / total_equity_yoy
-                            
-                except Exception as e:
-                    print(f"Error calculating historical metrics: {e}")
-                
-                return historical_metrics
-            
-            # Get historical metrics
-            historical_data = calculate_historical_ratios()
-            
-            # Extract comprehensive fundamental data
-            fundamentals_data = {
-                "symbol": symbol.upper(),
-                "name": info.get('longName', symbol),
-                "exchange": exchange,
-                "sector": info.get('sector'),
-                "industry": info.get('industry'),
-                
-                # Price data
-                "current_price": current_price,
-                "price_change": price_change,
-                "price_change_percent": price_change_percent,
-                "volume": int(latest.get('Volume', 0)) if latest.get('Volume') else None,
-                
-                # Basic valuation metrics
-                "market_cap": safe_float(info.get('marketCap')),
-                "pe_ratio": safe_float(info.get('trailingPE')),
-                "pb_ratio": safe_float(info.get('priceToBook')),
-                "price_to_sales": safe_float(info.get('priceToSalesTrailing12Months')),
-                "price_to_earnings_growth": safe_float(info.get('pegRatio')),
-                
-                # Profitability metrics
-                "eps": safe_float(info.get('trailingEps')),
-                "gross_margin": safe_float(info.get('grossMargins')) * 100 if safe_float(info.get('grossMargins')) else None,
-                "operating_margin": safe_float(info.get('operatingMargins')) * 100 if safe_float(info.get('operatingMargins')) else None,
-                "profit_margin": safe_float(info.get('profitMargins')) * 100 if safe_float(info.get('profitMargins')) else None,
-                "book_value": safe_float(info.get('bookValue')),
-                
-                # Financial strength metrics
-                "current_ratio": safe_float(info.get('currentRatio')),
-                "debt_to_equity": safe_float(info.get('debtToEquity')),
-                "beta": safe_float(info.get('beta')),
-                
-                # Growth metrics
-                "revenue_growth": safe_float(info.get('revenueGrowth')) * 100 if safe_float(info.get('revenueGrowth')) else None,
-                "earnings_growth": safe_float(info.get('earningsGrowth')) * 100 if safe_float(info.get('earningsGrowth')) else None,
-                
-                # Cash flow and enterprise value
-                "enterprise_value": safe_float(info.get('enterpriseValue')),
-                "ebitda": to_crores(safe_float(info.get('ebitda'))),
-                "free_cash_flow": to_crores(safe_float(info.get('freeCashflow'))),
-                
-                # Revenue and profit (in crores)
-                "revenue": to_crores(safe_float(info.get('totalRevenue'))),
-                "net_income": to_crores(safe_float(info.get('netIncomeToCommon'))),
-                
-                # Dividend metrics
-                "dividend_yield": safe_float(info.get('dividendYield')) * 100 if safe_float(info.get('dividendYield')) else None,
-                "dividend_per_share": safe_float(info.get('dividendRate')),
-                "payout_ratio": safe_float(info.get('payoutRatio')) * 100 if safe_float(info.get('payoutRatio')) else None,
-                
-                # Historical data for trend analysis
-                "pe_ratio_qoq": historical_data.get('pe_ratio_qoq'),
-                "current_ratio_qoq": historical_data.get('current_ratio_qoq'),
-                "debt_to_equity_qoq": historical_data.get('debt_to_equity_qoq'),
-                "profit_margin_qoq": historical_data.get('profit_margin_qoq'),
-                "revenue_qoq": to_crores(historical_data.get('revenue_qoq')),
-                "eps_qoq": historical_data.get('eps_qoq'),
-                
-                "pe_ratio_yoy": historical_data.get('pe_ratio_yoy'),
-                "current_ratio_yoy": historical_data.get('current_ratio_yoy'),
-                "debt_to_equity_yoy": historical_data.get('debt_to_equity_yoy'),
-                "profit_margin_yoy": historical_data.get('profit_margin_yoy'),
-                "revenue_yoy": to_crores(historical_data.get('revenue_yoy')),
-                "eps_yoy": historical_data.get('eps_yoy'),
-                
-                "last_updated": datetime.utcnow()
-            }
+            except Exception as e:
+                print(f"Error calculating historical metrics: {e}")
             
-            return fundamentals_data
+            return historical_metrics
+        
+        # Get historical metrics
+        historical_data = calculate_historical_ratios()
+        
+        return {
+            # Historical data for trend analysis
+            "pe_ratio_qoq": historical_data.get('pe_ratio_qoq'),
+            "current_ratio_qoq": historical_data.get('current_ratio_qoq'),
+            "debt_to_equity_qoq": historical_data.get('debt_to_equity_qoq'),
+            "profit_margin_qoq": historical_data.get('profit_margin_qoq'),
+            "revenue_qoq": StockService._to_crores(historical_data.get('revenue_qoq')),
+            "eps_qoq": historical_data.get('eps_qoq'),
             
-        except Exception as e:
-            print(f"Error fetching Yahoo Finance data for {symbol}: {e}")
-            return None
+            "pe_ratio_yoy": historical_data.get('pe_ratio_yoy'),
+            "current_ratio_yoy": historical_data.get('current_ratio_yoy'),
+            "debt_to_equity_yoy": historical_data.get('debt_to_equity_yoy'),
+            "profit_margin_yoy": historical_data.get('profit_margin_yoy'),
+            "revenue_yoy": StockService._to_crores(historical_data.get('revenue_yoy')),
+            "eps_yoy": historical_data.get('eps_yoy'),
+        }
+    
+    @staticmethod
+    def _summary_projection(fields: Optional[List[str]] = None) -> Dict[str, int]:
+        """MongoDB projection for list reads; defaults to the StockSummaryResponse fields"""
+        fields = fields or SUMMARY_FIELDS
+        return {"_id": 0, "symbol": 1, **{field_name: 1 for field_name in fields}}
     
     @staticmethod
-    async def search_stocks(query: str, limit: int = 10) -> List[StockResponse]:
-        """Search for stocks by symbol or name"""
+    def _summary_from_document(document: Dict[str, Any], fields: Optional[List[str]] = None) -> StockSummaryResponse:
+        """Build a list item from a projected document; missing fields are returned as null"""
+        fields = fields or SUMMARY_FIELDS
+        return StockSummaryResponse(
+            symbol=document["symbol"],
+            **{field_name: document.get(field_name) for field_name in fields if field_name != "symbol"}
+        )
+    
+    @staticmethod
+    def summarize(stock: StockResponse, fields: Optional[List[str]] = None) -> StockSummaryResponse:
+        """Reduce a full StockResponse to the list representation, keeping its staleness flags"""
+        fields = fields or SUMMARY_FIELDS
+        # Values come from a validated StockResponse - no need to validate them again
+        return StockSummaryResponse.model_construct(
+            **stock.dict(include={"symbol", "is_stale", "data_age_seconds", *fields})
+        )
+    
+    @staticmethod
+    def to_quote(stock: StockResponse) -> StockQuoteResponse:
+        """Reduce a full StockResponse to the quote fields (e.g. for WebSocket ticks)"""
+        return StockQuoteResponse.model_construct(**stock.dict(include=set(StockQuoteResponse.__fields__)))
+    
+    @staticmethod
+    def suggest_stocks(query: str, limit: int = 10) -> List[StockSummaryResponse]:
+        """Typeahead suggestions (symbol, name, match type) served from the in-memory index"""
+        return [
+            StockSummaryResponse(symbol=match.symbol, name=match.name, match=match.match_type)
+            for match in stock_search_index.search(query, limit)
+        ]
+    
+    @staticmethod
+    async def search_stocks(query: str, limit: int = 10, fields: Optional[List[str]] = None) -> List[StockSummaryResponse]:
+        """Search for stocks by symbol or name, reading only the requested fields"""
         try:
-            stocks = await Stock.find(
+            if len(stock_search_index):
+                # Ranked symbols from the index, then one $in read for their data
+                matches = stock_search_index.search(query, limit)
+                if not matches:
+                    return []
+                
+                documents = await Stock.get_motor_collection().find(
+                    {"symbol": {"$in": [match.symbol for match in matches]}},
+                    StockService._summary_projection(fields)
+                ).to_list(length=limit)
+                documents_by_symbol = {document["symbol"]: document for document in documents}
+                
+                # Keep index ranking; symbols neither stored nor staged for writing have
+                # no data to return and are skipped (suggest_stocks lists them by name)
+                summaries = []
+                for match in matches:
+                    # Fields staged in the write buffer are newer than what MongoDB returned
+                    document = stock_write_buffer.overlay_document(match.symbol, documents_by_symbol.get(match.symbol))
+                    if document is not None:
+                        summaries.append(StockService._summary_from_document(document, fields))
+                return summaries
+            
+            # Index not built (e.g. startup load failed) - fall back to scanning
+            stocks = await Stock.get_motor_collection().find(
                 {
                     "$or": [
                         {"symbol": {"$regex": query, "$options": "i"}},
                         {"name": {"$regex": query, "$options": "i"}}
                     ]
-                }
-            ).limit(limit).to_list()
+                },
+                StockService._summary_projection(fields)
+            ).limit(limit).to_list(length=limit)
             
             return [
-                StockResponse(
-                    symbol=stock.symbol,
-                    name=stock.name,
-                    exchange=stock.exchange,
-                    current_price=stock.current_price,
-                    price_change=stock.price_change,
-                    price_change_percent=stock.price_change_percent,
-                    market_cap=stock.market_cap,
-                    pe_ratio=stock.pe_ratio,
-                    last_updated=stock.last_updated
-                )
+                StockService._summary_from_document(stock_write_buffer.overlay_document(stock["symbol"], stock), fields)
                 for stock in stocks
             ]
             
@@ -399,28 +930,61 @@ class StockService:
             return []
     
     @staticmethod
-    async def get_trending_stocks(limit: int = 10) -> List[StockResponse]:
-        """Get trending stocks (most recently updated)"""
+    async def get_trending_stocks(limit: int = 10, fields: Optional[List[str]] = None) -> List[StockSummaryResponse]:
+        """Get trending stocks by recent activity, reading only the requested fields"""
         try:
-            stocks = await Stock.find(
-                {"is_active": True}
-            ).sort([("last_updated", -1)]).limit(limit).to_list()
+            trending_symbols = trending_tracker.top(limit)
+            if trending_symbols:
+                documents = await Stock.get_motor_collection().find(
+                    {"symbol": {"$in": trending_symbols}},
+                    StockService._summary_projection(fields)
+                ).to_list(length=limit)
+                documents_by_symbol = {document["symbol"]: document for document in documents}
+                
+                # Keep activity order; symbols neither stored nor staged for writing are skipped
+                summaries = []
+                for symbol in trending_symbols:
+                    document = stock_write_buffer.overlay_document(symbol, documents_by_symbol.get(symbol))
+                    if document is not None:
+                        summaries.append(StockService._summary_from_document(document, fields))
+                return summaries
+            
+            # No activity recorded yet - fall back to the most recently updated stocks
+            stocks = await Stock.get_motor_collection().find(
+                {"is_active": True},
+                StockService._summary_projection(fields)
+            ).sort([("last_updated", -1)]).limit(limit).to_list(length=limit)
             
             return [
-                StockResponse(
-                    symbol=stock.symbol,
-                    name=stock.name,
-                    exchange=stock.exchange,
-                    current_price=stock.current_price,
-                    price_change=stock.price_change,
-                    price_change_percent=stock.price_change_percent,
-                    market_cap=stock.market_cap,
-                    pe_ratio=stock.pe_ratio,
-                    last_updated=stock.last_updated
-                )
+                StockService._summary_from_document(stock_write_buffer.overlay_document(stock["symbol"], stock), fields)
                 for stock in stocks
             ]
             
         except Exception as e:
             print(f"Error getting trending stocks: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    @staticmethod
+    def get_coalescing_stats() -> Dict[str, Dict[str, Any]]:
+        """Single-flight counters showing how much duplicate work was eliminated"""
+        return {
+            flight.name: flight.get_stats()
+            for flight in (
+                stock_data_flight, stock_quote_flight, stock_refresh_flight, historical_backfill_flight
+            )
+        }
+
+# Ready, serialized stock snapshots keyed by upper-cased symbol
+stock_snapshot_cache: LRUTTLCache[StockSnapshot] = LRUTTLCache(
+    "stock_snapshots",
+    max_entries=settings.STOCK_SNAPSHOT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.STOCK_SNAPSHOT_CACHE_MAX_BYTES,
+    default_ttl=settings.STOCK_QUOTE_TTL_SECONDS,
+    sizeof=StockSnapshot.size,
+)
+
+# Global single-flight groups, keyed by upper-cased symbol (refreshes also by field groups)
+stock_data_flight = SingleFlight("stock_data")
+stock_quote_flight = SingleFlight("stock_quote")
+stock_refresh_flight = SingleFlight("stock_refresh")
+historical_backfill_flight = SingleFlight("historical_backfill")
@@ -0,0 +1,214 @@
+"""
+Stock Write Buffer
+Write-behind buffer that persists only changed Stock fields, one bulk write per interval
+"""
+
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+from pymongo import UpdateOne
+from app.core.cache import LRUTTLCache
+from app.core.config import settings
+from app.models.stock import Stock
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class StockWriteBuffer:
+    """
+    Coalesces Stock upserts.
+
+    Staged fields are diffed against the last state persisted (or loaded)
+    for the symbol and only changed ones are kept. Repeated updates of a
+    symbol within an interval collapse into one, and all pending updates are
+    flushed as a single unordered bulk_write. Freshness timestamps always
+    count as changes, so other readers and restarts see the data as fresh.
+
+    Persisted states are kept for a bounded number of recently written
+    symbols; one evicted or expired simply diffs against the document the
+    caller loaded again.
+    """
+
+    TIMESTAMP_FIELDS = {"last_updated", "quote_updated", "info_updated", "statements_updated"}
+
+    def __init__(self, flush_interval: float, baseline_max_symbols: int, baseline_ttl: float):
+        self.flush_interval = flush_interval
+        self._persisted: LRUTTLCache[Dict[str, Any]] = LRUTTLCache(
+            "stock_write_baselines",
+            max_entries=baseline_max_symbols,
+            max_bytes=baseline_max_symbols * 16 * 1024,
+            default_ttl=baseline_ttl,
+        )
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flushing: Dict[str, Dict[str, Any]] = {}  # Taken by the bulk write in progress
+        self._on_insert: Dict[str, Dict[str, Any]] = {}
+        self._flushing_on_insert: Dict[str, Dict[str, Any]] = {}
+        self._flush_lock = asyncio.Lock()
+        self.staged = 0
+        self.unchanged = 0  # Stagings where nothing but timestamps changed
+        self.fields_skipped = 0
+        self.flushes = 0
+        self.operations = 0
+        self.errors = 0
+        self.is_running = False
+        self.task = None
+
+    @staticmethod
+    def _same(a: Any, b: Any) -> bool:
+        # NaN from upstream compares unequal to itself
+        return a == b or (a != a and b != b)
+
+    def stage(
+        self,
+        symbol: str,
+        fields: Dict[str, Any],
+        stored: Optional[Stock] = None,
+        on_insert: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Queue changed fields of a symbol for the next flush
+
+        `stored` is the document the fields were fetched for, used as the diff
+        baseline until something has been persisted by this buffer.
+        `on_insert` holds defaults for symbols without a document yet.
+        """
+        symbol = symbol.upper()
+        persisted = self._persisted.get(symbol)
+        if persisted is None and stored is not None:
+            persisted = stored.dict(include=set(Stock.__fields__) - {"id", "revision_id"})
+            self._persisted.set(symbol, persisted)
+        persisted = persisted or {}
+        pending = self._pending.get(symbol, {})
+
+        changes = {}
+        for field_name, value in fields.items():
+            current = pending.get(field_name, persisted.get(field_name, _MISSING))
+            if current is not _MISSING and self._same(current, value):
+                self.fields_skipped += 1
+                continue
+            changes[field_name] = value
+        # Nothing to write - an empty $set would fail the whole bulk write
+        if changes:
+            self._pending.setdefault(symbol, {}).update(changes)
+            if on_insert:
+                self._on_insert.setdefault(symbol, on_insert)
+        content_changed = any(field_name not in self.TIMESTAMP_FIELDS for field_name in changes)
+
+        self.staged += 1
+        if not content_changed:
+            self.unchanged += 1
+
+    def pending(self, symbol: str) -> Dict[str, Any]:
+        """Fields staged for a symbol but not yet written (including a write in progress)"""
+        symbol = symbol.upper()
+        flushing = self._flushing.get(symbol)
+        pending = self._pending.get(symbol, {})
+        return {**flushing, **pending} if flushing else pending
+
+    def overlay(self, stock: Optional[Stock]) -> Optional[Stock]:
+        """Apply not yet written fields to a document read from MongoDB"""
+        if stock is not None:
+            for field_name, value in self.pending(stock.symbol).items():
+                setattr(stock, field_name, value)
+        return stock
+
+    def overlay_document(self, symbol: str, document: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        overlay() for raw (e.g. projected) documents
+
+        Symbols staged but not written yet get a document made of their
+        insert defaults and pending fields.
+        """
+        symbol = symbol.upper()
+        pending = self.pending(symbol)
+        if not pending:
+            return document
+        if document is None:
+            on_insert = self._on_insert.get(symbol) or self._flushing_on_insert.get(symbol, {})
+            document = {"symbol": symbol, **on_insert}
+        return {**document, **pending}
+
+    async def flush(self):
+        """Write all pending updates in one bulk write"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, {}
+            on_insert, self._on_insert = self._on_insert, {}
+            self._flushing, self._flushing_on_insert = pending, on_insert
+            operations = []
+            for symbol, fields in pending.items():
+                update = {"$set": fields}
+                if symbol in on_insert:
+                    update["$setOnInsert"] = {
+                        field_name: value for field_name, value in on_insert[symbol].items()
+                        if field_name not in fields
+                    }
+                operations.append(UpdateOne({"symbol": symbol}, update, upsert=True))
+
+            try:
+                await Stock.get_motor_collection().bulk_write(operations, ordered=False)
+            except Exception as e:
+                self._flushing, self._flushing_on_insert = {}, {}
+                self.errors += 1
+                logger.error(f"Failed to flush {len(operations)} stock updates: {e}")
+                # Re-queue under anything staged meanwhile, which is newer
+                for symbol, fields in pending.items():
+                    self._pending[symbol] = {**fields, **self._pending.get(symbol, {})}
+                for symbol, defaults in on_insert.items():
+                    self._on_insert.setdefault(symbol, defaults)
+                return
+
+            self._flushing, self._flushing_on_insert = {}, {}
+            for symbol, fields in pending.items():
+                self._persisted.set(symbol, {**(self._persisted.peek(symbol) or {}), **fields})
+            self.flushes += 1
+            self.operations += len(operations)
+
+    async def start(self):
+        """Start the periodic flush task"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self.task = asyncio.create_task(self._flush_loop())
+        logger.info("Stock write buffer started")
+
+    async def stop(self):
+        """Stop the flush task and write everything still pending"""
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        logger.info("Stock write buffer stopped")
+
+    async def _flush_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Staging, diffing and flush counters"""
+        return {
+            "pending_symbols": len(self._pending),
+            "staged": self.staged,
+            "unchanged": self.unchanged,
+            "fields_skipped": self.fields_skipped,
+            "flushes": self.flushes,
+            "operations": self.operations,
+            "errors": self.errors,
+            "baselines": self._persisted.get_stats(),
+        }
+
+# Global stock write buffer instance
+stock_write_buffer = StockWriteBuffer(
+    flush_interval=settings.STOCK_WRITE_FLUSH_INTERVAL_SECONDS,
+    baseline_max_symbols=settings.STOCK_WRITE_BASELINE_MAX_SYMBOLS,
+    baseline_ttl=settings.STOCK_WRITE_BASELINE_TTL_SECONDS,
+)
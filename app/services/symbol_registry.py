@@ -0,0 +1,278 @@
+"""
+Symbol Registry
+The stock universe (symbol, name, aliases, ISIN, industry, exchange) loaded from the symbol master CSV
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
+import asyncio
+import bisect
+import csv
+import logging
+import os
+import re
+from app.core.config import settings
+from app.services.search_index import stock_search_index
+
+logger = logging.getLogger(__name__)
+
+# Accepted header names per column: the Nifty index lists ("Company Name",
+# "ISIN Code") and the full NSE equity list ("NAME OF COMPANY", "ISIN NUMBER")
+COLUMNS = {
+    "symbol": ("Symbol", "SYMBOL"),
+    "name": ("Company Name", "NAME OF COMPANY"),
+    "isin": ("ISIN Code", "ISIN NUMBER"),
+    "industry": ("Industry", "INDUSTRY"),
+    "series": ("Series", "SERIES"),
+    "exchange": ("Exchange", "EXCHANGE"),
+    "aliases": ("Aliases", "ALIASES"),
+}
+
+# Series of ordinary equity listings; others (bonds, rights, ...) are skipped
+EQUITY_SERIES = {"", "EQ", "BE", "BZ", "SM", "ST"}
+
+US_EXCHANGES = {"NASDAQ", "NYSE", "AMEX"}
+
+@dataclass(frozen=True)
+class SymbolInfo:
+    symbol: str
+    name: str
+    exchange: str
+    industry: Optional[str] = None
+    isin: Optional[str] = None
+    aliases: Tuple[str, ...] = ()
+
+class _SymbolTable:
+    """
+    Immutable, indexed snapshot of the universe.
+
+    Entries are kept sorted by symbol (for prefix range scans with bisect);
+    hash maps point from symbol, ISIN and normalized name/alias to a row.
+    """
+
+    def __init__(self, entries: Iterable[SymbolInfo]):
+        self.entries: List[SymbolInfo] = sorted(entries, key=lambda entry: entry.symbol)
+        self.symbols: List[str] = [entry.symbol for entry in self.entries]
+        self.by_symbol: Dict[str, int] = {}
+        self.by_isin: Dict[str, int] = {}
+        self.by_name: Dict[str, int] = {}
+        self.by_industry: Dict[str, List[int]] = {}
+        self.max_name_words = 1
+
+        for row, entry in enumerate(self.entries):
+            self.by_symbol[entry.symbol] = row
+            if entry.isin:
+                self.by_isin[entry.isin] = row
+            if entry.industry:
+                self.by_industry.setdefault(entry.industry, []).append(row)
+            for key in SymbolRegistry.name_keys(entry):
+                # First listing wins when two share a name
+                self.by_name.setdefault(key, row)
+                self.max_name_words = max(self.max_name_words, key.count(" ") + 1)
+
+class SymbolRegistry:
+    """
+    Shared symbol universe.
+
+    Loaded once from SYMBOL_MASTER_CSV_PATH at startup and swapped atomically
+    when the file changes, so readers always see a complete snapshot. Names
+    and aliases are also fed into the stock search index.
+    """
+
+    # Company-name suffixes dropped to get the short name people actually type
+    NAME_SUFFIXES = ("LIMITED", "LTD", "INC", "CORPORATION", "CORP")
+
+    def __init__(self, path: str, reload_interval: int):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._table = _SymbolTable([])
+        self._mtime: Optional[float] = None
+        self.loads = 0
+        self.is_running = False
+        self.task = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Upper-case, drop apostrophes and collapse other punctuation to single spaces"""
+        return " ".join(re.sub(r"[^A-Z0-9&]+", " ", text.upper().replace("'", "")).split())
+
+    @staticmethod
+    def name_keys(entry: SymbolInfo) -> List[str]:
+        """Normalized full name, short name and aliases of an entry"""
+        keys = []
+        for text in (entry.name, *entry.aliases):
+            key = SymbolRegistry.normalize(text)
+            if not key:
+                continue
+            keys.append(key)
+            words = key.split(" ")
+            while len(words) > 1 and words[-1] in SymbolRegistry.NAME_SUFFIXES:
+                words.pop()
+                keys.append(" ".join(words))
+        return list(dict.fromkeys(keys))
+
+    def __len__(self) -> int:
+        return len(self._table.entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._table.by_symbol
+
+    @property
+    def symbols(self) -> List[str]:
+        """All symbols, sorted"""
+        return self._table.symbols
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        table = self._table
+        row = table.by_symbol.get(symbol.upper())
+        return table.entries[row] if row is not None else None
+
+    def get_by_isin(self, isin: str) -> Optional[SymbolInfo]:
+        table = self._table
+        row = table.by_isin.get(isin.strip().upper())
+        return table.entries[row] if row is not None else None
+
+    def find_by_name(self, name: str) -> Optional[str]:
+        """Symbol whose company name or alias is exactly this text"""
+        table = self._table
+        row = table.by_name.get(self.normalize(name))
+        return table.entries[row].symbol if row is not None else None
+
+    def with_prefix(self, prefix: str, limit: int = 10) -> List[str]:
+        """Symbols starting with a prefix, sorted"""
+        prefix = prefix.upper()
+        symbols = self._table.symbols
+        start = bisect.bisect_left(symbols, prefix)
+        end = bisect.bisect_left(symbols, prefix + "\uffff", lo=start)
+        return symbols[start:min(end, start + limit)]
+
+    def industry(self, symbol: str) -> Optional[str]:
+        entry = self.get(symbol)
+        return entry.industry if entry else None
+
+    def symbols_in_industry(self, industry: str) -> List[str]:
+        table = self._table
+        return [table.entries[row].symbol for row in table.by_industry.get(industry, ())]
+
+    def is_us_listed(self, symbol: str) -> bool:
+        entry = self.get(symbol)
+        return bool(entry and entry.exchange in US_EXCHANGES)
+
+    def match_names(self, text: str) -> List[str]:
+        """
+        Symbols whose company name or alias appears in free text
+
+        Word n-grams of the text are looked up directly, longest first, so
+        "INOX WIND LIMITED" wins over "INOX WIND" and cost doesn't grow with
+        the size of the universe.
+        """
+        table = self._table
+        words = self.normalize(text).split(" ")
+        matches = []
+        for size in range(min(table.max_name_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                row = table.by_name.get(" ".join(words[start:start + size]))
+                if row is not None:
+                    matches.append(table.entries[row].symbol)
+        return list(dict.fromkeys(matches))
+
+    def _read(self) -> List[SymbolInfo]:
+        with open(self.path, "r", encoding="utf-8-sig", newline="") as file:
+            reader = csv.DictReader(file)
+            headers = {header.strip(): header for header in reader.fieldnames or ()}
+            columns = {
+                column: next((headers[name] for name in names if name in headers), None)
+                for column, names in COLUMNS.items()
+            }
+            if not columns["symbol"] or not columns["name"]:
+                raise ValueError(f"{self.path} has no symbol/company name columns")
+
+            def value(row: Dict[str, str], column: str) -> str:
+                header = columns[column]
+                return (row.get(header) or "").strip() if header else ""
+
+            entries = []
+            for row in reader:
+                symbol = value(row, "symbol").upper()
+                name = value(row, "name")
+                if not symbol or not name or value(row, "series").upper() not in EQUITY_SERIES:
+                    continue
+                entries.append(SymbolInfo(
+                    symbol=symbol,
+                    name=name,
+                    exchange=value(row, "exchange").upper() or "NSE",
+                    industry=value(row, "industry") or None,
+                    isin=value(row, "isin").upper() or None,
+                    aliases=tuple(alias.strip() for alias in value(row, "aliases").split("|") if alias.strip()),
+                ))
+            return entries
+
+    async def load(self) -> bool:
+        """(Re)load the master file, keeping the current universe on failure"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            table = _SymbolTable(await asyncio.to_thread(self._read))
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to load symbol master {self.path}: {e}")
+            return False
+
+        previous, self._table = self._table, table
+        self._mtime = mtime
+        self.loads += 1
+        # Rows deleted (or renamed) in the master file stop being searchable
+        for symbol in set(previous.by_symbol) - set(table.by_symbol):
+            stock_search_index.remove(symbol)
+        for entry in table.entries:
+            stock_search_index.upsert(entry.symbol, entry.name, entry.aliases)
+        print(f"✅ Loaded {len(table.entries)} symbols from {self.path}")
+        return True
+
+    async def reload_if_changed(self) -> bool:
+        """Reload when the master file was modified since the last load"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return await self.load()
+
+    async def start(self):
+        """Start watching the master file for changes"""
+        if self.is_running or self.reload_interval <= 0:
+            return
+
+        self.is_running = True
+        self.task = asyncio.create_task(self._reload_loop())
+        logger.info("Symbol registry reload watcher started")
+
+    async def stop(self):
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Symbol registry reload watcher stopped")
+
+    async def _reload_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload_if_changed()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Universe size and load count"""
+        table = self._table
+        return {
+            "symbols": len(table.entries),
+            "names": len(table.by_name),
+            "industries": len(table.by_industry),
+            "loads": self.loads,
+        }
+
+# Global symbol registry instance
+symbol_registry = SymbolRegistry(
+    path=settings.SYMBOL_MASTER_CSV_PATH,
+    reload_interval=settings.SYMBOL_MASTER_RELOAD_SECONDS,
+)
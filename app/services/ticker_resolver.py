@@ -0,0 +1,267 @@
+"""
+Ticker Resolver
+Remembers which Yahoo Finance ticker variant (.NS, .BO, bare/ADR) works for each symbol
+"""
+
+from typing import Collection, Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.core.resilience import UpstreamUnavailableError
+from app.core.singleflight import SingleFlight
+from app.models.stock import TickerResolution
+from app.services.market_data_provider import market_data_provider
+from app.services.symbol_registry import symbol_registry
+
+@dataclass
+class ResolvedTicker:
+    """A symbol's working Yahoo Finance ticker"""
+    ticker_symbol: str
+    exchange: str
+
+class TickerResolver:
+    """
+    Shared, persistent symbol -> ticker resolution.
+
+    Successful resolutions are cached in memory and in MongoDB so each symbol
+    is probed upstream once. Symbols for which no variant returns data are
+    negatively cached with an exponential backoff, so repeated lookups of
+    typos or delisted names don't hit the upstream.
+
+    An empty result for a resolved ticker is usually transient (throttling,
+    a trading halt), so the resolution is kept; the variants are only probed
+    again after repeated empty results, and a symbol that once resolved is
+    never negatively cached.
+    """
+
+    def __init__(self):
+        self._resolved: Dict[str, ResolvedTicker] = {}
+        self._unknown_until: Dict[str, datetime] = {}
+        self._empty_results: Dict[str, int] = {}  # Consecutive empty results per resolved symbol
+        self._flight = SingleFlight("ticker_resolution")
+        self.memory_hits = 0
+        self.negative_hits = 0
+        self.mongo_hits = 0
+        self.probes = 0
+        self.reprobes = 0
+
+    @staticmethod
+    def candidate_tickers(symbol: str) -> List[Tuple[str, str]]:
+        """Ticker variants to try for a symbol, in priority order"""
+        symbol = symbol.upper()
+        # US listings are tried as-is first
+        if symbol_registry.is_us_listed(symbol):
+            return [
+                (symbol, symbol_registry.get(symbol).exchange),
+                (f"{symbol}.NS", "NSE (India)"),
+                (f"{symbol}.BO", "BSE (India)"),
+            ]
+        # For Indian market focus - prioritize NSE (.NS) over ADRs
+        return [
+            (f"{symbol}.NS", "NSE (India)"),
+            (symbol, "NYSE/NASDAQ (ADR)"),  # Clearly indicate it's an ADR
+            (f"{symbol}.BO", "BSE (India)"),
+        ]
+
+    async def load(self):
+        """Warm the in-memory cache from MongoDB"""
+        try:
+            now = datetime.utcnow()
+            async for resolution in TickerResolution.find_all():
+                if resolution.ticker_symbol:
+                    self._resolved[resolution.symbol] = ResolvedTicker(
+                        resolution.ticker_symbol, resolution.exchange
+                    )
+                elif resolution.is_unknown and resolution.retry_after and resolution.retry_after > now:
+                    self._unknown_until[resolution.symbol] = resolution.retry_after
+            print(f"✅ Loaded {len(self._resolved)} ticker resolutions")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to load ticker resolutions: {e}")
+
+    async def resolve(self, symbol: str, tried: Collection[str] = ()) -> Optional[ResolvedTicker]:
+        """
+        Get the working ticker for a symbol, probing upstream only if unknown
+
+        `tried` are ticker variants the caller already found empty (e.g. in a
+        batched download); they are not probed again.
+        """
+        symbol = symbol.upper()
+
+        resolved = self._resolved.get(symbol)
+        if resolved:
+            self.memory_hits += 1
+            return resolved
+
+        retry_after = self._unknown_until.get(symbol)
+        if retry_after and retry_after > datetime.utcnow():
+            self.negative_hits += 1
+            return None
+
+        return await self._flight.do(symbol, lambda: self._resolve(symbol, tried))
+
+    def peek(self, symbol: str) -> Optional[ResolvedTicker]:
+        """In-memory resolution only - never probes upstream"""
+        return self._resolved.get(symbol.upper())
+
+    def is_negatively_cached(self, symbol: str) -> bool:
+        """Check if a symbol is currently known to have no working ticker"""
+        retry_after = self._unknown_until.get(symbol.upper())
+        return bool(retry_after and retry_after > datetime.utcnow())
+
+    async def remember(self, symbol: str, resolved: ResolvedTicker):
+        """Record a ticker found to work elsewhere (e.g. by a batched download)"""
+        symbol = symbol.upper()
+        self._empty_results.pop(symbol, None)
+        if self._resolved.get(symbol) == resolved:
+            return
+        self._resolved[symbol] = resolved
+        self._unknown_until.pop(symbol, None)
+        await self._store(symbol, {
+            "ticker_symbol": resolved.ticker_symbol,
+            "exchange": resolved.exchange,
+            "is_unknown": False,
+            "failure_count": 0,
+            "retry_after": None,
+            "last_checked": datetime.utcnow(),
+        })
+
+    def report_data(self, symbol: str):
+        """The resolved ticker returned data"""
+        self._empty_results.pop(symbol.upper(), None)
+
+    async def report_empty(self, symbol: str) -> Optional[ResolvedTicker]:
+        """
+        The resolved ticker returned no data; returns the resolution to use next
+
+        After TICKER_EMPTY_REPROBE_THRESHOLD consecutive empty results the
+        variants are probed again, switching to another one if it has data.
+        """
+        symbol = symbol.upper()
+        previous = self._resolved.get(symbol)
+        if previous is None:
+            return None
+
+        empty_results = self._empty_results.get(symbol, 0) + 1
+        if empty_results < settings.TICKER_EMPTY_REPROBE_THRESHOLD:
+            self._empty_results[symbol] = empty_results
+            return previous
+
+        self._empty_results.pop(symbol, None)
+        return await self._flight.do(symbol, lambda: self._reprobe(symbol, previous))
+
+    async def invalidate(self, symbol: str):
+        """Forget a resolution, e.g. when the resolved ticker stopped returning data"""
+        symbol = symbol.upper()
+        self._resolved.pop(symbol, None)
+        self._unknown_until.pop(symbol, None)
+        try:
+            await TickerResolution.find_one({"symbol": symbol}).delete()
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to delete ticker resolution for {symbol}: {e}")
+
+    async def _resolve(self, symbol: str, tried: Collection[str] = ()) -> Optional[ResolvedTicker]:
+        now = datetime.utcnow()
+
+        # Check MongoDB before going upstream
+        stored = None
+        try:
+            stored = await TickerResolution.find_one({"symbol": symbol})
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to read ticker resolution for {symbol}: {e}")
+
+        if stored:
+            if stored.ticker_symbol:
+                self.mongo_hits += 1
+                resolved = ResolvedTicker(stored.ticker_symbol, stored.exchange)
+                self._resolved[symbol] = resolved
+                return resolved
+            if stored.is_unknown and stored.retry_after and stored.retry_after > now:
+                self.mongo_hits += 1
+                self._unknown_until[symbol] = stored.retry_after
+                return None
+
+        resolved, upstream_error = await self._probe(symbol, skip=tried)
+        if resolved:
+            await self.remember(symbol, resolved)
+            return resolved
+
+        # Errors say nothing about the symbol - don't negatively cache them
+        if upstream_error:
+            return None
+
+        failure_count = (stored.failure_count if stored else 0) + 1
+        backoff_seconds = min(
+            settings.TICKER_NEGATIVE_TTL_SECONDS * 2 ** (failure_count - 1),
+            settings.TICKER_NEGATIVE_MAX_TTL_SECONDS
+        )
+        retry_after = now + timedelta(seconds=backoff_seconds)
+        self._unknown_until[symbol] = retry_after
+        await self._store(symbol, {
+            "ticker_symbol": None,
+            "exchange": None,
+            "is_unknown": True,
+            "failure_count": failure_count,
+            "retry_after": retry_after,
+            "last_checked": now,
+        })
+        print(f"❌ No ticker variant found for {symbol}, retrying after {backoff_seconds}s")
+        return None
+
+    async def _reprobe(self, symbol: str, previous: ResolvedTicker) -> ResolvedTicker:
+        self.reprobes += 1
+        # The known ticker just came back empty - only the other variants are probed
+        resolved, _ = await self._probe(symbol, skip=(previous.ticker_symbol,))
+        if resolved and resolved != previous:
+            print(f"🔄 Ticker for {symbol} changed from {previous.ticker_symbol} to {resolved.ticker_symbol}")
+            await self.remember(symbol, resolved)
+            return resolved
+        # Nothing else has data either - keep the known ticker
+        return previous
+
+    async def _probe(self, symbol: str, skip: Collection[str] = ()) -> Tuple[Optional[ResolvedTicker], bool]:
+        """Try the variants (except `skip`) one at a time; returns the first with data and whether any call failed"""
+        upstream_error = False
+        for ticker_symbol, exchange in TickerResolver.candidate_tickers(symbol):
+            if ticker_symbol in skip:
+                continue
+            self.probes += 1
+            try:
+                hist = await market_data_provider.quote(ticker_symbol)
+            except UpstreamUnavailableError as e:
+                # Rate limited or circuit open - no point trying the other variants
+                print(f"⚠️ Skipping ticker probe for {symbol}: {e}")
+                return None, True
+            except Exception as e:
+                print(f"⚠️ Error probing ticker {ticker_symbol}: {e}")
+                upstream_error = True
+                continue
+
+            if not hist.empty:
+                return ResolvedTicker(ticker_symbol, exchange), upstream_error
+        return None, upstream_error
+
+    async def _store(self, symbol: str, fields: Dict[str, Any]):
+        try:
+            await TickerResolution.get_motor_collection().update_one(
+                {"symbol": symbol},
+                {"$set": fields},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to save ticker resolution for {symbol}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Resolution cache counters"""
+        return {
+            "resolved": len(self._resolved),
+            "negatively_cached": len(self._unknown_until),
+            "memory_hits": self.memory_hits,
+            "negative_hits": self.negative_hits,
+            "mongo_hits": self.mongo_hits,
+            "probes": self.probes,
+            "reprobes": self.reprobes,
+            "coalescing": self._flight.get_stats(),
+        }
+
+# Global ticker resolver instance
+ticker_resolver = TickerResolver()
@@ -0,0 +1,190 @@
+"""
+Trending Service
+Activity-based trending from exponentially decayed view, mention and subscribe counters
+"""
+
+from typing import Any, Dict, List
+from datetime import datetime, timezone
+import asyncio
+import heapq
+import logging
+import math
+import time
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.models.stock import TrendingScore
+
+logger = logging.getLogger(__name__)
+
+class TrendingTracker:
+    """
+    In-memory, time-decayed activity counters per symbol.
+
+    Uses forward decay: every event is stored as weight * e^(λ(t - t0)) for a
+    fixed landmark t0, so adding an event is O(1) and scores never need to be
+    decayed individually - relative order is preserved as time passes. The
+    landmark is moved forward (rescaling all scores) before values grow too
+    large. The top symbols are kept precomputed, so reads are O(K), and the
+    scores are periodically snapshotted to MongoDB to survive restarts.
+    """
+
+    # Relative weight of each kind of activity
+    VIEW_WEIGHT = 1.0
+    CHAT_MENTION_WEIGHT = 2.0
+    SUBSCRIBE_WEIGHT = 3.0
+
+    TOP_SIZE = 100  # Symbols kept precomputed for reads
+    TOP_REFRESH_SECONDS = 5
+    SNAPSHOT_SIZE = 1000  # Symbols persisted per snapshot
+    MAX_EXPONENT = 50.0  # Rescale before e^(λ(t - t0)) gets this large
+    MIN_SCORE = 1e-3  # Decayed scores below this are forgotten
+
+    def __init__(self, half_life_minutes: int, max_symbols: int, snapshot_interval: int):
+        self.decay_rate = math.log(2) / (half_life_minutes * 60)
+        self.max_symbols = max_symbols
+        self.snapshot_interval = snapshot_interval
+        self._landmark = time.time()
+        self._scores: Dict[str, float] = {}
+        self._top: List[str] = []
+        self._top_computed_at = 0.0
+        self._dirty = False
+        self.events = 0
+        self.is_running = False
+        self.task = None
+
+    def record(self, symbol: str, weight: float = VIEW_WEIGHT):
+        """Count one unit of activity for a symbol"""
+        now = time.time()
+        exponent = self.decay_rate * (now - self._landmark)
+        if exponent > self.MAX_EXPONENT:
+            self._rescale(now)
+            exponent = 0.0
+
+        symbol = symbol.upper()
+        self._scores[symbol] = self._scores.get(symbol, 0.0) + weight * math.exp(exponent)
+        self._dirty = True
+        self.events += 1
+
+    def record_view(self, symbol: str):
+        self.record(symbol, self.VIEW_WEIGHT)
+
+    def record_chat_mention(self, symbol: str):
+        self.record(symbol, self.CHAT_MENTION_WEIGHT)
+
+    def record_subscribe(self, symbol: str):
+        self.record(symbol, self.SUBSCRIBE_WEIGHT)
+
+    def score(self, symbol: str) -> float:
+        """Current decayed score of a symbol"""
+        stored = self._scores.get(symbol.upper(), 0.0)
+        return stored * math.exp(-self.decay_rate * (time.time() - self._landmark))
+
+    def top(self, limit: int = 10) -> List[str]:
+        """Most active symbols, best first"""
+        now = time.monotonic()
+        if self._dirty and now - self._top_computed_at >= self.TOP_REFRESH_SECONDS:
+            self._refresh_top()
+        return self._top[:limit]
+
+    def _refresh_top(self):
+        self._top = heapq.nlargest(self.TOP_SIZE, self._scores, key=self._scores.__getitem__)
+        self._top_computed_at = time.monotonic()
+        self._dirty = False
+
+    def _rescale(self, now: float):
+        """Move the landmark to now, forgetting symbols whose score decayed away"""
+        factor = math.exp(-self.decay_rate * (now - self._landmark))
+        self._scores = {
+            symbol: score * factor
+            for symbol, score in self._scores.items()
+            if score * factor >= self.MIN_SCORE
+        }
+        self._landmark = now
+
+    def _trim(self):
+        """Drop decayed-away symbols and the least active ones beyond max_symbols"""
+        self._rescale(time.time())
+        if len(self._scores) > self.max_symbols:
+            keep = heapq.nlargest(self.max_symbols, self._scores, key=self._scores.__getitem__)
+            self._scores = {symbol: self._scores[symbol] for symbol in keep}
+        self._refresh_top()
+
+    async def load(self):
+        """Restore scores from the last snapshot, decayed to now"""
+        try:
+            async for snapshot in TrendingScore.find_all():
+                snapshot_time = snapshot.snapshot_at.replace(tzinfo=timezone.utc).timestamp()
+                # Scores are kept relative to the landmark
+                self._scores[snapshot.symbol] = snapshot.score * math.exp(
+                    self.decay_rate * (snapshot_time - self._landmark)
+                )
+            self._refresh_top()
+            print(f"✅ Loaded trending scores for {len(self._scores)} symbols")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to load trending scores: {e}")
+
+    async def snapshot(self):
+        """Persist the current top scores, replacing the previous snapshot"""
+        self._trim()
+        if not self._scores:
+            return
+
+        now = time.time()
+        snapshot_at = datetime.utcfromtimestamp(now)
+        factor = math.exp(-self.decay_rate * (now - self._landmark))
+        top_symbols = heapq.nlargest(self.SNAPSHOT_SIZE, self._scores, key=self._scores.__getitem__)
+        operations = [
+            UpdateOne(
+                {"symbol": symbol},
+                {"$set": {"score": self._scores[symbol] * factor, "snapshot_at": snapshot_at}},
+                upsert=True
+            )
+            for symbol in top_symbols
+        ]
+        try:
+            collection = TrendingScore.get_motor_collection()
+            await collection.bulk_write(operations, ordered=False)
+            await collection.delete_many({"symbol": {"$nin": top_symbols}})
+        except Exception as e:
+            logger.error(f"Failed to snapshot trending scores: {e}")
+
+    async def start(self):
+        """Start the periodic snapshot task"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self.task = asyncio.create_task(self._snapshot_loop())
+        logger.info("Trending tracker started")
+
+    async def stop(self):
+        """Stop the snapshot task and write a final snapshot"""
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.snapshot()
+        logger.info("Trending tracker stopped")
+
+    async def _snapshot_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.snapshot()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tracked symbols and event counts"""
+        return {
+            "tracked_symbols": len(self._scores),
+            "events": self.events,
+            "top": [(symbol, round(self.score(symbol), 3)) for symbol in self.top(5)],
+        }
+
+# Global trending tracker instance
+trending_tracker = TrendingTracker(
+    half_life_minutes=settings.TRENDING_HALF_LIFE_MINUTES,
+    max_symbols=settings.TRENDING_MAX_SYMBOLS,
+    snapshot_interval=settings.TRENDING_SNAPSHOT_INTERVAL_SECONDS,
+)
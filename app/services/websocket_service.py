@@ -1,9 +1,9 @@
-import json
 import asyncio
 from typing import Dict, List, Set
 from fastapi import WebSocket, WebSocketDisconnect
 from datetime import datetime
 import logging
+from app.core.serialization import dumps, dumps_text
 
 logger = logging.getLogger(__name__)
 
@@ -58,12 +58,25 @@ class ConnectionManager:
 
     async def send_personal_message(self, message: dict, user_id: str):
         """Send message to specific user"""
+        await self._send_text(dumps_text(message), user_id)
+
+    async def send_personal_frame(self, envelope: dict, data_json: bytes, user_id: str):
+        """Send a message whose "data" is already serialized JSON to a specific user"""
+        await self._send_text(self._frame(envelope, data_json), user_id)
+
+    @staticmethod
+    def _frame(envelope: dict, data_json: bytes) -> str:
+        # Splice the bytes in as "data" instead of decoding and re-encoding them
+        return (dumps(envelope)[:-1] + b',"data":' + data_json + b"}").decode()
+
+    async def _send_text(self, text: str, user_id: str):
+        """Send an already serialized message to all connections of a user"""
         if user_id in self.active_connections:
             disconnected_connections = []
             
             for connection in self.active_connections[user_id]:
                 try:
-                    await connection.send_text(json.dumps(message))
+                    await connection.send_text(text)
                 except:
                     disconnected_connections.append(connection)
             
@@ -119,21 +132,21 @@ class ConnectionManager:
         
         logger.info(f"User {user_id} unsubscribed from {symbol}")
 
-    async def broadcast_stock_update(self, symbol: str, stock_data: dict):
-        """Broadcast stock update to all subscribers of the symbol"""
+    async def broadcast_stock_update(self, symbol: str, data_json: bytes, version: int):
+        """Broadcast a pre-serialized stock update to all subscribers of the symbol"""
         symbol = symbol.upper()
         
         if symbol in self.symbol_subscribers:
-            message = {
+            text = self._frame({
                 "type": "stock_update",
                 "symbol": symbol,
-                "data": stock_data,
+                "version": version,
                 "timestamp": datetime.utcnow().isoformat()
-            }
+            }, data_json)
             
-            # Send to all subscribers
+            # Send the same frame to all subscribers
             for user_id in self.symbol_subscribers[symbol].copy():
-                await self.send_personal_message(message, user_id)
+                await self._send_text(text, user_id)
 
     def get_connection_count(self) -> int:
         """Get total number of active connections"""
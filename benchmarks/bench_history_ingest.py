@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Historical price ingestion benchmark
+
+Reports rows per second for a full-universe backfill of synthetic 10-year
+daily histories, comparing the old pipeline (iterrows() + one
+find_one_and_update per row) with the bulk one (vectorized conversion +
+unordered bulk_write batches on the unique (symbol, date) key).
+
+DataFrame-to-document conversion is always measured. The MongoDB phase runs
+against MONGODB_URI, in a throwaway "<DATABASE_NAME>_bench" database, and is
+skipped when no server is reachable. The old pipeline is only run for a few
+symbols there and extrapolated, as it takes minutes per hundred symbols.
+
+Run from the repository root:
+    python -m benchmarks.bench_history_ingest [--symbols 500] [--rows 2500]
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.models.stock import StockPrice
+from app.services.historical_data_service import HistoricalDataService
+from app.services.price_store import price_store
+
+LEGACY_SYMBOLS = 2
+CONCURRENCY = 8
+
+def _history(rows: int, seed: int) -> pd.DataFrame:
+    """A yfinance-shaped daily OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-06-30", periods=rows, tz="Asia/Kolkata", name="Date")
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, rows)))
+    spread = close * rng.uniform(0, 0.02, rows)
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 1, rows),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Adj Close": close * 0.98,
+        "Volume": rng.integers(10_000, 5_000_000, rows).astype(float),
+    }, index=index)
+
+def _iterrows_documents(symbol: str, hist: pd.DataFrame) -> list:
+    """The conversion loop the bulk pipeline replaced"""
+    price_documents = []
+    for date, row in hist.iterrows():
+        price_documents.append({
+            "symbol": symbol.upper(),
+            "timestamp": date.to_pydatetime(),
+            "date": date.strftime("%Y-%m-%d"),
+            "open_price": float(row['Open']),
+            "high_price": float(row['High']),
+            "low_price": float(row['Low']),
+            "close_price": float(row['Close']),
+            "adj_close_price": float(row.get('Adj Close', row['Close'])),
+            "volume": int(row['Volume'])
+        })
+    return price_documents
+
+def _report(label: str, rows: int, seconds: float) -> float:
+    rate = rows / seconds
+    print(f"  {label:<44} {rate:12,.0f} rows/s")
+    return rate
+
+def bench_conversion(hist: pd.DataFrame):
+    rows = len(hist)
+    print(f"DataFrame -> documents ({rows} rows per symbol):")
+    started = time.perf_counter()
+    legacy = _iterrows_documents("BENCH", hist)
+    old = _report("iterrows()", rows, time.perf_counter() - started)
+    started = time.perf_counter()
+    for _ in range(10):
+        documents = HistoricalDataService._price_documents("BENCH", hist)
+    new = _report("vectorized", rows * 10, time.perf_counter() - started)
+    assert documents == legacy
+    print(f"  speedup: {new / old:.1f}x")
+
+async def _legacy_store(price_documents: list):
+    for doc in price_documents:
+        await StockPrice.find_one_and_update(
+            {"symbol": doc["symbol"], "date": doc["date"]},
+            {"$set": doc},
+            upsert=True
+        )
+
+async def bench_mongodb(histories: dict):
+    client = AsyncIOMotorClient(settings.MONGODB_URI, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        print(f"MongoDB phase skipped - no server at {settings.MONGODB_URI}: {e}")
+        return
+
+    database_name = f"{settings.DATABASE_NAME}_bench"
+    await client.drop_database(database_name)
+    await init_beanie(database=client[database_name], document_models=[StockPrice])
+    total_rows = sum(len(hist) for hist in histories.values())
+    print(f"MongoDB backfill ({len(histories)} symbols, {total_rows:,} rows):")
+
+    try:
+        legacy = list(histories.items())[:LEGACY_SYMBOLS]
+        legacy_rows = sum(len(hist) for _, hist in legacy)
+        started = time.perf_counter()
+        for symbol, hist in legacy:
+            await _legacy_store(_iterrows_documents(symbol, hist))
+        old = _report(f"per-row upserts ({LEGACY_SYMBOLS} symbols)", legacy_rows, time.perf_counter() - started)
+        await StockPrice.get_motor_collection().delete_many({})
+
+        slots = asyncio.Semaphore(CONCURRENCY)
+
+        async def ingest(symbol: str, hist: pd.DataFrame) -> int:
+            async with slots:
+                documents = HistoricalDataService._price_documents(symbol, hist)
+                return await price_store.store(documents)
+
+        started = time.perf_counter()
+        stored = sum(await asyncio.gather(*(ingest(symbol, hist) for symbol, hist in histories.items())))
+        elapsed = time.perf_counter() - started
+        new = _report(f"bulk_write, {CONCURRENCY} symbols at a time", stored, elapsed)
+        assert stored == total_rows == await StockPrice.get_motor_collection().count_documents({})
+
+        # Re-ingesting is idempotent: same row count, nothing deleted first
+        await ingest(*next(iter(histories.items())))
+        assert await StockPrice.get_motor_collection().count_documents({}) == total_rows
+
+        print(f"  speedup: {new / old:.1f}x; full universe {elapsed:.1f}s vs ~{total_rows / old:.0f}s")
+    finally:
+        await client.drop_database(database_name)
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500, help="universe size (default: NSE 500)")
+    parser.add_argument("--rows", type=int, default=2500, help="trading days per symbol (default: ~10 years)")
+    args = parser.parse_args()
+
+    histories = {f"SYM{number:04d}": _history(args.rows, number) for number in range(args.symbols)}
+    bench_conversion(next(iter(histories.values())))
+    asyncio.run(bench_mongodb(histories))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Price column cache benchmark
+
+Compares getting a 10-year daily history ready for analytics by decoding
+StockPrice documents into a DataFrame (the cost of a MongoDB read, minus
+the network) with reading it from the memory-mapped column cache, cold
+(file mapped on first access) and warm, and slicing a date range from it.
+
+Run from the repository root:
+    python -m benchmarks.bench_price_cache [--rows 2500]
+"""
+import argparse
+import tempfile
+import timeit
+
+import bson
+import pandas as pd
+
+from app.services.historical_data_service import HistoricalDataService
+from app.services.price_cache import PriceColumnCache, PriceColumns
+from benchmarks.bench_history_ingest import _history
+
+ITERATIONS = 2000
+
+def _time(label: str, fn, iterations: int = ITERATIONS) -> float:
+    seconds = min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations
+    print(f"  {label:<44} {seconds * 1e6:10.1f} µs")
+    return seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2500, help="trading days (default: ~10 years)")
+    args = parser.parse_args()
+
+    rows = HistoricalDataService._price_documents("BENCH", _history(args.rows, 1))
+    encoded = b"".join(bson.encode(row) for row in rows)
+    fields = {field_name: [row[field_name] for row in rows] for field_name in rows[0] if field_name != "symbol"}
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PriceColumnCache(directory, max_open=16)
+        cache.write(PriceColumns.from_fields("BENCH", fields))
+        start, end = rows[len(rows) // 2]["date"], rows[-1]["date"]
+
+        def cold():
+            cache._open.clear()
+            return cache.get("BENCH").close
+
+        print(f"Daily history of {len(rows)} bars:")
+        old = _time("BSON documents -> DataFrame", lambda: pd.DataFrame(bson.decode_all(encoded)), ITERATIONS // 20)
+        _time("column cache, cold (mmap on first access)", cold)
+        new = _time("column cache, warm", lambda: cache.get("BENCH").close)
+        _time("column cache, warm + date range slice", lambda: cache.get("BENCH").between(start, end).close)
+        print(f"  speedup (warm): {old / new:,.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Daily price storage layout benchmark
+
+Compares the "rows" layout (a StockPrice document per symbol and day) with
+the "buckets" layout (a StockPriceBucket per symbol and month holding OHLCV
+arrays) for a synthetic universe of 10-year daily histories.
+
+Without a server, documents are encoded with BSON locally to compare document
+counts, data size and the decode cost of a read. When MongoDB is reachable at
+MONGODB_URI, both layouts are also loaded into a throwaway
+"<DATABASE_NAME>_bench" database to compare collection storage size, index
+size and read latency through PriceStore.
+
+Run from the repository root:
+    python -m benchmarks.bench_price_storage [--symbols 500] [--rows 2500]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import bson
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.models.stock import StockPrice, StockPriceBucket
+from app.services.historical_data_service import HistoricalDataService
+from app.services.price_store import BUCKET_COLUMNS, PriceStore
+from benchmarks.bench_history_ingest import _history
+
+READS = 50
+
+def _buckets(rows: list) -> list:
+    months = {}
+    for row in rows:
+        months.setdefault(row["date"][:7], []).append(row)
+    return [PriceStore._bucket_document(rows[0]["symbol"], month, month_rows) for month, month_rows in months.items()]
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.2f} ms"
+
+def bench_encoded(histories: dict):
+    row_docs = [bson.encode(row) for rows in histories.values() for row in rows]
+    bucket_docs = [bson.encode(bucket) for rows in histories.values() for bucket in _buckets(rows)]
+    print(f"BSON documents ({len(histories)} symbols):")
+    print(f"  {'rows':<10} {len(row_docs):>10,} docs {sum(map(len, row_docs)) / 2**20:10.1f} MiB")
+    print(f"  {'buckets':<10} {len(bucket_docs):>10,} docs {sum(map(len, bucket_docs)) / 2**20:10.1f} MiB")
+
+    rows = next(iter(histories.values()))
+    encoded_rows = b"".join(bson.encode(row) for row in rows)
+    encoded_buckets = b"".join(bson.encode(bucket) for bucket in _buckets(rows))
+
+    def decode_rows():
+        return bson.decode_all(encoded_rows)
+
+    def decode_buckets():
+        return [row for bucket in bson.decode_all(encoded_buckets) for row in PriceStore._bucket_rows(bucket)]
+
+    def decode_rows_to_columns():
+        decoded = bson.decode_all(encoded_rows)
+        return {field_name: [row[field_name] for row in decoded] for field_name in BUCKET_COLUMNS}
+
+    def decode_buckets_to_columns():
+        decoded = bson.decode_all(encoded_buckets)
+        return {field_name: [value for bucket in decoded for value in bucket[column]] for field_name, column in BUCKET_COLUMNS.items()}
+
+    assert len(decode_rows()) == len(decode_buckets())
+    assert decode_rows_to_columns()["close_price"] == decode_buckets_to_columns()["close_price"]
+    print(f"Decode a {len(rows)}-day history:")
+    for label, fn in (
+        ("rows -> rows (read)", decode_rows),
+        ("buckets -> rows (read)", decode_buckets),
+        ("rows -> columns (read_columns)", decode_rows_to_columns),
+        ("buckets -> columns (read_columns)", decode_buckets_to_columns),
+    ):
+        started = time.perf_counter()
+        for _ in range(READS):
+            fn()
+        print(f"  {label:<34} {_ms((time.perf_counter() - started) / READS)}")
+
+async def _read_latency(read, symbols: list, start=None, end=None) -> float:
+    timings = []
+    for symbol in symbols:
+        started = time.perf_counter()
+        await read(symbol, start, end)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+async def bench_mongodb(histories: dict):
+    client = AsyncIOMotorClient(settings.MONGODB_URI, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        print(f"MongoDB phase skipped - no server at {settings.MONGODB_URI}: {e}")
+        return
+
+    database_name = f"{settings.DATABASE_NAME}_bench"
+    await client.drop_database(database_name)
+    database = client[database_name]
+    await init_beanie(database=database, document_models=[StockPrice, StockPriceBucket])
+
+    try:
+        stores = {layout: PriceStore(layout, settings.HISTORY_BULK_BATCH_SIZE) for layout in PriceStore.LAYOUTS}
+        collections = {"rows": StockPrice, "buckets": StockPriceBucket}
+        symbols = list(histories)[:READS]
+        last_month = next(iter(histories.values()))[-21]["date"]
+
+        print(f"MongoDB ({len(histories)} symbols):")
+        print(
+            f"  {'':<10} {'docs':>10} {'data MiB':>10} {'disk MiB':>10} {'index MiB':>10} "
+            f"{'10y read':>11} {'1mo read':>11} {'10y cols':>11}"
+        )
+        for layout, store in stores.items():
+            for rows in histories.values():
+                await store.store(rows)
+            stats = await database.command("collStats", collections[layout].get_settings().name)
+            full = await _read_latency(store.read, symbols)
+            month = await _read_latency(store.read, symbols, start=last_month)
+            full_columns = await _read_latency(store.read_columns, symbols)
+            print(
+                f"  {layout:<10} {stats['count']:>10,} {stats['size'] / 2**20:>10.1f} "
+                f"{stats['storageSize'] / 2**20:>10.1f} {stats['totalIndexSize'] / 2**20:>10.1f} "
+                f"{_ms(full)} {_ms(month)} {_ms(full_columns)}"
+            )
+    finally:
+        await client.drop_database(database_name)
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500, help="universe size (default: NSE 500)")
+    parser.add_argument("--rows", type=int, default=2500, help="trading days per symbol (default: ~10 years)")
+    args = parser.parse_args()
+
+    histories = {
+        f"SYM{number:04d}": HistoricalDataService._price_documents(f"SYM{number:04d}", _history(args.rows, number))
+        for number in range(args.symbols)
+    }
+    bench_encoded(histories)
+    asyncio.run(bench_mongodb(histories))
+
+if __name__ == "__main__":
+    main()
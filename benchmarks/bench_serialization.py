@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Serialization micro-benchmark
+
+Compares the per-request CPU cost of building and serializing a full stock
+response the old way (re-validated StockResponse, FastAPI response_model
+validation + stdlib JSONResponse) with the fast path (constructed without
+revalidation, serialized once with orjson), and a WebSocket broadcast
+encoded per subscriber vs. once.
+
+Run from the repository root:
+    python -m benchmarks.bench_serialization
+"""
+import json
+import timeit
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.serialization import dumps_text, model_response
+from app.models.stock import StockResponse
+from app.services.stock_service import StockService
+
+ITERATIONS = 20000
+SUBSCRIBERS = 100
+
+def _stock_dict() -> dict:
+    """A fully populated document, as stored for an actively viewed stock"""
+    now = datetime.utcnow()
+    stock = {}
+    for index, (field_name, field) in enumerate(StockResponse.model_fields.items()):
+        if field.annotation in (str,):
+            stock[field_name] = "RELIANCE" if field_name == "symbol" else "Reliance Industries Ltd"
+        elif field.annotation is datetime:
+            stock[field_name] = now
+        elif field_name in ("is_stale",):
+            stock[field_name] = False
+        elif field_name == "volume":
+            stock[field_name] = 12345678
+        else:
+            stock[field_name] = 1000.0 + index * 1.37
+    for timestamp_field in ("quote_updated", "info_updated", "statements_updated"):
+        stock[timestamp_field] = now
+    return stock
+
+def _time(label: str, fn, iterations: int = ITERATIONS) -> float:
+    seconds = min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations
+    print(f"  {label:<44} {seconds * 1e6:8.1f} µs")
+    return seconds
+
+def _run_sync(coroutine):
+    """Drive a coroutine that never awaits, without event loop overhead"""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+def main():
+    stock = _stock_dict()
+    response_field = create_response_field(name="response", type_=StockResponse)
+
+    def old_path():
+        response = StockService._build_response(stock)
+        content = _run_sync(serialize_response(field=response_field, response_content=response))
+        return JSONResponse(content).body
+
+    def new_path():
+        response = StockService._build_response(stock, validate=False)
+        return model_response(response).body
+
+    assert json.loads(old_path()) == json.loads(new_path())
+
+    print(f"Stock response ({len(StockResponse.model_fields)} fields):")
+    old = _time("validated + response_model + json", old_path, ITERATIONS // 4)
+    new = _time("constructed + orjson", new_path)
+    print(f"  speedup: {old / new:.1f}x")
+
+    message = {
+        "type": "stock_update",
+        "symbol": stock["symbol"],
+        "data": StockService.to_quote(StockService._build_response(stock, validate=False)).model_dump(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    print(f"WebSocket broadcast to {SUBSCRIBERS} subscribers:")
+    old = _time("json.dumps per subscriber", lambda: [json.dumps(message, default=str) for _ in range(SUBSCRIBERS)], ITERATIONS // 20)
+    new = _time("orjson once", lambda: dumps_text(message), ITERATIONS // 20)
+    print(f"  speedup: {old / new:.1f}x")
+
+if __name__ == "__main__":
+    main()
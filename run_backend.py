@@ -6,10 +6,10 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
-import yfinance as yf
 import asyncio
 from datetime import datetime, timedelta
 import random
+from app.services.market_data_provider import market_data_provider
 
 app = FastAPI(
     title="StockChat Backend",
@@ -72,10 +72,9 @@ async def get_trending_stocks():
 async def get_stock_data(symbol: str):
     """Get stock data for a specific symbol"""
     try:
-        # Try to get real data from yfinance
-        ticker = yf.Ticker(symbol.upper())
-        info = ticker.info
-        hist = ticker.history(period="1d")
+        # Try to get real data from the market data provider
+        info = await market_data_provider.info(symbol.upper())
+        hist = await market_data_provider.history(symbol.upper(), period="1d")
         
         if not hist.empty:
             current_price = float(hist['Close'].iloc[-1])
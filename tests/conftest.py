@@ -0,0 +1,34 @@
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import ReplaceOne, UpdateOne
+
+from app.models.chat import ChatHistory
+from app.models.stock import HistoryCoverage, Stock, StockPrice, StockPriceBucket, TickerResolution
+from app.models.user import User
+
+def _apply_bulk_write(collection):
+    """
+    mongomock can't run bulk writes built by pymongo >= 4.11 (they pass a `sort`
+    option it doesn't know), so apply the operations one by one instead
+    """
+    async def bulk_write(operations, ordered=True):
+        for operation in operations:
+            if isinstance(operation, ReplaceOne):
+                await collection.replace_one(operation._filter, operation._doc, upsert=operation._upsert)
+            elif isinstance(operation, UpdateOne):
+                await collection.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            else:
+                raise NotImplementedError(type(operation).__name__)
+    return bulk_write
+
+@pytest.fixture
+async def mongo():
+    """An in-memory database with the stock, price, ticker, user and chat models initialized"""
+    database = AsyncMongoMockClient()["stock_analysis_test"]
+    models = [Stock, StockPrice, StockPriceBucket, HistoryCoverage, TickerResolution, User, ChatHistory]
+    await init_beanie(database=database, document_models=models)
+    for model in models:
+        collection = model.get_motor_collection()
+        collection.bulk_write = _apply_bulk_write(collection)
+    return database
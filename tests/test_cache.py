@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import LRUTTLCache
+from app.models.stock import StockResponse
+from app.services.stock_service import StockSnapshot
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+def _cache(max_entries=3, max_bytes=10_000, default_ttl=60.0):
+    return LRUTTLCache("test", max_entries=max_entries, max_bytes=max_bytes, default_ttl=default_ttl, sizeof=lambda value: 100)
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = _cache()
+    cache.set("AAA", "a")
+    cache.set("BBB", "b", ttl=5)
+
+    clock[0] += 10
+    assert cache.get("BBB") is None
+    assert cache.get("AAA") == "a"
+    assert cache.ttl_remaining("AAA") == pytest.approx(50)
+
+    clock[0] += 50
+    assert cache.get("AAA") is None
+    assert cache.expirations == 2
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
+
+def test_peek_ignores_expired_entries_without_counting(clock):
+    cache = _cache()
+    cache.set("AAA", "a", ttl=1)
+    assert cache.peek("AAA") == "a"
+    clock[0] += 2
+    assert cache.peek("AAA") is None
+    assert (cache.hits, cache.misses) == (0, 0)
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = _cache(max_entries=3)
+    for key in ("AAA", "BBB", "CCC"):
+        cache.set(key, key.lower())
+    cache.get("AAA")  # AAA is now the most recently used
+    cache.set("DDD", "d")
+
+    assert cache.get("BBB") is None
+    assert [cache.get(key) for key in ("AAA", "CCC", "DDD")] == ["aaa", "ccc", "d"]
+    assert cache.evictions == 1
+
+def test_size_limit_evicts_until_under_budget(clock):
+    cache = _cache(max_entries=100, max_bytes=250)
+    for key in ("AAA", "BBB", "CCC"):
+        cache.set(key, key.lower())
+
+    assert len(cache) == 2
+    assert cache.current_bytes == 200
+    assert cache.get("AAA") is None
+
+def test_oversized_value_is_never_cached(clock):
+    cache = LRUTTLCache("test", max_entries=10, max_bytes=50, default_ttl=60, sizeof=len)
+    cache.set("AAA", "a" * 10)
+    cache.set("AAA", "a" * 100)
+
+    assert cache.get("AAA") is None
+    assert cache.evictions == 0
+
+def test_replacing_and_invalidating_keep_size_accounting(clock):
+    cache = _cache()
+    cache.set("AAA", "a")
+    cache.set("AAA", "a2")
+    assert (len(cache), cache.current_bytes) == (1, 100)
+    assert cache.get("AAA") == "a2"
+
+    assert cache.invalidate("AAA") is True
+    assert cache.invalidate("AAA") is False
+    assert cache.current_bytes == 0
+
+def test_non_positive_ttl_drops_the_entry(clock):
+    cache = _cache()
+    cache.set("AAA", "a")
+    cache.set("AAA", "a2", ttl=0)
+    assert cache.get("AAA") is None
+
+def _snapshot(symbol: str) -> StockSnapshot:
+    return StockSnapshot(StockResponse(
+        symbol=symbol, name=f"{symbol} Limited", exchange="NSE", current_price=100.0, price_change=1.0,
+        price_change_percent=1.0, market_cap=1e12, pe_ratio=20.0, last_updated=datetime(2024, 1, 1),
+    ))
+
+def test_snapshot_size_covers_both_encodings():
+    snapshot = _snapshot("AAA")
+    assert snapshot.size() == StockSnapshot.OVERHEAD_BYTES + len(snapshot.json) + len(snapshot.quote_json)
+
+def test_snapshot_byte_bound_evicts_at_the_configured_size(clock):
+    size = _snapshot("AAA").size()
+    cache = LRUTTLCache("snapshots", max_entries=100, max_bytes=size * 2 + size // 2, default_ttl=60, sizeof=StockSnapshot.size)
+    for symbol in ("AAA", "BBB", "CCC"):
+        cache.set(symbol, _snapshot(symbol))
+
+    assert len(cache) == 2
+    assert cache.current_bytes == size * 2
+    assert cache.get("AAA") is None
+    assert cache.evictions == 1
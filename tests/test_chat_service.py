@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from app.models.chat import ChatMessage
+from app.models.user import User
+from app.services import chat_service as chat_module
+from app.services import symbol_registry as registry_module
+from app.services.chat_service import ChatService
+from app.services.search_index import StockSearchIndex
+from app.services.symbol_registry import SymbolRegistry
+from app.services.trending_service import TrendingTracker
+
+MASTER_CSV = Path(__file__).resolve().parent.parent / "data" / "symbol_master.csv"
+
+@pytest.fixture
+async def registry(monkeypatch):
+    """The master file loaded into a fresh registry and search index"""
+    index = StockSearchIndex()
+    registry = SymbolRegistry(path=str(MASTER_CSV), reload_interval=0)
+    monkeypatch.setattr(registry_module, "stock_search_index", index)
+    monkeypatch.setattr(chat_module, "stock_search_index", index)
+    monkeypatch.setattr(chat_module, "symbol_registry", registry)
+    assert await registry.load()
+    return registry
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = TrendingTracker(half_life_minutes=60, max_symbols=100, snapshot_interval=60)
+    monkeypatch.setattr(chat_module, "trending_tracker", tracker)
+    return tracker
+
+def test_extract_stock_symbols_finds_names_and_known_symbols(registry):
+    assert ChatService._extract_stock_symbols("What is the PE of Reliance Jio and TCS?") == ["RELIANCE", "TCS"]
+    assert ChatService._extract_stock_symbols("How is the market doing today?") == []
+
+async def test_chat_messages_count_towards_trending(mongo, registry, tracker, monkeypatch):
+    async def respond(message, user):
+        return {"content": "ok"}
+
+    monkeypatch.setattr(ChatService, "_generate_response", staticmethod(respond))
+    user = User(email="user@example.com", username="user", hashed_password="x")
+    await ChatService.process_message(user, ChatMessage(content="compare infosys and TCS"), "session")
+
+    assert sorted(tracker.top()) == ["INFY", "TCS"]
+    assert tracker.score("INFY") == pytest.approx(TrendingTracker.CHAT_MENTION_WEIGHT, rel=1e-3)
+    assert tracker.score("HDFCBANK") == 0.0
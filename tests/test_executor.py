@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from app.core.executor import UpstreamExecutor
+from app.core.resilience import RateLimitExceededError, TokenBucket
+
+@pytest.fixture
+def executor():
+    executor = UpstreamExecutor("test", max_workers=4, background_max_workers=1)
+    yield executor
+    executor.shutdown()
+
+async def test_background_backlog_does_not_reserve_interactive_tokens(executor):
+    bucket = TokenBucket("test", rate=100, burst=1, max_wait=0.05)
+    backfills = [
+        asyncio.create_task(UpstreamExecutor.background(executor.run(lambda: None, before_start=bucket.acquire)))
+        for _ in range(20)
+    ]
+    await asyncio.sleep(0)
+
+    # 20 reservations ahead of it would mean a 0.2s wait and a rejection
+    assert await executor.run(lambda: "quote", before_start=bucket.acquire) == "quote"
+    await asyncio.gather(*backfills)
+    assert bucket.rejected == 0
+
+async def test_rejected_before_start_releases_the_slot(executor):
+    bucket = TokenBucket("test", rate=0.001, burst=1, max_wait=0)
+    assert await UpstreamExecutor.background(executor.run(lambda: 1, before_start=bucket.acquire)) == 1
+
+    with pytest.raises(RateLimitExceededError):
+        await UpstreamExecutor.background(executor.run(lambda: 2, before_start=bucket.acquire))
+    stats = executor.get_stats()["background"]
+    assert (stats["queued"], stats["errors"]) == (0, 1)
+    # The background slot was given back
+    assert await UpstreamExecutor.background(executor.run(lambda: 3)) == 3
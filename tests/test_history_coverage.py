@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+from app.services.historical_data_service import HistoricalDataService
+
+def _jan(day: int) -> date:
+    """A day of January 2024, which starts on a Monday"""
+    return date(2024, 1, day)
+
+def test_add_range_merges_overlapping_and_contained_ranges():
+    assert HistoricalDataService._add_range([(_jan(1), _jan(5))], _jan(3), _jan(10)) == [(_jan(1), _jan(10))]
+    assert HistoricalDataService._add_range([(_jan(1), _jan(31))], _jan(10), _jan(12)) == [(_jan(1), _jan(31))]
+
+def test_add_range_bridges_weekends_but_not_weekdays():
+    ranges = [(_jan(1), _jan(5))]
+    assert HistoricalDataService._add_range(ranges, _jan(8), _jan(12)) == [(_jan(1), _jan(12))]
+    assert HistoricalDataService._add_range(ranges, _jan(10), _jan(12)) == [(_jan(1), _jan(5)), (_jan(10), _jan(12))]
+
+def test_add_range_keeps_ranges_sorted():
+    ranges = [(_jan(15), _jan(19))]
+    ranges = HistoricalDataService._add_range(ranges, _jan(1), _jan(5))
+    assert ranges == [(_jan(1), _jan(5)), (_jan(15), _jan(19))]
+    # Filling the gap joins everything into one range
+    assert HistoricalDataService._add_range(ranges, _jan(8), _jan(12)) == [(_jan(1), _jan(19))]
+
+def test_missing_ranges_covers_window_gaps_and_the_last_synced_day():
+    ranges = [(_jan(1), _jan(5)), (_jan(15), _jan(19))]
+    assert HistoricalDataService._missing_ranges(ranges, date(2023, 12, 1), _jan(24)) == [
+        (date(2023, 12, 1), date(2023, 12, 31)),
+        (_jan(6), _jan(14)),
+        (_jan(19), _jan(24)),
+    ]
+
+def test_missing_ranges_skips_gaps_without_weekdays():
+    ranges = [(_jan(1), _jan(5)), (_jan(8), _jan(12))]
+    assert HistoricalDataService._missing_ranges(ranges, _jan(1), _jan(12)) == [(_jan(12), _jan(12))]
+    # The window starting on a weekend right before the first range
+    assert HistoricalDataService._missing_ranges(ranges, date(2023, 12, 30), _jan(12)) == [(_jan(12), _jan(12))]
+
+def test_missing_ranges_without_window_start_only_extends_to_today():
+    assert HistoricalDataService._missing_ranges([(_jan(1), _jan(5))], None, _jan(10)) == [(_jan(5), _jan(10))]
+
+def test_missing_ranges_ignores_history_before_the_window():
+    ranges = [(date(2023, 1, 2), date(2023, 3, 31)), (_jan(1), _jan(31))]
+    assert HistoricalDataService._missing_ranges(ranges, _jan(10), date(2024, 2, 2)) == [(_jan(31), date(2024, 2, 2))]
+
+def test_ranges_from_dates_tolerates_weekends_and_holidays():
+    dates = [_jan(1), _jan(2), _jan(3), _jan(4), _jan(5), _jan(8), _jan(11)]
+    # _jan(9) and _jan(10) missing is within the 3 weekday tolerance
+    assert HistoricalDataService._ranges_from_dates(dates) == [(_jan(1), _jan(11))]
+
+def test_ranges_from_dates_splits_on_longer_gaps():
+    dates = [_jan(1), _jan(2), _jan(22), _jan(23)]
+    assert HistoricalDataService._ranges_from_dates(dates) == [(_jan(1), _jan(2)), (_jan(22), _jan(23))]
+    assert HistoricalDataService._ranges_from_dates([]) == []
+
+@pytest.mark.parametrize("period, start", [
+    ("max", None),
+    ("ytd", date(2024, 1, 1)),
+    ("5d", date(2024, 3, 10)),
+    ("2wk", date(2024, 3, 1)),
+    ("6mo", date(2023, 9, 15)),
+    ("10y", date(2014, 3, 15)),
+])
+def test_period_start(period, start):
+    assert HistoricalDataService._period_start(period, date(2024, 3, 15)) == start
+
+def test_period_start_rejects_unknown_periods():
+    with pytest.raises(ValueError):
+        HistoricalDataService._period_start("1h", date(2024, 3, 15))
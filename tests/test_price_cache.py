@@ -0,0 +1,111 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from app.services.price_cache import HEADER_SIZE, RECORD, PriceColumnCache, PriceColumns
+
+@pytest.fixture
+def cache(tmp_path):
+    return PriceColumnCache(directory=str(tmp_path), max_open=2)
+
+def _rows(days, close=10.0):
+    return [
+        {
+            "date": day, "timestamp": datetime.fromisoformat(day), "open_price": close, "high_price": close + 1,
+            "low_price": close - 1, "close_price": close, "adj_close_price": None, "volume": 100,
+        }
+        for day in days
+    ]
+
+def _columns(symbol, rows):
+    fields = {field_name: [row[field_name] for row in rows] for field_name in rows[0]}
+    return PriceColumns.from_fields(symbol, fields)
+
+def _dates(columns):
+    return [str(day) for day in columns.dates]
+
+DAYS = ["2024-01-02", "2024-01-03", "2024-01-04"]
+
+def test_write_round_trips_through_a_standard_npy_file(cache):
+    written = cache.write(_columns("aaa", _rows(DAYS)))
+
+    assert _dates(written) == DAYS
+    assert written.close.tolist() == [10.0] * 3
+    assert np.isnan(written.adj_close).all()
+    assert written.timestamps[0] == np.datetime64("2024-01-02T00:00:00.000")
+    assert not written.close.flags.writeable
+
+    path = cache.path("AAA")
+    assert path.stat().st_size == HEADER_SIZE + 3 * RECORD.itemsize
+    # A plain np.load() reads it too
+    loaded = np.load(path)
+    assert loaded.dtype == RECORD
+    assert loaded["volume"].tolist() == [100] * 3
+    assert _dates(cache.get("AAA")) == DAYS
+
+def test_from_fields_sorts_and_keeps_the_last_row_of_a_date():
+    rows = _rows(["2024-01-03", "2024-01-02"]) + _rows(["2024-01-03"], close=20.0)
+    columns = _columns("AAA", rows)
+
+    assert _dates(columns) == ["2024-01-02", "2024-01-03"]
+    assert columns.close.tolist() == [10.0, 20.0]
+
+def test_merge_appends_new_days_and_overwrites_cached_ones_in_place(cache):
+    cache.write(_columns("AAA", _rows(DAYS)))
+    # The last session re-fetched with its final close, plus two new days
+    assert cache.merge("AAA", _rows(["2024-01-04", "2024-01-05", "2024-01-08"], close=20.0))
+
+    columns = cache.get("AAA")
+    assert _dates(columns) == DAYS + ["2024-01-05", "2024-01-08"]
+    assert columns.close.tolist() == [10.0, 10.0, 20.0, 20.0, 20.0]
+    assert (cache.writes, cache.appends) == (1, 1)
+    # The fixed-size header was rewritten with the new row count
+    assert cache.path("AAA").stat().st_size == HEADER_SIZE + 5 * RECORD.itemsize
+    assert np.load(cache.path("AAA")).shape == (5,)
+
+def test_merge_into_the_cached_range_rewrites_the_file(cache):
+    cache.write(_columns("AAA", _rows(["2024-01-02", "2024-01-05"])))
+    assert cache.merge("AAA", _rows(["2024-01-03", "2024-01-04"], close=20.0))
+
+    columns = cache.get("AAA")
+    assert _dates(columns) == ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    assert columns.close.tolist() == [10.0, 20.0, 20.0, 10.0]
+    assert (cache.writes, cache.appends) == (2, 0)
+
+def test_merge_skips_symbols_without_a_cache(cache):
+    assert cache.merge("AAA", _rows(DAYS)) is False
+    assert "AAA" not in cache
+
+def test_files_with_another_layout_are_discarded(cache):
+    np.save(cache.path("AAA"), np.arange(3))
+    assert cache.get("AAA") is None
+    assert not cache.path("AAA").exists()
+
+    cache.path("BBB").write_bytes(b"\x93NUMPY garbage")
+    assert cache.get("BBB") is None
+    assert not cache.path("BBB").exists()
+    assert cache.misses == 2
+
+def test_between_is_inclusive_and_open_ended(cache):
+    columns = cache.write(_columns("AAA", _rows(["2024-01-02", "2024-01-03", "2024-01-05", "2024-01-08"])))
+
+    assert _dates(columns.between("2024-01-03", "2024-01-05")) == ["2024-01-03", "2024-01-05"]
+    # Bounds between stored days
+    assert _dates(columns.between(date(2024, 1, 4), date(2024, 1, 7))) == ["2024-01-05"]
+    assert _dates(columns.between("2023-12-01", "2024-01-02")) == ["2024-01-02"]
+    assert _dates(columns.between(start="2024-01-08")) == ["2024-01-08"]
+    assert _dates(columns.between(end="2024-01-03")) == ["2024-01-02", "2024-01-03"]
+    assert len(columns.between("2024-02-01")) == 0
+    assert len(columns.between()) == 4
+
+    window = columns.between("2024-01-03", "2024-01-05")
+    assert np.shares_memory(window.close, columns.close)
+
+def test_mapped_symbols_are_bounded(cache):
+    for symbol in ("AAA", "BBB", "CCC"):
+        cache.write(_columns(symbol, _rows(DAYS)))
+
+    assert cache.get_stats()["mapped_symbols"] == 2
+    # Unmapped symbols are mapped again from disk
+    assert _dates(cache.get("AAA")) == DAYS
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.models.stock import StockPrice, StockPriceBucket
+from app.services.price_store import PriceStore
+
+@pytest.fixture(params=PriceStore.LAYOUTS)
+def store(request, mongo):
+    return PriceStore(layout=request.param, batch_size=2)
+
+def _row(day: str, close: float, symbol: str = "AAA"):
+    return {
+        "symbol": symbol, "timestamp": datetime.fromisoformat(day), "date": day,
+        "open_price": close - 1, "high_price": close + 1, "low_price": close - 2,
+        "close_price": close, "adj_close_price": close, "volume": 1000,
+    }
+
+DAYS = ["2024-01-30", "2024-01-31", "2024-02-01", "2024-02-02", "2024-03-01"]
+
+async def test_store_and_read_round_trip(store):
+    rows = [_row(day, 10.0 + number) for number, day in enumerate(DAYS)]
+    assert await store.store(rows) == len(rows)
+
+    assert await store.read("aaa") == rows
+    assert await store.dates("AAA") == DAYS
+    assert await store.read("OTHER") == []
+
+async def test_read_filters_by_inclusive_date_range(store):
+    await store.store([_row(day, 10.0) for day in DAYS])
+
+    assert [row["date"] for row in await store.read("AAA", "2024-01-31", "2024-02-02")] == DAYS[1:4]
+    assert [row["date"] for row in await store.read("AAA", start="2024-02-02")] == DAYS[3:]
+    assert [row["date"] for row in await store.read("AAA", end="2024-01-31")] == DAYS[:2]
+
+async def test_read_columns_matches_read(store):
+    rows = [_row(day, 10.0 + number) for number, day in enumerate(DAYS)]
+    await store.store(rows)
+
+    columns = await store.read_columns("AAA", "2024-01-31", "2024-02-02")
+    assert columns["date"] == DAYS[1:4]
+    assert columns["close_price"] == [11.0, 12.0, 13.0]
+    assert columns["volume"] == [1000] * 3
+    assert (await store.read_columns("OTHER"))["date"] == []
+
+async def test_restoring_overwrites_days_without_duplicating_them(store):
+    await store.store([_row(day, 10.0) for day in DAYS[:3]])
+    # Overlaps the stored days, adds later ones and is out of order
+    assert await store.store([_row("2024-02-02", 22.0), _row("2024-01-31", 21.0), _row("2024-03-01", 23.0)]) == 3
+
+    rows = await store.read("AAA")
+    assert [(row["date"], row["close_price"]) for row in rows] == [
+        ("2024-01-30", 10.0), ("2024-01-31", 21.0), ("2024-02-01", 10.0),
+        ("2024-02-02", 22.0), ("2024-03-01", 23.0),
+    ]
+
+async def test_symbols_are_stored_separately(store):
+    await store.store([_row(DAYS[0], 10.0), _row(DAYS[0], 50.0, symbol="BBB")])
+
+    assert [row["close_price"] for row in await store.read("AAA")] == [10.0]
+    assert [row["close_price"] for row in await store.read("BBB")] == [50.0]
+
+async def test_buckets_hold_one_month_each(mongo):
+    store = PriceStore(layout="buckets", batch_size=2)
+    await store.store([_row(day, 10.0) for day in DAYS])
+    await store.store([_row("2024-02-05", 11.0)])
+
+    buckets = await StockPriceBucket.get_motor_collection().find({}).sort("month", 1).to_list(None)
+    assert [(bucket["month"], bucket["dates"]) for bucket in buckets] == [
+        ("2024-01", ["2024-01-30", "2024-01-31"]),
+        ("2024-02", ["2024-02-01", "2024-02-02", "2024-02-05"]),
+        ("2024-03", ["2024-03-01"]),
+    ]
+    assert await StockPrice.get_motor_collection().count_documents({}) == 0
+
+async def test_failed_operations_are_not_counted(mongo, monkeypatch):
+    store = PriceStore(layout="rows", batch_size=2)
+    collection = StockPrice.get_motor_collection()
+
+    async def failing(operations, ordered=True):
+        raise BulkWriteError({"writeErrors": [{"index": 0, "errmsg": "duplicate key"}]})
+
+    monkeypatch.setattr(collection, "bulk_write", failing)
+    # Two bulk writes of two and one rows, each losing its first operation
+    assert await store.store([_row(day, 10.0) for day in DAYS[:3]]) == 1
+
+def test_unknown_layout_is_rejected():
+    with pytest.raises(ValueError):
+        PriceStore(layout="columns", batch_size=2)
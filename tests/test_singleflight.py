@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    started = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal started
+        started += 1
+        await release.wait()
+        return object()
+
+    callers = [asyncio.create_task(flight.do("AAA", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flight.in_flight("AAA")
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert started == 1
+    assert all(result is results[0] for result in results)
+    assert not flight.in_flight("AAA")
+    stats = flight.get_stats()
+    assert (stats["calls"], stats["executions"], stats["coalesced"]) == (5, 1, 4)
+
+async def test_keys_run_independently():
+    flight = SingleFlight("test")
+
+    async def work(key):
+        await asyncio.sleep(0)
+        return key
+
+    assert await asyncio.gather(
+        flight.do("AAA", lambda: work("AAA")),
+        flight.do("BBB", lambda: work("BBB")),
+    ) == ["AAA", "BBB"]
+    assert flight.get_stats()["executions"] == 2
+
+async def test_error_reaches_every_caller_and_is_not_cached():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    callers = [asyncio.create_task(flight.do("AAA", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.get_stats()["errors"] == 1
+    assert not flight.in_flight("AAA")
+
+    async def working():
+        return "ok"
+
+    # The next call starts fresh work instead of replaying the failure
+    assert await flight.do("AAA", working) == "ok"
+
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("AAA", work))
+    second = asyncio.create_task(flight.do("AAA", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+async def test_spawn_starts_once_per_key():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await release.wait()
+
+    assert flight.spawn("AAA", work) is True
+    assert flight.spawn("AAA", work) is False
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert len(runs) == 1
+    assert not flight.in_flight("AAA")
+    assert flight.spawn("AAA", work) is True
+    release.set()
+    await asyncio.sleep(0)
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.stock import Stock
+from app.services import stock_service as stock_module
+from app.services.stock_service import StockService, stock_snapshot_cache
+from app.services.stock_write_buffer import StockWriteBuffer
+
+@pytest.fixture
+def fetches(mongo, monkeypatch):
+    """Field groups requested upstream, with a fresh snapshot cache and write buffer"""
+    stock_snapshot_cache.clear()
+    monkeypatch.setattr(stock_module, "stock_write_buffer", StockWriteBuffer(60, 100, 3600))
+    calls = []
+
+    async def fetch(symbol, groups=None):
+        calls.append(set(groups))
+        now = datetime.utcnow()
+        return {
+            "symbol": symbol, "current_price": 105.0, "price_change": 5.0, "price_change_percent": 5.0,
+            "exchange": "NSE (India)", "quote_updated": now, "last_updated": now,
+        }
+
+    monkeypatch.setattr(StockService, "_fetch_yahoo_finance_data", staticmethod(fetch))
+    yield calls
+    stock_snapshot_cache.clear()
+
+async def _store(quote_age: timedelta, info_age: timedelta = timedelta()):
+    now = datetime.utcnow()
+    await Stock(
+        symbol="AAA", name="Alpha", exchange="NSE (India)", current_price=100.0, price_change=0.0,
+        price_change_percent=0.0, quote_updated=now - quote_age, info_updated=now - info_age,
+        statements_updated=now, last_updated=now - quote_age,
+    ).insert()
+
+async def test_fresh_quote_is_served_without_going_upstream(fetches):
+    await _store(quote_age=timedelta(seconds=1))
+
+    quote = await StockService.get_stock_quote("aaa")
+    assert quote.current_price == 100.0
+    assert fetches == []
+    # Cached: the next call doesn't read MongoDB either
+    assert stock_snapshot_cache.peek("AAA").response is quote
+
+async def test_fresh_quote_with_stale_info_is_not_refreshed(fetches):
+    await _store(quote_age=timedelta(seconds=1), info_age=timedelta(hours=settings.STOCK_INFO_TTL_HOURS + 1))
+
+    assert (await StockService.get_stock_quote("AAA")).current_price == 100.0
+    assert fetches == []
+    assert stock_snapshot_cache.peek("AAA") is None
+
+async def test_stale_quote_is_refreshed(fetches):
+    await _store(quote_age=timedelta(seconds=settings.STOCK_QUOTE_TTL_SECONDS + 1))
+
+    quote = await StockService.get_stock_quote("AAA")
+    assert quote.current_price == 105.0
+    assert fetches == [{"quote"}]
@@ -0,0 +1,116 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.stock import Stock
+from app.services.stock_write_buffer import StockWriteBuffer
+
+@pytest.fixture
+def buffer():
+    return StockWriteBuffer(flush_interval=60, baseline_max_symbols=100, baseline_ttl=3600)
+
+@pytest.fixture
+def bulk_writes(mongo, monkeypatch):
+    """Operations of every bulk write, applied to the in-memory database as well"""
+    collection = Stock.get_motor_collection()
+    apply = collection.bulk_write
+    writes = []
+
+    async def bulk_write(operations, ordered=True):
+        writes.append([(operation._filter, operation._doc) for operation in operations])
+        await apply(operations, ordered=ordered)
+
+    monkeypatch.setattr(collection, "bulk_write", bulk_write)
+    return writes
+
+def _stored(**fields) -> Stock:
+    last_week = datetime.utcnow() - timedelta(days=7)
+    return Stock(**{
+        "symbol": "AAA", "name": "Alpha", "current_price": 100.0, "price_change": 1.0,
+        "price_change_percent": 1.0, "pe_ratio": 20.0, "quote_updated": last_week, **fields,
+    })
+
+async def test_only_changed_fields_and_timestamps_are_pending(mongo, buffer):
+    now = datetime.utcnow()
+    buffer.stage("aaa", {"current_price": 100.0, "pe_ratio": 21.0, "quote_updated": now}, stored=_stored())
+
+    assert buffer.pending("AAA") == {"pe_ratio": 21.0, "quote_updated": now}
+    assert buffer.fields_skipped == 1
+
+async def test_timestamp_only_update_counts_as_unchanged(mongo, buffer):
+    buffer.stage("AAA", {"current_price": 100.0, "quote_updated": datetime.utcnow()}, stored=_stored())
+    assert buffer.unchanged == 1
+
+async def test_nan_equals_nan(mongo, buffer):
+    buffer.stage("AAA", {"pb_ratio": math.nan}, stored=_stored(pb_ratio=math.nan))
+    assert buffer.pending("AAA") == {}
+
+async def test_repeated_stagings_collapse(mongo, buffer):
+    buffer.stage("AAA", {"current_price": 101.0}, stored=_stored())
+    buffer.stage("AAA", {"current_price": 102.0})
+    # Back to the persisted value, but the pending 102.0 must still be overwritten
+    buffer.stage("AAA", {"current_price": 100.0})
+    assert buffer.pending("AAA") == {"current_price": 100.0}
+
+async def test_flush_upserts_set_and_insert_defaults(mongo, buffer, bulk_writes):
+    buffer.stage("NEW", {"name": "New Co", "current_price": 5.0}, on_insert={"name": "NEW", "is_active": True})
+    await buffer.flush()
+
+    assert bulk_writes == [[(
+        {"symbol": "NEW"},
+        {"$set": {"name": "New Co", "current_price": 5.0}, "$setOnInsert": {"is_active": True}},
+    )]]
+    document = await Stock.get_motor_collection().find_one({"symbol": "NEW"})
+    assert (document["name"], document["current_price"], document["is_active"]) == ("New Co", 5.0, True)
+    assert buffer.pending("NEW") == {}
+
+async def test_flushed_values_become_the_diff_baseline(mongo, buffer, bulk_writes):
+    buffer.stage("AAA", {"current_price": 101.0}, stored=_stored())
+    await buffer.flush()
+    buffer.stage("AAA", {"current_price": 101.0})
+    await buffer.flush()
+
+    assert len(bulk_writes) == 1
+    assert buffer.get_stats()["flushes"] == 1
+
+async def test_failed_flush_requeues_under_newer_stagings(mongo, buffer, monkeypatch):
+    collection = Stock.get_motor_collection()
+
+    async def failing(operations, ordered=True):
+        # Staged while the write was in flight - newer than what it carried
+        buffer.stage("AAA", {"current_price": 103.0})
+        raise ConnectionError("primary stepped down")
+
+    buffer.stage("AAA", {"current_price": 101.0, "pe_ratio": 22.0}, stored=_stored(), on_insert={"name": "AAA"})
+    monkeypatch.setattr(collection, "bulk_write", failing)
+    await buffer.flush()
+
+    assert buffer.pending("AAA") == {"current_price": 103.0, "pe_ratio": 22.0}
+    assert buffer._on_insert["AAA"] == {"name": "AAA"}
+    assert buffer.errors == 1
+
+async def test_overlay_applies_pending_fields(mongo, buffer):
+    stored = _stored()
+    buffer.stage("AAA", {"current_price": 101.0}, stored=stored)
+    assert buffer.overlay(stored).current_price == 101.0
+    assert buffer.overlay(None) is None
+
+async def test_overlay_document_builds_staged_only_symbols(mongo, buffer):
+    buffer.stage("NEW", {"current_price": 5.0}, on_insert={"name": "NEW", "is_active": True})
+
+    assert buffer.overlay_document("NEW", None) == {
+        "symbol": "NEW", "name": "NEW", "is_active": True, "current_price": 5.0,
+    }
+    assert buffer.overlay_document("AAA", {"symbol": "AAA", "current_price": 1.0}) == {"symbol": "AAA", "current_price": 1.0}
+    assert buffer.overlay_document("OTHER", None) is None
+
+async def test_diff_baselines_are_bounded(mongo, bulk_writes):
+    buffer = StockWriteBuffer(flush_interval=60, baseline_max_symbols=2, baseline_ttl=3600)
+    for number in range(5):
+        buffer.stage(f"S{number}", {"current_price": 1.0})
+    await buffer.flush()
+
+    stats = buffer.get_stats()["baselines"]
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 3
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+from app.services import symbol_registry as registry_module
+from app.services.search_index import StockSearchIndex
+from app.services.symbol_registry import SymbolRegistry
+
+MASTER_CSV = Path(__file__).resolve().parent.parent / "data" / "symbol_master.csv"
+
+HEADER = "Company Name,Industry,Symbol,Series,ISIN Code,Exchange,Aliases\n"
+
+@pytest.fixture
+def search_index(monkeypatch):
+    """A fresh search index in place of the global one"""
+    index = StockSearchIndex()
+    monkeypatch.setattr(registry_module, "stock_search_index", index)
+    return index
+
+async def _registry(path) -> SymbolRegistry:
+    registry = SymbolRegistry(path=str(path), reload_interval=0)
+    assert await registry.load()
+    return registry
+
+async def test_master_file_maps_company_names_to_listed_symbols(search_index):
+    registry = await _registry(MASTER_CSV)
+
+    assert registry.match_names("RELIANCE JIO") == ["RELIANCE"]
+    assert registry.match_names("What about Jio Financial today?") == ["JIOFIN"]
+    assert registry.find_by_name("Indian Oil") == "IOC"
+    assert registry.find_by_name("IOCL") == "IOC"
+    assert registry.find_by_name("Steel Authority of India") == "SAIL"
+    assert "SAIL" in registry and "SAILSTEEL" not in registry
+
+async def test_reload_removes_dropped_rows_from_search(search_index, tmp_path):
+    path = tmp_path / "symbols.csv"
+    path.write_text(HEADER + "Alpha Limited,,ALPHA,EQ,,NSE,\nBeta Limited,,BETA,EQ,,NSE,\n")
+    registry = await _registry(path)
+    assert [match.symbol for match in search_index.search("BETA")] == ["BETA"]
+
+    path.write_text(HEADER + "Alpha Limited,,ALPHA,EQ,,NSE,\nGamma Limited,,GAMMA,EQ,,NSE,BETA LABS\n")
+    assert await registry.load()
+
+    assert "BETA" not in registry
+    assert [match.symbol for match in search_index.search("BETA")] == ["GAMMA"]
+    assert search_index.search("ALPHA")[0].symbol == "ALPHA"
+
+async def test_broken_file_keeps_the_current_universe(search_index, tmp_path):
+    path = tmp_path / "symbols.csv"
+    path.write_text(HEADER + "Alpha Limited,,ALPHA,EQ,,NSE,\n")
+    registry = await _registry(path)
+
+    path.write_text("Ticker,Description\nBETA,Beta\n")
+    assert await registry.load() is False
+    assert registry.symbols == ["ALPHA"]
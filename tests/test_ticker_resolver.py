@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from app.services import ticker_resolver as resolver_module
+from app.services.stock_service import StockService
+from app.services.ticker_resolver import ResolvedTicker, TickerResolver
+
+def _bars(close=100.0):
+    return pd.DataFrame({"Close": [close - 1, close], "Volume": [1000, 2000]})
+
+@pytest.fixture
+def resolver(mongo, monkeypatch):
+    resolver = TickerResolver()
+    monkeypatch.setattr(resolver_module, "ticker_resolver", resolver)
+    monkeypatch.setattr("app.services.stock_service.ticker_resolver", resolver)
+    return resolver
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Tickers probed upstream; only those in `with_data` return bars"""
+    calls = []
+    with_data = set()
+
+    async def quote(ticker_symbol):
+        calls.append(ticker_symbol)
+        return _bars() if ticker_symbol in with_data else pd.DataFrame()
+
+    monkeypatch.setattr(resolver_module.market_data_provider, "quote", quote)
+    return calls, with_data
+
+async def test_resolve_probes_variants_in_order(resolver, probes):
+    calls, with_data = probes
+    with_data.add("AAA.BO")
+
+    assert await resolver.resolve("aaa") == ResolvedTicker("AAA.BO", "BSE (India)")
+    assert calls == ["AAA.NS", "AAA", "AAA.BO"]
+    # Remembered: no more probes
+    assert await resolver.resolve("AAA") == ResolvedTicker("AAA.BO", "BSE (India)")
+    assert len(calls) == 3
+
+async def test_resolve_skips_variants_the_caller_already_tried(resolver, probes):
+    calls, _ = probes
+
+    assert await resolver.resolve("AAA", tried=("AAA.NS",)) is None
+    assert calls == ["AAA", "AAA.BO"]
+    assert resolver.is_negatively_cached("AAA")
+
+async def test_batch_quotes_do_not_probe_the_first_guess_twice(resolver, probes, monkeypatch):
+    calls, with_data = probes
+    with_data.add("AAA.BO")
+    batches = []
+
+    async def download(ticker_symbols):
+        batches.append(ticker_symbols)
+        return {ticker_symbol: _bars() for ticker_symbol in ticker_symbols if ticker_symbol in with_data}
+
+    monkeypatch.setattr(StockService, "_download_history_batch", staticmethod(download))
+    quotes = await StockService._fetch_yahoo_quotes_batch(["AAA"])
+
+    assert batches == [["AAA.NS"], ["AAA.BO"]]
+    assert calls == ["AAA", "AAA.BO"]
+    assert quotes["AAA"]["exchange"] == "BSE (India)"
+    assert resolver.peek("AAA") == ResolvedTicker("AAA.BO", "BSE (India)")
+
+async def test_reprobe_after_empty_results_skips_the_known_ticker(resolver, probes, monkeypatch):
+    calls, with_data = probes
+    monkeypatch.setattr(resolver_module.settings, "TICKER_EMPTY_REPROBE_THRESHOLD", 2)
+    known = ResolvedTicker("AAA.NS", "NSE (India)")
+    await resolver.remember("AAA", known)
+
+    assert await resolver.report_empty("AAA") == known
+    assert calls == []
+    # Nothing else has data either - the known ticker is kept
+    assert await resolver.report_empty("AAA") == known
+    assert calls == ["AAA", "AAA.BO"]
+
+    with_data.add("AAA.BO")
+    await resolver.report_empty("AAA")
+    assert await resolver.report_empty("AAA") == ResolvedTicker("AAA.BO", "BSE (India)")